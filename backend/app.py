@@ -1,7 +1,7 @@
 import os
 from flask import Flask
 from flask_cors import CORS
-from app.models.database import init_db
+from app.models.database import init_db, start_setup_db
 from app.routes.pricing import pricing_bp
 from app.routes.discount import discount_bp
 from app.routes.visualization import visualization_bp
@@ -10,6 +10,8 @@ from app.routes.auth import auth_bp
 from app.routes.admin import admin_bp
 from app.routes.sales_strategy import sales_strategy_bp
 from app.routes.upload import upload_bp
+from app.utils.orjson_response import ORJSONProvider
+from app.utils import compression, log_queue
 
 
 
@@ -19,7 +21,10 @@ def create_app():
 
     """Creates and configures the Flask application."""
     app = Flask(__name__)
+    app.json = ORJSONProvider(app)  # orjson for request parsing and jsonify
     CORS(app)  # Enable CORS for all routes
+    compression.init_app(app)  # gzip large JSON responses
+    log_queue.init_app(app)  # write app.logger records off the request thread
 
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev_key')
     app.config['UPLOAD_FOLDER'] = os.path.join(app.root_path, 'uploads')
@@ -34,6 +39,7 @@ def create_app():
     try:
         init_db()
         print(" Database initialized successfully!")
+        start_setup_db()  # indexes and rollup, built in the background
     except Exception as e:
         print(f" Database initialization failed: {e}")
         raise
@@ -1,6 +1,8 @@
 from pymongo import MongoClient
 import os
+import threading
 from dotenv import load_dotenv
+from app.utils.cache import lookup_cache
 
 # Load environment variables from .env file
 load_dotenv()
@@ -13,21 +15,183 @@ MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 if "your_mongodb_connection_string" in MONGO_URI:
     MONGO_URI="mongodb://localhost:27017"
 
+# Connection pool settings shared by every blueprint (one pool per process)
+MONGO_POOL_OPTIONS = {
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", 50)),
+    "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", 5)),
+    "waitQueueTimeoutMS": 2500,
+    "serverSelectionTimeoutMS": 3000,
+    "compressors": os.getenv("MONGO_COMPRESSORS", "zlib"),
+}
+
+# Compound indexes for the hot query shapes of the API handlers.
+# collection name -> list of (keys, options)
+INDEXES = {
+    "category_monthly_demand": [
+        ([("القسم", 1), ("year", 1), ("month", 1)], {}),
+    ],
+    "item_specification_monthly_demand": [
+        # The trailing totals let the per-category pipelines ($match on القسم
+        # first) run as covered index scans without fetching documents
+        ([("القسم", 1), ("product_specification", 1), ("year", 1), ("month", 1),
+          ("total_quantity", 1), ("total_money_sold", 1)], {}),
+    ],
+    "predicted_demand_2025": [
+        ([("year", 1), ("القسم", 1), ("month", 1)], {}),
+    ],
+    "predicted_item_demand_2025": [
+        ([("year", 1), ("القسم", 1), ("product_specification", 1), ("month", 1)], {}),
+    ],
+    "predicted_daily_demand_2025": [
+        ([("year", 1), ("القسم", 1), ("product_specification", 1), ("month", 1)], {}),
+    ],
+    "price_ranges": [
+        ([("category", 1), ("product_specification", 1), ("year", 1)], {"unique": True}),
+    ],
+    "profit_models": [
+        ([("category", 1), ("product_specification", 1)], {"unique": True}),
+    ],
+    "category_year_month_rollup": [
+        ([("القسم", 1), ("year", 1), ("month", 1)], {"unique": True}),
+    ],
+    # Usernames must be unique; update_user relies on this to detect collisions
+    "users": [
+        ([("username", 1)], {"unique": True}),
+    ],
+}
+
+# Pre-summed per-(القسم, year, month) totals of the item-level demand, rebuilt
+# whenever the source collection is rewritten
+ROLLUP_SOURCE = "item_specification_monthly_demand"
+ROLLUP_COLLECTION = "category_year_month_rollup"
+
+def numeric_field(field, to):
+    """
+    Expression for a field as a number: numbers pass through unchanged, anything
+    else is $convert'ed to the given type (null if it is not numeric).
+    """
+    return {"$cond": [
+        {"$isNumber": f"${field}"},
+        f"${field}",
+        {"$convert": {"input": f"${field}", "to": to, "onError": None, "onNull": None}}
+    ]}
+
+ROLLUP_PIPELINE = [
+    {"$group": {
+        "_id": {
+            "القسم": "$القسم",
+            "year": numeric_field("year", "int"),
+            "month": numeric_field("month", "int")
+        },
+        "total_quantity": {"$sum": numeric_field("total_quantity", "double")},
+        "total_money_sold": {"$sum": numeric_field("total_money_sold", "double")}
+    }},
+    {"$match": {"_id.year": {"$ne": None}, "_id.month": {"$ne": None}}},
+    {"$project": {
+        "_id": 0, "القسم": "$_id.القسم", "year": "$_id.year", "month": "$_id.month",
+        "total_quantity": 1, "total_money_sold": 1
+    }},
+    {"$out": ROLLUP_COLLECTION}
+]
+
 client = None
 db = None
 
+# Serializes rollup builds between the setup step and request-time fallbacks
+rollup_lock = threading.Lock()
+# Background setup_db run started by start_setup_db (one per process)
+setup_thread = None
+
 def init_db():
     global client, db
     try:
         if client is None:
             print(f"Attempting to connect to MongoDB with URI: {MONGO_URI}")
-            client = MongoClient(MONGO_URI)
+            client = MongoClient(MONGO_URI, **MONGO_POOL_OPTIONS)
             db = client['consult_your_data']
             print("MongoDB connection initialized successfully")
     except Exception as e:
         print(f"Error initializing MongoDB connection: {str(e)}")
         raise
 
+def ensure_indexes(collection_names=None):
+    """
+    Create the compound indexes declared in INDEXES (no-op if they exist).
+    
+    :param collection_names: Collections to index (default: None, all of INDEXES).
+    :return: None
+    """
+    for collection_name in collection_names or INDEXES:
+        for keys, options in INDEXES.get(collection_name, []):
+            try:
+                db[collection_name].create_index(keys, **options)
+            except Exception as e:
+                if options.get("unique"):
+                    # Usually duplicate documents; lookups keep working but unindexed
+                    print(f"Error creating unique index {keys} on {collection_name} "
+                          f"(check for duplicate documents): {str(e)}")
+                else:
+                    print(f"Error creating index on {collection_name}: {str(e)}")
+
+def refresh_rollup():
+    """
+    Rebuild ROLLUP_COLLECTION from ROLLUP_SOURCE in one server-side $out.
+    
+    :return: None
+    """
+    try:
+        db[ROLLUP_SOURCE].aggregate(ROLLUP_PIPELINE)
+        ensure_indexes([ROLLUP_COLLECTION])
+    except Exception as e:
+        print(f"Error refreshing {ROLLUP_COLLECTION}: {str(e)}")
+
+def ensure_rollup():
+    """
+    Build ROLLUP_COLLECTION if it is missing while ROLLUP_SOURCE has data.
+    
+    Concurrent callers wait for the first build and then find the rollup present.
+    
+    :return: None
+    """
+    try:
+        if db is None:
+            init_db()
+        with rollup_lock:
+            if db[ROLLUP_COLLECTION].estimated_document_count() == 0 and db[ROLLUP_SOURCE].estimated_document_count() > 0:
+                refresh_rollup()
+    except Exception as e:
+        print(f"Error checking {ROLLUP_COLLECTION}: {str(e)}")
+
+def setup_db():
+    """
+    Create the declared indexes and build the rollup if it is missing.
+    
+    Run explicitly (app/scripts/setup_db.py, or at the end of the data
+    pipeline) rather than on connect, so importing the app never waits on
+    index builds or server selection.
+    
+    :return: None
+    """
+    if db is None:
+        init_db()
+    ensure_indexes()
+    ensure_rollup()
+
+def start_setup_db():
+    """
+    Run setup_db() once per process in a daemon thread.
+    
+    Called at app startup so missing indexes (such as the unique
+    users.username index update_user relies on) and the rollup get built
+    on deployments that never ran the setup script, without delaying startup.
+    
+    :return: None
+    """
+    global setup_thread
+    if setup_thread is None:
+        setup_thread = threading.Thread(target=setup_db, name="setup-db", daemon=True)
+        setup_thread.start()
+
 def get_collection(collection_name):
     """
     Get a MongoDB collection object.
@@ -43,13 +207,16 @@ def get_collection(collection_name):
         print(f"Error getting collection {collection_name}: {str(e)}")
         raise
 
-def fetch_data(collection_name, query=None, projection=None):
+def fetch_data(collection_name, query=None, projection=None, sort=None, skip=0, limit=0):
     """
     Fetch data from a MongoDB collection.
     
     :param collection_name: Name of the collection to query.
     :param query: MongoDB query filter (default: None, fetches all documents).
     :param projection: Fields to include/exclude in the result (default: None).
+    :param sort: List of (field, direction) pairs to sort by (default: None).
+    :param skip: Number of documents to skip, for pagination (default: 0).
+    :param limit: Maximum number of documents to return, 0 for no limit (default: 0).
     :return: List of documents.
     """
     try:
@@ -58,12 +225,67 @@ def fetch_data(collection_name, query=None, projection=None):
         collection = db[collection_name]
         query = query or {}
         projection = projection or {}
-        data = list(collection.find(query, projection))
+        cursor = collection.find(query, projection, skip=skip, limit=limit)
+        if sort:
+            cursor = cursor.sort(sort)
+        data = list(cursor)
         return data
     except Exception as e:
         print(f"Error fetching data from {collection_name}: {str(e)}")
         return []
 
+def fetch_cursor(collection_name, query=None, projection=None, batch_size=500):
+    """
+    Open a MongoDB cursor instead of materializing the result as a list.
+
+    Documents are pulled from the server in batches while the caller iterates,
+    so memory stays flat regardless of the number of matches.
+
+    :param collection_name: Name of the collection to query.
+    :param query: MongoDB query filter (default: None, fetches all documents).
+    :param projection: Fields to include/exclude in the result (default: None).
+    :param batch_size: Number of documents per getMore round trip (default: 500).
+    :return: pymongo Cursor.
+    """
+    return get_collection(collection_name).find(query or {}, projection or None).batch_size(batch_size)
+
+_NOT_CACHED = object()
+
+def cached_find_one(collection_name, query):
+    """
+    Find a single document, reusing the result of an identical recent lookup.
+    
+    Meant for small reference collections that only change when the data
+    pipeline reruns. Misses (None) are cached as well.
+    
+    :param collection_name: Name of the collection to query.
+    :param query: Flat MongoDB equality filter.
+    :return: Matching document or None.
+    """
+    key = (collection_name, tuple(sorted(query.items())))
+    document = lookup_cache.get(key, _NOT_CACHED)
+    if document is _NOT_CACHED:
+        document = get_collection(collection_name).find_one(query)
+        lookup_cache.set(key, document)
+    return document
+
+def aggregate_data(collection_name, pipeline):
+    """
+    Run an aggregation pipeline on a MongoDB collection.
+    
+    :param collection_name: Name of the collection to aggregate.
+    :param pipeline: List of aggregation stages.
+    :return: List of result documents.
+    """
+    try:
+        if db is None:
+            init_db()
+        collection = db[collection_name]
+        return list(collection.aggregate(pipeline))
+    except Exception as e:
+        print(f"Error aggregating data from {collection_name}: {str(e)}")
+        return []
+
 def insert_data(collection_name, data):
     """
     Insert data into a MongoDB collection.
@@ -83,6 +305,10 @@ def insert_data(collection_name, data):
             data = [data]
         result = collection.insert_many(data)
         print(f"Inserted {len(result.inserted_ids)} documents into {collection_name}")
+        # drop() removed the collection's indexes; recreate them
+        ensure_indexes([collection_name])
+        if collection_name == ROLLUP_SOURCE:
+            refresh_rollup()
         return len(result.inserted_ids)
     except Exception as e:
         print(f"Error inserting data into {collection_name}: {str(e)}")
@@ -1,3 +1,5 @@
+import numpy as np
+
 def predict_price(features):
     # Replace with mock logic
     return 100.0  
@@ -5,3 +7,8 @@ def predict_price(features):
 def suggest_discount(features):
     # Replace with mock logic
     return 10.0  
+
+def suggest_discount_batch(features):
+    """Vectorized entry point: one suggested discount per row of an (n, k) array."""
+    # Replace with mock logic
+    return np.full(len(features), 10.0)
@@ -1,58 +1,58 @@
-import pandas as pd
-from app.models.database import fetch_data, insert_data
+from app.models.database import aggregate_data, insert_data
+
+def monthly_average_pipeline(group_fields):
+    """
+    Build a pipeline averaging monthly demand across years for the given keys.
+
+    The averaging happens in MongoDB, so only one document per group/month
+    crosses the wire instead of every historical record.
+    """
+    group_id = {field: f"${field}" for field in group_fields + ["month"]}
+    projection = {"_id": 0}
+    projection.update({field: f"$_id.{field}" for field in group_fields + ["month"]})
+    projection.update({
+        "predicted_quantity": 1,
+        "predicted_money_sold": 1,
+        "year": {"$literal": 2025}
+    })
+    return [
+        {"$group": {
+            "_id": group_id,
+            "predicted_quantity": {"$avg": "$total_quantity"},
+            "predicted_money_sold": {"$avg": "$total_money_sold"}
+        }},
+        {"$sort": {f"_id.{field}": 1 for field in group_fields + ["month"]}},
+        {"$project": projection}
+    ]
 
 def predict_demand_2025():
     try:
-        # Predict demand for categories
-        print(" Fetching historical category demand data...")
-        category_data = fetch_data("category_monthly_demand", projection={"_id": 0})
+        # Predict demand for categories: average demand and money sold per
+        # category and month across years
+        print(" Aggregating historical category demand data...")
+        predicted_category_records = aggregate_data(
+            "category_monthly_demand", monthly_average_pipeline(["القسم"])
+        )
 
-        if not category_data:
+        if not predicted_category_records:
             print(" No records found in category_monthly_demand")
             return
 
-        # Convert to DataFrame
-        df_category = pd.DataFrame(category_data)
-
-        # Group by category and month to calculate the average demand and money sold across years
-        predicted_category_demand = df_category.groupby(['القسم', 'month']).agg({
-            'total_quantity': 'mean',
-            'total_money_sold': 'mean'
-        }).reset_index()
-        predicted_category_demand['year'] = 2025
-        predicted_category_demand = predicted_category_demand.rename(columns={
-            'total_quantity': 'predicted_quantity',
-            'total_money_sold': 'predicted_money_sold'
-        })
-
         # Predict demand for item specifications within each category
-        print("Fetching historical item specification demand data...")
-        item_data = fetch_data("item_specification_monthly_demand", projection={"_id": 0})
+        print("Aggregating historical item specification demand data...")
+        predicted_item_records = aggregate_data(
+            "item_specification_monthly_demand",
+            monthly_average_pipeline(["القسم", "product_specification"])
+        )
 
-        if not item_data:
+        if not predicted_item_records:
             print("⚠ No records found in item_specification_monthly_demand")
         else:
-            # Convert to DataFrame
-            df_item = pd.DataFrame(item_data)
-
-            # Group by category, item_specification, and month to calculate the average demand and money sold
-            predicted_item_demand = df_item.groupby(['القسم', 'product_specification', 'month']).agg({
-                'total_quantity': 'mean',
-                'total_money_sold': 'mean'
-            }).reset_index()
-            predicted_item_demand['year'] = 2025
-            predicted_item_demand = predicted_item_demand.rename(columns={
-                'total_quantity': 'predicted_quantity',
-                'total_money_sold': 'predicted_money_sold'
-            })
-
             # Store predicted item specification demand
-            predicted_item_records = predicted_item_demand.to_dict(orient="records")
             print(" Storing predicted item specification demand for 2025...")
             insert_data("predicted_item_demand_2025", predicted_item_records)
 
         # Store predicted category demand
-        predicted_category_records = predicted_category_demand.to_dict(orient="records")
         print(" Storing predicted category demand for 2025...")
         insert_data("predicted_demand_2025", predicted_category_records)
 
@@ -62,4 +62,4 @@ def predict_demand_2025():
         print(f" Error predicting demand: {str(e)}")
 
 if __name__ == "__main__":
-    predict_demand_2025()
\ No newline at end of file
+    predict_demand_2025()
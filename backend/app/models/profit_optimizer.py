@@ -2,26 +2,42 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
+from functools import lru_cache
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split
-from app.models.database import fetch_data, get_collection, init_db
+from app.models.database import fetch_data, get_collection, init_db, cached_find_one
+from app.utils.cache import lookup_cache
 import arabic_reshaper
 from bidi.algorithm import get_display
 
+ARABIC_FONT_NAMES = ("Arial", "Times New Roman", "Amiri", "Noto Naskh Arabic", "Noto Kufi Arabic", "Geeza Pro")
+
 # 🔍 **Find Arabic-Compatible Font**
+@lru_cache(maxsize=1)
 def get_arabic_font():
-    """Finds an available Arabic font in the system and returns the FontProperties object."""
-    available_fonts = fm.findSystemFonts(fontext="ttf")
-    arabic_fonts = ["Arial", "Times New Roman", "Amiri", "Noto Naskh Arabic", "Noto Kufi Arabic", "Geeza Pro"]
-    for font_path in available_fonts:
-        for arabic_font in arabic_fonts:
-            if arabic_font in font_path:
-                return fm.FontProperties(fname=font_path)
+    """
+    Finds an available Arabic font in the system and returns the FontProperties object.
+    The font scan runs on first use (not at import) and the result is reused.
+    """
+    for font_path in fm.findSystemFonts(fontext="ttf"):
+        if any(name in font_path for name in ARABIC_FONT_NAMES):
+            return fm.FontProperties(fname=font_path)
     print("⚠ Warning: No Arabic font found. Using default font.")
     return None
 
-arabic_font = get_arabic_font()
+
+# Helper function to reshape Arabic text for charts; labels repeat across
+# requests, so reshaped strings are cached
+@lru_cache(maxsize=1024)
+def prepare_arabic_text(text):
+    """Prepare Arabic text for proper display in matplotlib charts."""
+    if not text:
+        return text
+    reshaped_text = arabic_reshaper.reshape(text)
+    bidi_text = get_display(reshaped_text)
+    return bidi_text
+
 # **Inflation Adjustment Setup**
 # Define inflation rates based on data for Egypt (General Inflation % from year to year)
 INFLATION_RATES = {
@@ -204,16 +220,17 @@ def plot_feature_importance(model, feature_names):
     """
     Plot feature importance from the trained RandomForest model.
     """
+    arabic_font = get_arabic_font()
     importances = model.feature_importances_
     sorted_indices = np.argsort(importances)[::-1]
-    reshaped_feature_names = [get_display(arabic_reshaper.reshape(name)) for name in feature_names]
+    reshaped_feature_names = [prepare_arabic_text(name) for name in feature_names]
     sorted_feature_names = [reshaped_feature_names[i] for i in sorted_indices]
     
     plt.figure(figsize=(10, 6))
     bars = plt.barh(range(len(importances)), importances[sorted_indices], align='center', color='skyblue')
     plt.yticks(range(len(importances)), sorted_feature_names, fontproperties=arabic_font, fontsize=12)
-    plt.xlabel(get_display(arabic_reshaper.reshape("الأهمية (Normalized)")), fontproperties=arabic_font, fontsize=12)
-    plt.title(get_display(arabic_reshaper.reshape("أهم العوامل المؤثرة على نسبة الربح")), fontproperties=arabic_font, fontsize=14)
+    plt.xlabel(prepare_arabic_text("الأهمية (Normalized)"), fontproperties=arabic_font, fontsize=12)
+    plt.title(prepare_arabic_text("أهم العوامل المؤثرة على نسبة الربح"), fontproperties=arabic_font, fontsize=14)
     for bar, importance in zip(bars, importances[sorted_indices]):
         plt.text(bar.get_width() + 0.01, bar.get_y() + bar.get_height()/2, f'{importance:.3f}', 
                  ha='left', va='center', fontproperties=arabic_font, fontsize=10)
@@ -270,23 +287,35 @@ def classify_price_level(purchase_price, price_ranges, return_interpolation=Fals
     
     return price_level, interpolation_data
 
-def load_profit_model(category, product_specification, price_level, interpolation_data=None):
-    models_collection = get_collection("profit_models")
-    model = models_collection.find_one({
-        "category": category,
-        "product_specification": product_specification
-    })
-    
-    # If no exact match, try with "غير محدد" specification
-    if not model:
-        model = models_collection.find_one({
+GENERIC_SPECIFICATION = "غير محدد"
+_NOT_CACHED = object()
+
+def find_spec_or_generic(collection_name, category, product_specification, **filters):
+    """
+    Fetch the document for a category/specification, falling back to the generic
+    "غير محدد" specification, in a single query instead of two sequential ones.
+    Results (including misses) are cached like cached_find_one.
+    """
+    key = ("spec_or_generic", collection_name, category, product_specification, tuple(sorted(filters.items())))
+    document = lookup_cache.get(key, _NOT_CACHED)
+    if document is _NOT_CACHED:
+        candidates = get_collection(collection_name).find({
             "category": category,
-            "product_specification": "غير محدد"
+            "product_specification": {"$in": [product_specification, GENERIC_SPECIFICATION]},
+            **filters
         })
+        by_specification = {candidate["product_specification"]: candidate for candidate in candidates}
+        document = by_specification.get(product_specification) or by_specification.get(GENERIC_SPECIFICATION)
+        lookup_cache.set(key, document)
+    return document
+
+def load_profit_model(category, product_specification, price_level, interpolation_data=None):
+    # Exact match, or the "غير محدد" specification if there is none
+    model = find_spec_or_generic("profit_models", category, product_specification)
     
     # If still no match, try to find any model for this category
     if not model:
-        model = models_collection.find_one({
+        model = cached_find_one("profit_models", {
             "category": category
         })
     
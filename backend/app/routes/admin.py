@@ -1,58 +1,80 @@
 # backend/app/routes/admin.py
-from flask import Blueprint, request, jsonify
-from pymongo import MongoClient
+from flask import Blueprint, request, jsonify, current_app, Response
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
 import bcrypt
 import os
 from datetime import datetime
+from app.models.database import get_collection
 from app.routes.auth import token_required, admin_required
+from app.utils.helper import make_etag
 
 # Create blueprint
 admin_bp = Blueprint('admin', __name__)
 
-# Add this to the top of your admin.py file
-print("Attempting to connect to MongoDB...")
-# MongoDB connection
+# bcrypt work factor for admin-managed passwords (each step doubles hashing time)
+BCRYPT_COST = int(os.environ.get('BCRYPT_COST', 12))
+
+# MongoDB connection (shared pool from app.models.database)
+users_collection = get_collection('users')
+
 try:
-    client = MongoClient('mongodb://localhost:27017')
-    db = client['consult_your_data']
-    # Try a simple query to test connection
-    result = db.command('ping')
+    # Ping once so the pool is warm before the first admin request
+    users_collection.database.command('ping')
     print("MongoDB connection successful!")
-    print(f"DB collections: {db.list_collection_names()}")
-    
-    # Count users in the collection
-    users_count = db.users.count_documents({})
-    print(f"Found {users_count} users in the database")
-    
-    # List all users for debugging
-    all_users = list(db.users.find({}, {'_id': 1, 'username': 1, 'role': 1}))
-    for user in all_users:
-        user['_id'] = str(user['_id'])  # Convert ObjectId to string for printing
-    print(f"Users: {all_users}")
-    
-    # Define the users_collection variable for use in routes
-    users_collection = db.users
-    
 except Exception as e:
     print(f"MongoDB connection failed: {str(e)}")
 
 # Helper functions
+def parse_object_id(user_id):
+    """Convert a user id string to ObjectId once; returns None if it is malformed"""
+    try:
+        return ObjectId(user_id)
+    except (InvalidId, TypeError):
+        return None
+
+def invalid_id_response():
+    return jsonify({
+        'success': False,
+        'message': 'معرف المستخدم غير صالح'
+    }), 400
+
+def invalid_password_response():
+    return jsonify({
+        'success': False,
+        'message': 'كلمة المرور غير صالحة'
+    }), 400
+
+# Optional user fields and their defaults in API responses
+USER_FIELD_DEFAULTS = (
+    ('name', ''),
+    ('email', ''),
+    ('active', True),
+    ('createdAt', None),
+    ('lastLogin', None)
+)
+
+# Server-side projection matching format_user_for_response (never loads the hash)
+USER_RESPONSE_PROJECTION = {
+    'username': 1, 'role': 1,
+    **{field: 1 for field, _ in USER_FIELD_DEFAULTS}
+}
+
 def format_user_for_response(user):
     """Format user document for API response (exclude password)"""
     if not user:
         return None
     
-    return {
+    user_data = {
         '_id': str(user['_id']),
         'username': user['username'],
-        'role': user['role'],
-        'name': user.get('name', ''),
-        'email': user.get('email', ''),
-        'active': user.get('active', True),
-        'createdAt': user.get('createdAt', None),
-        'lastLogin': user.get('lastLogin', None)
+        'role': user['role']
     }
+    for field, default in USER_FIELD_DEFAULTS:
+        user_data[field] = user.get(field, default)
+    return user_data
 
 @admin_bp.route('/users', methods=['GET'])
 @token_required
@@ -60,34 +82,37 @@ def format_user_for_response(user):
 def get_all_users():
     try:
         print("Getting all users...")
+        # Every write stamps 'updatedAt', so count + latest stamp versions the list
+        stats = list(users_collection.aggregate([
+            {'$group': {'_id': None, 'count': {'$sum': 1}, 'updatedAt': {'$max': '$updatedAt'}}}
+        ]))
+        etag = make_etag(stats[0]['count'], stats[0]['updatedAt']) if stats else make_etag(0, None)
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+        
         # Get all users from database
-        users_cursor = users_collection.find().sort('createdAt', -1)
+        users_cursor = users_collection.find({}, USER_RESPONSE_PROJECTION).sort('createdAt', -1)
         
-        # Convert cursor to list
-        users_list = []
-        for user in users_cursor:
-            # Format user for response
-            user_data = format_user_for_response(user)
-            users_list.append(user_data)
+        # Format each user for response
+        users_list = [format_user_for_response(user) for user in users_cursor]
         
         print(f"Found {len(users_list)} users")
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'count': len(users_list),
             'users': users_list
-        }), 200
+        })
+        response.set_etag(etag)
+        return response, 200
     
-    except Exception as e:
-        print(f"Error in get_all_users: {str(e)}")
-        print(f"Error type: {type(e)}")
-        import traceback
-        traceback.print_exc()
-        
+    except PyMongoError:
+        current_app.logger.exception("Error in get_all_users")
         return jsonify({
             'success': False,
-            'message': 'خطأ في استرجاع بيانات المستخدمين',
-            'error': str(e)
+            'message': 'خطأ في استرجاع بيانات المستخدمين'
         }), 500
 
 # Get user by ID
@@ -95,9 +120,13 @@ def get_all_users():
 @token_required
 @admin_required
 def get_user_by_id(user_id):
+    oid = parse_object_id(user_id)
+    if oid is None:
+        return invalid_id_response()
+
     try:
         # Find user by ID
-        user = users_collection.find_one({'_id': ObjectId(user_id)})
+        user = users_collection.find_one({'_id': oid}, USER_RESPONSE_PROJECTION)
         
         if not user:
             return jsonify({
@@ -113,11 +142,11 @@ def get_user_by_id(user_id):
             'user': user_data
         }), 200
     
-    except Exception as e:
+    except PyMongoError:
+        current_app.logger.exception("Error in get_user_by_id")
         return jsonify({
             'success': False,
-            'message': 'خطأ في استرجاع بيانات المستخدم',
-            'error': str(e)
+            'message': 'خطأ في استرجاع بيانات المستخدم'
         }), 500
 
 # Create new user
@@ -126,7 +155,9 @@ def get_user_by_id(user_id):
 @admin_required
 def create_user():
     try:
-        data = request.json
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            data = {}
         
         # Validate required fields
         if not data.get('username') or not data.get('password'):
@@ -135,6 +166,10 @@ def create_user():
                 'message': 'اسم المستخدم وكلمة المرور مطلوبة'
             }), 400
         
+        # bcrypt can only hash string passwords
+        if not isinstance(data['password'], str):
+            return invalid_password_response()
+        
         # Check if username already exists
         if users_collection.find_one({'username': data['username']}):
             return jsonify({
@@ -149,11 +184,14 @@ def create_user():
                 'message': 'دور المستخدم غير صالح'
             }), 400
         
-        # Hash password
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(data['password'].encode('utf-8'), salt)
+        # Hash password; bcrypt rejects passwords longer than 72 bytes
+        try:
+            hashed_password = bcrypt.hashpw(data['password'].encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_COST))
+        except ValueError:
+            return invalid_password_response()
         
         # Create user document
+        now = datetime.utcnow()
         new_user = {
             'username': data['username'],
             'password': hashed_password,
@@ -161,7 +199,8 @@ def create_user():
             'name': data.get('name', ''),
             'email': data.get('email', ''),
             'active': data.get('active', True),
-            'createdAt': datetime.now()
+            'createdAt': now,
+            'updatedAt': now
         }
         
         # Insert user into database
@@ -174,7 +213,7 @@ def create_user():
             }), 500
         
         # Get created user
-        created_user = users_collection.find_one({'_id': result.inserted_id})
+        created_user = users_collection.find_one({'_id': result.inserted_id}, USER_RESPONSE_PROJECTION)
         
         return jsonify({
             'success': True,
@@ -182,11 +221,11 @@ def create_user():
             'user': format_user_for_response(created_user)
         }), 201
     
-    except Exception as e:
+    except PyMongoError:
+        current_app.logger.exception("Error in create_user")
         return jsonify({
             'success': False,
-            'message': 'خطأ في إنشاء المستخدم',
-            'error': str(e)
+            'message': 'خطأ في إنشاء المستخدم'
         }), 500
 
 # Update user
@@ -194,25 +233,19 @@ def create_user():
 @token_required
 @admin_required
 def update_user(user_id):
+    oid = parse_object_id(user_id)
+    if oid is None:
+        return invalid_id_response()
+
     try:
-        data = request.json
-        
-        # Find user
-        user = users_collection.find_one({'_id': ObjectId(user_id)})
-        
-        if not user:
+        data = request.get_json(silent=True)
+        if data is None:
+            data = {}
+        if not isinstance(data, dict):
             return jsonify({
                 'success': False,
-                'message': 'المستخدم غير موجود'
-            }), 404
-        
-        # Check if username is being changed and already exists
-        if data.get('username') and data['username'] != user['username']:
-            if users_collection.find_one({'username': data['username']}):
-                return jsonify({
-                    'success': False,
-                    'message': 'اسم المستخدم مسجل بالفعل'
-                }), 400
+                'message': 'بيانات الطلب غير صالحة'
+            }), 400
         
         # Validate role
         if data.get('role') and data['role'] not in ['user', 'admin']:
@@ -230,21 +263,34 @@ def update_user(user_id):
         if 'active' in data:
             update_data['active'] = bool(data['active'])
         
-        # Update user in database
+        # Update user in a single round-trip. The filter only matches when at
+        # least one field differs from the stored value, so a no-op request
+        # writes nothing (updatedAt included).
+        # Username collisions are reported by the unique index on 'username'.
+        user = None
         if update_data:
-            result = users_collection.update_one(
-                {'_id': ObjectId(user_id)},
-                {'$set': update_data}
+            user = users_collection.find_one_and_update(
+                {'_id': oid, '$or': [{field: {'$ne': value}} for field, value in update_data.items()]},
+                {'$set': {**update_data, 'updatedAt': datetime.utcnow()}},
+                projection={'password': 0},
+                return_document=ReturnDocument.BEFORE
             )
-            
-            if result.modified_count == 0:
+        
+        if not user:
+            # Nothing was written: either the user is missing or nothing changed
+            user = users_collection.find_one({'_id': oid}, {'password': 0})
+            if not user:
+                return jsonify({
+                    'success': False,
+                    'message': 'المستخدم غير موجود'
+                }), 404
+            if update_data:
                 return jsonify({
                     'success': False,
                     'message': 'لم يتم تحديث أي بيانات'
                 }), 400
         
-        # Get updated user
-        updated_user = users_collection.find_one({'_id': ObjectId(user_id)})
+        updated_user = {**user, **update_data}
         
         return jsonify({
             'success': True,
@@ -252,11 +298,17 @@ def update_user(user_id):
             'user': format_user_for_response(updated_user)
         }), 200
     
-    except Exception as e:
+    except DuplicateKeyError:
+        return jsonify({
+            'success': False,
+            'message': 'اسم المستخدم مسجل بالفعل'
+        }), 400
+    
+    except PyMongoError:
+        current_app.logger.exception("Error in update_user")
         return jsonify({
             'success': False,
-            'message': 'خطأ في تحديث بيانات المستخدم',
-            'error': str(e)
+            'message': 'خطأ في تحديث بيانات المستخدم'
         }), 500
 
 # Change user password
@@ -264,8 +316,14 @@ def update_user(user_id):
 @token_required
 @admin_required
 def change_password(user_id):
+    oid = parse_object_id(user_id)
+    if oid is None:
+        return invalid_id_response()
+
     try:
-        data = request.json
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            data = {}
         
         # Validate password
         if not data.get('password'):
@@ -274,6 +332,9 @@ def change_password(user_id):
                 'message': 'كلمة المرور مطلوبة'
             }), 400
         
+        if not isinstance(data['password'], str):
+            return invalid_password_response()
+        
         if len(data['password']) < 6:
             return jsonify({
                 'success': False,
@@ -281,7 +342,7 @@ def change_password(user_id):
             }), 400
         
         # Find user
-        user = users_collection.find_one({'_id': ObjectId(user_id)})
+        user = users_collection.find_one({'_id': oid})
         
         if not user:
             return jsonify({
@@ -289,14 +350,16 @@ def change_password(user_id):
                 'message': 'المستخدم غير موجود'
             }), 404
         
-        # Hash new password
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(data['password'].encode('utf-8'), salt)
+        # Hash new password; bcrypt rejects passwords longer than 72 bytes
+        try:
+            hashed_password = bcrypt.hashpw(data['password'].encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_COST))
+        except ValueError:
+            return invalid_password_response()
         
         # Update password in database
         result = users_collection.update_one(
-            {'_id': ObjectId(user_id)},
-            {'$set': {'password': hashed_password}}
+            {'_id': oid},
+            {'$set': {'password': hashed_password, 'updatedAt': datetime.utcnow()}}
         )
         
         if result.modified_count == 0:
@@ -310,11 +373,11 @@ def change_password(user_id):
             'message': 'تم تغيير كلمة المرور بنجاح'
         }), 200
     
-    except Exception as e:
+    except PyMongoError:
+        current_app.logger.exception("Error in change_password")
         return jsonify({
             'success': False,
-            'message': 'خطأ في تغيير كلمة المرور',
-            'error': str(e)
+            'message': 'خطأ في تغيير كلمة المرور'
         }), 500
 
 # Delete user
@@ -322,9 +385,13 @@ def change_password(user_id):
 @token_required
 @admin_required
 def delete_user(user_id):
+    oid = parse_object_id(user_id)
+    if oid is None:
+        return invalid_id_response()
+
     try:
         # Find user
-        user = users_collection.find_one({'_id': ObjectId(user_id)})
+        user = users_collection.find_one({'_id': oid})
         
         if not user:
             return jsonify({
@@ -333,7 +400,7 @@ def delete_user(user_id):
             }), 404
         
         # Delete user from database
-        result = users_collection.delete_one({'_id': ObjectId(user_id)})
+        result = users_collection.delete_one({'_id': oid})
         
         if result.deleted_count == 0:
             return jsonify({
@@ -346,9 +413,9 @@ def delete_user(user_id):
             'message': 'تم حذف المستخدم بنجاح'
         }), 200
     
-    except Exception as e:
+    except PyMongoError:
+        current_app.logger.exception("Error in delete_user")
         return jsonify({
             'success': False,
-            'message': 'خطأ في حذف المستخدم',
-            'error': str(e)
+            'message': 'خطأ في حذف المستخدم'
         }), 500
\ No newline at end of file
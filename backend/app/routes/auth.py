@@ -1,39 +1,64 @@
 # backend/app/routes/auth.py
-from flask import Blueprint, request, jsonify
-from pymongo import MongoClient
+from flask import Blueprint, request, jsonify, Response
 import jwt
 import bcrypt
 from datetime import datetime, timedelta
 import os
+import time
 from bson import ObjectId
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
+from app.models.database import get_collection
+from app.utils.cache import TTLCache
+from app.utils.helper import make_etag
 
 
 auth_bp = Blueprint('auth', __name__)
 
-# MongoDB connection
-client = MongoClient('mongodb://localhost:27017')
-db = client['consult_your_data']
-users_collection = db.users
+# MongoDB connection (shared pool from app.models.database)
+users_collection = get_collection('users')
 
 # JWT configuration
 JWT_SECRET = os.environ.get('JWT_SECRET', 'your_jwt_secret')
 JWT_EXPIRATION = 24  # hours
+JWT_EXPIRATION_DELTA = timedelta(hours=JWT_EXPIRATION)
+
+# lastLogin is written off the request path, at most once per interval per user
+LAST_LOGIN_UPDATE_INTERVAL = timedelta(seconds=60)
+_background_writes = ThreadPoolExecutor(max_workers=4)
+
+def _report_background_write(future):
+    """Done-callback for background writes: print the error if the write failed."""
+    error = future.exception()
+    if error is not None:
+        print(f" Error updating lastLogin: {str(error)}")
+
+# Tokens only enter this cache after a successful signature check, so a hit
+# can skip the HMAC-SHA256 verification as long as the token hasn't expired.
+_jwt_cache = TTLCache(maxsize=50_000, ttl=60)
+
+def decode_token(token):
+    """Decode a JWT, reusing a recently verified payload when possible."""
+    payload = _jwt_cache.get(token)
+    if payload is not None and payload['exp'] > time.time():
+        return payload
+
+    payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
+    _jwt_cache.set(token, payload)
+    return payload
+
+BEARER_PREFIX = 'bearer '
 
 # Authentication decorator
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        
-        # Get token from Authorization header
-        auth_header = request.headers.get('Authorization')
-        print(f"Auth header: {auth_header}")
-        
-        if auth_header:
-            parts = auth_header.split()
-            if len(parts) == 2 and parts[0].lower() == 'bearer':
-                token = parts[1]
+        # Get token from Authorization header ("Bearer <token>")
+        auth_header = request.headers.get('Authorization', '')
+        if auth_header[:7].lower() == BEARER_PREFIX:
+            token = auth_header[7:].strip()
+        else:
+            token = None
         
         print(f"Token: {token}")
         
@@ -45,7 +70,7 @@ def token_required(f):
         
         try:
             # Decode token
-            payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
+            payload = decode_token(token)
             print(f"Decoded payload: {payload}")
             
             # Get user from database - Try with ObjectId
@@ -53,7 +78,7 @@ def token_required(f):
             print(f"Looking for user with ID: {user_id}")
             
             # Try with ObjectId
-            user = users_collection.find_one({'_id': ObjectId(user_id)})
+            user = users_collection.find_one({'_id': ObjectId(user_id)}, {'password': 0})
             
             if not user:
                 print(f"User not found with ID: {user_id}")
@@ -122,7 +147,7 @@ def generate_token(user):
         'id': str(user['_id']),  # Ensure ID is converted to string
         'username': user['username'],
         'role': user['role'],
-        'exp': datetime.utcnow() + timedelta(hours=JWT_EXPIRATION)
+        'exp': datetime.utcnow() + JWT_EXPIRATION_DELTA
     }
     return jwt.encode(payload, JWT_SECRET, algorithm='HS256')
 
@@ -167,11 +192,16 @@ def login():
             'message': 'اسم المستخدم أو كلمة المرور غير صحيحة'
         }), 401
     
-    # Update last login time
-    users_collection.update_one(
-        {'_id': user['_id']},
-        {'$set': {'lastLogin': datetime.now()}}
-    )
+    # Update last login time (skipped if it was recorded moments ago)
+    now = datetime.utcnow()
+    last_login = user.get('lastLogin')
+    if last_login is None or now - last_login >= LAST_LOGIN_UPDATE_INTERVAL:
+        future = _background_writes.submit(
+            users_collection.update_one,
+            {'_id': user['_id']},
+            {'$set': {'lastLogin': now, 'updatedAt': now}}
+        )
+        future.add_done_callback(_report_background_write)
     
     # User data to return (excluding password)
     user_data = {
@@ -196,8 +226,12 @@ def login():
 @auth_bp.route('/profile', methods=['GET'])
 @token_required
 def get_profile():
-    # Get user from database using ID from token
-    user = users_collection.find_one({'_id': request.user['id']})
+    # Get user from database using ID from token (stored as a string, so
+    # convert it back to ObjectId to match '_id'); the hash is not needed
+    user = users_collection.find_one(
+        {'_id': ObjectId(request.user['id'])},
+        {'password': 0}
+    )
     
     if not user:
         return jsonify({
@@ -205,6 +239,13 @@ def get_profile():
             'message': 'المستخدم غير موجود'
         }), 404
     
+    # Skip building the payload if the client already has this version
+    etag = make_etag(user['_id'], user.get('updatedAt'), user.get('lastLogin'))
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    
     # User data to return (excluding password)
     user_data = {
         '_id': str(user['_id']),
@@ -216,7 +257,9 @@ def get_profile():
         'lastLogin': user.get('lastLogin', None)
     }
     
-    return jsonify({
+    response = jsonify({
         'success': True,
         'user': user_data
-    }), 200
\ No newline at end of file
+    })
+    response.set_etag(etag)
+    return response, 200
\ No newline at end of file
@@ -1,17 +1,26 @@
 from flask import Blueprint, request, jsonify
-from app.models.ml_model import suggest_discount
+import numpy as np
+from app.models.ml_model import suggest_discount_batch
 from app.utils.helper import validate_request  # Import helper functions
 
 discount_bp = Blueprint('discount', __name__)
 
+REQUIRED_FIELDS = ("feature1", "feature2", "feature3")  # Replace with actual features
+
 @discount_bp.route('/suggest', methods=['POST'])
 def suggest_discount_route():
     data = request.get_json()
-    required_fields = ["feature1", "feature2", "feature3"]  # Replace with actual features
-    valid, error = validate_request(data, required_fields)
+    valid, error = validate_request(data, REQUIRED_FIELDS)
     if not valid:
         return jsonify(error), 400
 
-    features = [data[field] for field in required_fields]
-    suggested_discount = suggest_discount(features)
+    try:
+        features = np.fromiter((data[field] for field in REQUIRED_FIELDS),
+                               dtype=np.float32, count=len(REQUIRED_FIELDS))
+    except (TypeError, ValueError):
+        features = None
+    if features is None or np.isnan(features).any():
+        return jsonify({"error": "Features must be numeric"}), 400
+
+    suggested_discount = float(suggest_discount_batch(features.reshape(1, -1))[0])
     return jsonify({"suggested_discount": suggested_discount})
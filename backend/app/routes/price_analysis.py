@@ -1,6 +1,5 @@
 from flask import Blueprint, request, jsonify
-from app.models.profit_optimizer import classify_price_level, load_profit_model
-from app.models.database import get_collection, init_db
+from app.models.profit_optimizer import classify_price_level, load_profit_model, find_spec_or_generic
 from datetime import datetime
 
 price_analysis_bp = Blueprint('price_analysis', __name__)
@@ -11,18 +10,27 @@ INFLATION_RATES = {
 }
 BASE_YEAR = 2024
 
+def cumulative_inflation_factor(current_year):
+    """Compound inflation factor from BASE_YEAR up to current_year."""
+    cumulative_factor = 1.0
+    for y in range(BASE_YEAR, current_year):
+        cumulative_factor *= (1 + INFLATION_RATES.get(y, 0))
+    return cumulative_factor
+
+# Factors are constant per year, so compute them once at import
+CUMULATIVE_FACTORS = {year: cumulative_inflation_factor(year) for year in range(BASE_YEAR, BASE_YEAR + 20)}
+
 def reverse_inflation(price, current_year):
     """Adjust price from current_year to BASE_YEAR (2024) using reverse inflation."""
     if current_year == BASE_YEAR:
         return price
-    cumulative_factor = 1.0
-    for y in range(BASE_YEAR, current_year):
-        cumulative_factor *= (1 + INFLATION_RATES.get(y, 0))
+    cumulative_factor = CUMULATIVE_FACTORS.get(current_year)
+    if cumulative_factor is None:
+        cumulative_factor = cumulative_inflation_factor(current_year)
     return price / cumulative_factor
 
 @price_analysis_bp.route('/get-optimal-profit', methods=['POST'])
 def get_optimal_profit():
-    init_db()
     data = request.get_json()
     category = data.get('category')
     product_specification = data.get('product_specification')
@@ -35,23 +43,10 @@ def get_optimal_profit():
     current_year = datetime.now().year  # Assuming 2025 as current year
     adjusted_price = reverse_inflation(purchase_price, current_year)
 
-    # Fetch price ranges for 2024
-    price_ranges_collection = get_collection("price_ranges")
-    price_range = price_ranges_collection.find_one({
-        "category": category,
-        "product_specification": product_specification,
-        "year": str(BASE_YEAR)
-    })
-
-    # Fallback: Use "غير محدد" specification if specific one not found
+    # Fetch price ranges for 2024 (falls back to the "غير محدد" specification)
+    price_range = find_spec_or_generic("price_ranges", category, product_specification, year=str(BASE_YEAR))
     if not price_range:
-        price_range = price_ranges_collection.find_one({
-            "category": category,
-            "product_specification": "غير محدد",
-            "year": str(BASE_YEAR)
-        })
-        if not price_range:
-            return jsonify({"error": "No price range found for the given category, even with fallback"}), 404
+        return jsonify({"error": "No price range found for the given category, even with fallback"}), 404
 
     # Classify price level with linear interpolation
     price_ranges = {
@@ -64,21 +59,10 @@ def get_optimal_profit():
     classified_price_level, interpolation_data = classify_price_level(adjusted_price, price_ranges, return_interpolation=True)
 
     # Check profit_models for a matching category and product_specification
-    models_collection = get_collection("profit_models")
-    profit_model = models_collection.find_one({
-        "category": category,
-        "product_specification": product_specification
-    })
-
+    # (falls back to the generic product specification)
+    profit_model = find_spec_or_generic("profit_models", category, product_specification)
     if not profit_model:
-        # Fallback to generic product specification
-        profit_model = models_collection.find_one({
-            "category": category,
-            "product_specification": "غير محدد"
-        })
-        
-        if not profit_model:
-            return jsonify({"error": "No profit model found for the given category and specification"}), 404
+        return jsonify({"error": "No profit model found for the given category and specification"}), 404
 
     # Load optimal profit percentage with linear scaling
     optimal_profit_percentage = load_profit_model(
@@ -1,7 +1,11 @@
 # app/routes/pricing.py
 from flask import Blueprint, jsonify, request
+from collections import defaultdict
 from app.models.database import fetch_data
 from app.models.profit_optimizer import classify_price_level, load_profit_model
+from app.utils.cache import cached_response
+from app.utils.helper import etag_from_collection
+from app.routes.visualization import get_sales_rate
 
 pricing_bp = Blueprint('pricing', __name__)
 
@@ -57,27 +61,25 @@ def get_optimal_profit():
 
 # Existing endpoints (from previous responses)
 @pricing_bp.route('/api/visualization/demand-forecasting', methods=['GET'])
+@etag_from_collection("predicted_demand_2025")
+@cached_response()
 def demand_forecasting():
     try:
-        demand_data = fetch_data("predicted_demand_2025", projection={"_id": 0})
+        demand_data = fetch_data("predicted_demand_2025", projection={"_id": 0, "القسم": 1, "month": 1, "predicted_quantity": 1})
         if not demand_data:
             return jsonify({
                 "message": "لا توجد بيانات توقعات لعام 2025",
                 "demand_data": {}
             }), 200
 
-        demand_dict = {}
+        # Pivot rows into {category: {month: quantity}}
+        demand_dict = defaultdict(dict)
         for record in demand_data:
-            category = record.get("القسم")
-            month = str(record.get("month"))
-            quantity = record.get("predicted_quantity", 0)
-            if category not in demand_dict:
-                demand_dict[category] = {}
-            demand_dict[category][month] = quantity
+            demand_dict[record.get("القسم")][str(record.get("month"))] = record.get("predicted_quantity", 0)
 
         return jsonify({
             "message": "تم جلب بيانات توقعات الطلب بنجاح",
-            "demand_data": demand_dict
+            "demand_data": dict(demand_dict)
         }), 200
     except Exception as e:
         return jsonify({
@@ -85,9 +87,5 @@ def demand_forecasting():
             "demand_data": {}
         }), 500
 
-@pricing_bp.route('/api/visualization/sales-rate', methods=['GET'])
-def sales_rate():
-    return jsonify({
-        "message": "لم يتم تنفيذ هذا المسار بعد",
-        "sales_rate_data": []
-    }), 200
\ No newline at end of file
+# Legacy alias: serve the real visualization view instead of a placeholder
+pricing_bp.add_url_rule('/api/visualization/sales-rate', view_func=get_sales_rate, methods=['GET'])
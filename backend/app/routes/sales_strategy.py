@@ -1,48 +1,167 @@
-from flask import Blueprint, request, jsonify, Response
-import json
+from flask import Blueprint, request, jsonify, current_app, Response
+import math
+import heapq
+from collections import defaultdict
+from operator import itemgetter
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from app.models.database import fetch_data, get_collection, init_db
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
-import arabic_reshaper
-from bidi.algorithm import get_display
-import io
-import base64
+from app.models.database import aggregate_data, fetch_data, get_collection, numeric_field, ensure_rollup, ROLLUP_COLLECTION
+from app.utils.orjson_response import dumps, orjson_response, JSON_CONTENT_TYPE
+from app.utils.cache import response_cache, cached_response, request_key
+from app.utils.helper import collection_version, etag_from_collection
 
 # Create blueprint
 sales_strategy_bp = Blueprint('sales_strategy', __name__)
 
-# Helper function to find Arabic-compatible font
-def get_arabic_font():
-    """Finds an available Arabic font in the system and returns the FontProperties object."""
-    available_fonts = fm.findSystemFonts(fontext="ttf")
-    arabic_fonts = ["Arial", "Times New Roman", "Amiri", "Noto Naskh Arabic", "Noto Kufi Arabic", "Geeza Pro"]
-    for font_path in available_fonts:
-        for arabic_font in arabic_fonts:
-            if arabic_font in font_path:
-                return fm.FontProperties(fname=font_path)
-    print("⚠ Warning: No Arabic font found. Using default font.")
-    return None
-
-arabic_font = get_arabic_font()
-
-# Helper function to reshape Arabic text for charts
-def prepare_arabic_text(text):
-    """Prepare Arabic text for proper display in matplotlib charts."""
-    if not text:
-        return text
-    reshaped_text = arabic_reshaper.reshape(text)
-    bidi_text = get_display(reshaped_text)
-    return bidi_text
+# Seasonal events: static fields plus the (strategicImportance, salesPattern)
+# pair used when the event lines up with the category's peak, and otherwise
+SEASONAL_EVENT_TEMPLATES = (
+    ({"name": "رمضان", "months": [8, 9, 10],  # Approximate Hijri months in Gregorian calendar
+      "description": "شهر رمضان المبارك"},
+     ("مرتفعة", "ارتفاع"), ("متوسطة", "معتدل")),
+    ({"name": "عيد الفطر", "months": [9, 10], "description": "عيد الفطر المبارك"},
+     ("مرتفعة جداً", "ارتفاع حاد"), ("مرتفعة", "ارتفاع")),
+    ({"name": "عيد الأضحى", "months": [11, 12], "description": "عيد الأضحى المبارك"},
+     ("مرتفعة جداً", "ارتفاع حاد"), ("مرتفعة", "ارتفاع")),
+    ({"name": "العودة للمدارس", "months": [8, 9], "description": "موسم العودة للمدارس"},  # August/September
+     ("مرتفعة جداً", "ارتفاع حاد"), ("متوسطة", "معتدل")),
+    ({"name": "الصيف", "months": [6, 7, 8], "description": "موسم الصيف"},  # June, July, August
+     ("مرتفعة", "ارتفاع"), ("متوسطة", "معتدل")),
+    ({"name": "الشتاء", "months": [12, 1, 2], "description": "موسم الشتاء"},  # December, January, February
+     ("مرتفعة", "ارتفاع"), ("متوسطة", "معتدل")),
+)
+
+def build_seasonal_events(category, strongest_season, peak_month_names):
+    """Fill the seasonal event templates with this category's importance and sales pattern."""
+    peak_set = frozenset(peak_month_names)
+    # Whether each event (in template order) coincides with the category's peak
+    is_peak = (
+        strongest_season in ("الصيف", "الخريف"),
+        not peak_set.isdisjoint(("سبتمبر", "أكتوبر")),
+        not peak_set.isdisjoint(("نوفمبر", "ديسمبر")),
+        is_school_category(category) or "سبتمبر" in peak_set,
+        strongest_season == "الصيف",
+        strongest_season == "الشتاء",
+    )
+    seasonal_events = []
+    for (template, peak_levels, normal_levels), peak in zip(SEASONAL_EVENT_TEMPLATES, is_peak):
+        importance, pattern = peak_levels if peak else normal_levels
+        seasonal_events.append({
+            **template,
+            "months": list(template["months"]),
+            "strategicImportance": importance,
+            "salesPattern": pattern,
+        })
+    return seasonal_events
+
+# Event name -> approximate Gregorian months, from the seasonal event templates
+EVENT_MONTHS = {template["name"]: tuple(template["months"]) for template, _, _ in SEASONAL_EVENT_TEMPLATES}
+
+# Fields of each document returned by sales_totals_pipeline
+SALES_TOTALS_FIELDS = ("year", "month", "product_specification", "total_quantity", "total_money_sold")
+
+def sales_totals_pipeline(category):
+    """
+    Pipeline summing total_quantity/total_money_sold per (year, month, product_specification) for a category.
+
+    Fields are converted with numeric_field first, so numeric strings count like
+    numbers; rows where any of them is not numeric are dropped, as the
+    pd.to_numeric + finite-value filter of process_sales_data did.
+    """
+    keys = ["year", "month", "product_specification"]
+    projection = {"_id": 0, "total_quantity": 1, "total_money_sold": 1}
+    projection.update({key: f"$_id.{key}" for key in keys})
+    return [
+        {"$match": {"القسم": category}},
+        {"$project": {
+            "_id": 0,
+            "product_specification": 1,
+            "year": numeric_field("year", "int"),
+            "month": numeric_field("month", "int"),
+            "total_quantity": numeric_field("total_quantity", "double"),
+            "total_money_sold": numeric_field("total_money_sold", "double")
+        }},
+        {"$match": {field: {"$ne": None} for field in ("year", "month", "total_quantity", "total_money_sold")}},
+        {"$group": {
+            "_id": {key: f"${key}" for key in keys},
+            "total_quantity": {"$sum": "$total_quantity"},
+            "total_money_sold": {"$sum": "$total_money_sold"}
+        }},
+        {"$project": projection}
+    ]
+
+# Fields of each category_year_month_rollup document used by the analysis routes
+YEAR_MONTH_FIELDS = ("year", "month", "total_quantity", "total_money_sold")
+
+def load_category_year_month(category):
+    """
+    Load a category's (year, month) totals from the pre-summed rollup collection.
+
+    If the rollup has no documents at all (a deployment that has not run
+    setup_db yet), it is built once with ensure_rollup before reading.
+
+    :param category: Category (القسم) to load.
+    :return: DataFrame with YEAR_MONTH_FIELDS columns, one row per (year, month); empty if no data.
+    """
+    query = {"القسم": category}
+    projection = {"_id": 0, "القسم": 0}
+    sort = [("year", 1), ("month", 1)]
+    rows = fetch_data(ROLLUP_COLLECTION, query, projection, sort=sort)
+    if not rows and get_collection(ROLLUP_COLLECTION).estimated_document_count() == 0:
+        ensure_rollup()
+        rows = fetch_data(ROLLUP_COLLECTION, query, projection, sort=sort)
+    return pd.DataFrame({field: [row[field] for row in rows] for field in YEAR_MONTH_FIELDS})
+
+def load_category_rows(category):
+    """
+    Load a category's raw rows with only the fields the analysis routes use.
+
+    Non-numeric values are converted in MongoDB (null when they are not
+    numbers), so the frame needs no pd.to_numeric pass.
+
+    :param category: Category (القسم) to load.
+    :return: DataFrame with product_specification and YEAR_MONTH_FIELDS columns, one
+             row per document; empty if no data.
+    """
+    rows = aggregate_data("item_specification_monthly_demand", [
+        {"$match": {"القسم": category}},
+        {"$project": {
+            "_id": 0,
+            "product_specification": 1,
+            "year": numeric_field("year", "int"),
+            "month": numeric_field("month", "int"),
+            "total_quantity": numeric_field("total_quantity", "double"),
+            "total_money_sold": numeric_field("total_money_sold", "double")
+        }}
+    ])
+    return pd.DataFrame({
+        "product_specification": [row.get("product_specification") for row in rows],
+        **{field: [row[field] for row in rows] for field in YEAR_MONTH_FIELDS}
+    })
+
+def category_analysis_body(name, category, analyze):
+    """
+    Encoded JSON body of one analysis of a category, cached per rollup version.
+
+    :param name: Name of the analysis, plus any request inputs it depends on (part of the cache key).
+    :param category: Category (القسم) to analyze.
+    :param analyze: Function building the payload from the load_category_year_month frame.
+    :return: Encoded body, or None if the category has no data.
+    """
+    key = (name, category, collection_version(ROLLUP_COLLECTION))
+    body = response_cache.get(key)
+    if body is None:
+        df = load_category_year_month(category)
+        if df.empty:
+            return None
+        body = dumps(analyze(df))
+        response_cache.set(key, body)
+    return body
 
 @sales_strategy_bp.route('/generate', methods=['POST'])
 def generate_sales_strategy():
     try:
-        # Initialize database connection
-        init_db()
-        
         # Get request data
         data = request.get_json()
         category = data.get('category')
@@ -57,13 +176,23 @@ def generate_sales_strategy():
         if analysis_notes:
             print(f"Analysis notes: {analysis_notes}")
         
+        # The strategy only depends on the request parameters and the demand
+        # data, so reuse the serialized body until item_specification_monthly_demand
+        # changes; hits skip building and encoding the nested response rows
+        cache_key = (
+            "sales_strategy", request_key(category, inflation_factor, analysis_notes),
+            collection_version("item_specification_monthly_demand")
+        )
+        body = response_cache.get(cache_key)
+        if body is not None:
+            return Response(body, content_type=JSON_CONTENT_TYPE)
+        
         # Fetch item specification monthly demand data
         print("Fetching item specification monthly demand data...")
         
-        query = {
-            "القسم": category
-        }
-        item_data = fetch_data("item_specification_monthly_demand", query=query, projection={"_id": 0})
+        # Sum quantity/revenue per (year, month, product) in MongoDB so only the
+        # fields process_sales_data needs come back
+        item_data = aggregate_data("item_specification_monthly_demand", sales_totals_pipeline(category))
         
         if not item_data:
             return jsonify({
@@ -71,51 +200,246 @@ def generate_sales_strategy():
                 "message": "لا توجد بيانات كافية لهذا القسم. يرجى اختيار قسم آخر."
             }), 404
             
-        # Convert to DataFrame
-        df = pd.DataFrame(item_data)
+        # Convert to DataFrame column by column; every row has the same
+        # pipeline fields, so there is no need to hash each record's keys
+        df = pd.DataFrame({field: [row.get(field) for row in item_data] for field in SALES_TOTALS_FIELDS})
         
         # Process data with enhanced analysis
         strategy_data = process_sales_data(df, category, inflation_factor, analysis_notes)
+        body = dumps(strategy_data)
+        response_cache.set(cache_key, body)
         
-        return jsonify(strategy_data), 200
+        return Response(body, content_type=JSON_CONTENT_TYPE)
         
     except Exception as e:
         print(f" Error generating sales strategy: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+MONTH_NAMES = [
+    'يناير', 'فبراير', 'مارس', 'أبريل', 'مايو', 'يونيو',
+    'يوليو', 'أغسطس', 'سبتمبر', 'أكتوبر', 'نوفمبر', 'ديسمبر'
+]
+
+# Month number (1-12) -> Arabic month name
+MONTH_NAME_MAP = {i+1: name for i, name in enumerate(MONTH_NAMES)}
+
+# Month name per month number; index 0 catches anything outside 1-12 (None)
+MONTH_NAME_BY_NUMBER = np.array([None] + MONTH_NAMES, dtype=object)
+
+# Peak month of each season, used to time campaigns
+SEASON_TO_MONTH = {
+    "الشتاء": "ديسمبر",  # Winter peak month
+    "الربيع": "مارس",     # Spring peak month
+    "الصيف": "يوليو",     # Summer peak month
+    "الخريف": "سبتمبر"    # Fall peak month
+}
+
+# Season per month number; index 0 catches anything outside 1-12 (autumn)
+SEASON_BY_MONTH = np.array([
+    "الخريف",
+    "الشتاء", "الشتاء",
+    "الربيع", "الربيع", "الربيع",
+    "الصيف", "الصيف", "الصيف",
+    "الخريف", "الخريف", "الخريف",
+    "الشتاء",
+], dtype=object)
+
+# Response keys of the seasonStats block
+SEASON_STAT_KEYS = (("winter", "الشتاء"), ("spring", "الربيع"), ("summer", "الصيف"), ("fall", "الخريف"))
+
+def assign_season(months):
+    """Map a Series/array of month numbers to season names with a table lookup."""
+    months = np.asarray(months, dtype=np.float64)
+    index = np.where((months >= 1) & (months <= 12), months, 0).astype(np.int64)
+    return SEASON_BY_MONTH[index]
+
+def assign_month_name(months):
+    """Map a Series/array of month numbers to Arabic month names with a table lookup."""
+    months = np.asarray(months, dtype=np.float64)
+    index = np.where((months >= 1) & (months <= 12), months, 0).astype(np.int64)
+    return MONTH_NAME_BY_NUMBER[index]
+
+SUM_COLUMNS = ["total_quantity", "total_money_sold"]
+NUMERIC_COLUMNS = SUM_COLUMNS + ["year", "month"]
+
+def aggregate_year_month(df):
+    """
+    Sum quantity and revenue per (year, month), per month and per year in a single pass.
+
+    Rows are bucketed with one np.bincount over a dense (year, month) code and
+    the month totals are axis sums of that small table. Rows whose month is not
+    a whole number from 1 to 12 are left out of the month tables but still
+    count toward their year, as with groupby.
+
+    :param df: Cleaned sales DataFrame with numeric year, month, total_quantity, total_money_sold.
+    :return: (monthly_agg, yearly_agg, monthly_yearly_agg) DataFrames, matching
+             df.groupby("month"/"year"/["year", "month"]).sum() on SUM_COLUMNS
+             (month groups limited to 1-12).
+    """
+    dtypes = {column: df[column].dtype for column in SUM_COLUMNS}
+    if df.empty:
+        empty = {column: pd.Series(dtype=dtype) for column, dtype in dtypes.items()}
+        return (
+            pd.DataFrame({"month": pd.Series(dtype=np.int64), **empty}),
+            pd.DataFrame({"year": pd.Series(dtype=np.int64), **empty}),
+            pd.DataFrame({"year": pd.Series(dtype=np.int64), "month": pd.Series(dtype=np.int64), **empty})
+        )
+
+    years = df["year"].to_numpy(dtype=np.int64)
+    months = df["month"].to_numpy(dtype=np.float64)
+    min_year = years.min()
+    n_years = int(years.max() - min_year) + 1
+    year_codes = years - min_year
+    valid = (months >= 1) & (months <= 12) & (months == np.floor(months))
+    codes = year_codes[valid] * 12 + (months[valid].astype(np.int64) - 1)
+
+    weights = {column: df[column].to_numpy(dtype=np.float64) for column in SUM_COLUMNS}
+    year_counts = np.bincount(year_codes, minlength=n_years)
+    counts = np.bincount(codes, minlength=n_years * 12).reshape(n_years, 12)
+    year_labels = np.arange(n_years) + min_year
+    month_labels = np.arange(1, 13)
+
+    month_present = counts.sum(axis=0) > 0
+    monthly_agg = pd.DataFrame({"month": month_labels[month_present]})
+    year_present = year_counts > 0
+    yearly_agg = pd.DataFrame({"year": year_labels[year_present]})
+    year_idx, month_idx = np.nonzero(counts)
+    monthly_yearly_agg = pd.DataFrame({"year": year_labels[year_idx], "month": month_labels[month_idx]})
+    for column, values in weights.items():
+        table = np.bincount(codes, weights=values[valid], minlength=n_years * 12).reshape(n_years, 12)
+        monthly_agg[column] = table.sum(axis=0)[month_present].astype(dtypes[column])
+        yearly_agg[column] = np.bincount(year_codes, weights=values, minlength=n_years)[year_present].astype(dtypes[column])
+        monthly_yearly_agg[column] = table[year_idx, month_idx].astype(dtypes[column])
+
+    return monthly_agg, yearly_agg, monthly_yearly_agg
+
+def aggregate_by_product(df):
+    """
+    Sum quantity and revenue per product_specification with pd.factorize + np.bincount.
+
+    :param df: Cleaned sales DataFrame.
+    :return: DataFrame matching df.groupby("product_specification").sum() on SUM_COLUMNS.
+    """
+    codes, products = pd.factorize(df["product_specification"], sort=True)
+    valid = codes >= 0
+    codes = codes[valid]
+    product_agg = pd.DataFrame({"product_specification": products})
+    for column in SUM_COLUMNS:
+        product_agg[column] = np.bincount(
+            codes, weights=df[column].to_numpy(dtype=np.float64)[valid], minlength=len(products)
+        ).astype(df[column].dtype)
+    return product_agg
+
+GROWTH_COLUMNS = ["quantity_growth", "revenue_growth", "price_growth"]
+
+def add_growth_columns(frame, price_column="avg_price"):
+    """
+    Add quantity/revenue/price growth columns (percent change from the previous row).
+
+    Equivalent to pct_change() * 100 on each column, computed as one 2-D NumPy
+    expression instead of three Series passes.
+
+    :param frame: DataFrame ordered by period, with total_quantity, total_money_sold and the price column.
+    :param price_column: Name of the unit price column (default: avg_price).
+    """
+    values = frame[["total_quantity", "total_money_sold", price_column]].to_numpy(dtype=np.float64)
+    frame[GROWTH_COLUMNS] = growth_rates(values)
+
+def growth_rates(values):
+    """
+    Percent change of each column from the previous row (NaN for the first row).
+
+    :param values: 2-D float array, one row per period in order.
+    :return: Array of the same shape.
+    """
+    growth = np.full_like(values, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth[1:] = (values[1:] / values[:-1] - 1) * 100
+    return growth
+
+def latest_years(years, n=3):
+    """Return up to n most recent distinct years as an array, oldest first."""
+    return np.sort(pd.unique(np.asarray(years)))[-n:]
+
+def compute_monthly_trends(monthly_yearly_agg, recent_years=None):
+    """
+    Compound annual growth of each month's quantity over the most recent years.
+
+    The (year, month) totals are scattered into a 12 x years NumPy table once
+    and the growth of all twelve months is computed together.
+
+    :param monthly_yearly_agg: DataFrame with one row per (year, month) and a total_quantity column.
+    :param recent_years: Years to compare, oldest first (default: the latest 3 in the data).
+    :return: Dict of month name -> {growthRate, lastYear, lastQuantity, trend} for
+             months with data in at least two of those years.
+    """
+    if recent_years is None:
+        recent_years = latest_years(monthly_yearly_agg["year"])
+    if len(recent_years) < 2:
+        return {}
+    recent_years = np.asarray(recent_years)
+    row_years = monthly_yearly_agg["year"].to_numpy()
+    row_months = monthly_yearly_agg["month"].to_numpy(dtype=np.int64)
+    year_pos = np.searchsorted(recent_years, row_years).clip(max=len(recent_years) - 1)
+    keep = (recent_years[year_pos] == row_years) & (row_months >= 1) & (row_months <= 12)
+
+    quantities = np.full((12, len(recent_years)), np.nan)
+    quantities[row_months[keep] - 1, year_pos[keep]] = \
+        monthly_yearly_agg["total_quantity"].to_numpy(dtype=np.float64)[keep]
+    years = recent_years.astype(np.float64)
+    present = ~np.isnan(quantities)
+    rows = np.arange(len(quantities))
+    # First and last year with data, per month
+    first = present.argmax(axis=1)
+    last = present.shape[1] - 1 - present[:, ::-1].argmax(axis=1)
+    first_qty = quantities[rows, first]
+    last_qty = quantities[rows, last]
+    years_diff = years[last] - years[first]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = np.where(
+            (first_qty > 0) & (years_diff > 0),
+            ((last_qty / first_qty) ** (1 / years_diff) - 1) * 100,
+            0.0
+        )
+
+    monthly_trends = {}
+    for i in np.flatnonzero(present.sum(axis=1) >= 2):
+        growth_percent = growth[i]
+        monthly_trends[MONTH_NAME_MAP[i + 1]] = {
+            "growthRate": round(float(growth_percent), 1),
+            "lastYear": int(years[last[i]]),
+            "lastQuantity": int(last_qty[i]),
+            "trend": "upward" if growth_percent > 5 else "downward" if growth_percent < -5 else "stable"
+        }
+    return monthly_trends
+
 def process_sales_data(df, category, inflation_factor=30, analysis_notes=None):
     """Process sales data to generate comprehensive sales strategy with enhanced analysis."""
     
-    # Ensure numeric values
-    df["total_quantity"] = pd.to_numeric(df["total_quantity"], errors="coerce")
-    df["total_money_sold"] = pd.to_numeric(df["total_money_sold"], errors="coerce")
-    df["year"] = pd.to_numeric(df["year"], errors="coerce")
-    df["month"] = pd.to_numeric(df["month"], errors="coerce")
+    # Ensure numeric values (Mongo usually returns numbers already, so only
+    # coerce when a column came back as strings/mixed)
+    numeric = df[NUMERIC_COLUMNS]
+    if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in numeric.dtypes):
+        numeric = numeric.apply(pd.to_numeric, errors="coerce")
+    df = df.assign(**{column: numeric[column] for column in NUMERIC_COLUMNS})
     
-    # Filter out any invalid data
-    df = df.dropna(subset=["total_quantity", "total_money_sold", "year", "month"])
-    
-    # Define month names
-    month_names = [
-        'يناير', 'فبراير', 'مارس', 'أبريل', 'مايو', 'يونيو',
-        'يوليو', 'أغسطس', 'سبتمبر', 'أكتوبر', 'نوفمبر', 'ديسمبر'
-    ]
-    
-    # Create a mapping from month number to name
-    month_name_map = {i+1: name for i, name in enumerate(month_names)}
+    # Filter out any invalid data in one pass over the numeric block
+    df = df[np.isfinite(numeric.to_numpy(dtype=np.float64)).all(axis=1)]
     
     # 1. Monthly Analysis
-    # Aggregate data by month (across all years)
-    monthly_agg = df.groupby("month").agg({
-        "total_quantity": "sum",
-        "total_money_sold": "sum"
-    }).reset_index()
+    # Aggregate data by month (across all years); the yearly and (year, month)
+    # totals used further down come from the same pass
+    monthly_agg, yearly_agg, monthly_yearly_agg = aggregate_year_month(df)
+    
+    # Most recent years (up to 3), shared by the monthly trends and the
+    # annual forecast; yearly_agg is already sorted by year
+    recent_years = latest_years(yearly_agg["year"])
     
     # Sort by month
     monthly_agg = monthly_agg.sort_values("month")
     
     # Add month names
-    monthly_agg["month_name"] = monthly_agg["month"].map(month_name_map)
+    monthly_agg["month_name"] = assign_month_name(monthly_agg["month"])
     
     # Calculate average unit price
     monthly_agg["avg_price"] = monthly_agg["total_money_sold"] / monthly_agg["total_quantity"]
@@ -127,38 +451,40 @@ def process_sales_data(df, category, inflation_factor=30, analysis_notes=None):
     
     # 3. Year-over-year performance analysis
     
-    # Aggregate by year and calculate growth rate
-    yearly_agg = df.groupby("year").agg({
-        "total_quantity": "sum",
-        "total_money_sold": "sum"
-    }).reset_index()
+    # Yearly totals come from aggregate_year_month; calculate growth rate
     
     # Add average price per year
     yearly_agg["avg_price"] = yearly_agg["total_money_sold"] / yearly_agg["total_quantity"]
     yearly_agg["avg_price"] = yearly_agg["avg_price"].fillna(0).round(2)
     
     # Calculate growth rates
-    yearly_agg["quantity_growth"] = yearly_agg["total_quantity"].pct_change() * 100
-    yearly_agg["revenue_growth"] = yearly_agg["total_money_sold"].pct_change() * 100
-    yearly_agg["price_growth"] = yearly_agg["avg_price"].pct_change() * 100
+    add_growth_columns(yearly_agg)
     
     # Format yearly performance data for frontend
     yearly_performance = []
-    for _, row in yearly_agg.iterrows():
+    for year, quantity, revenue, avg_price, quantity_growth, revenue_growth, price_growth in zip(
+        yearly_agg["year"].astype(np.int64).tolist(),
+        yearly_agg["total_quantity"].astype(np.int64).tolist(),
+        yearly_agg["total_money_sold"].astype(np.int64).tolist(),
+        yearly_agg["avg_price"].astype(float).tolist(),
+        yearly_agg["quantity_growth"].tolist(),
+        yearly_agg["revenue_growth"].tolist(),
+        yearly_agg["price_growth"].tolist()
+    ):
         performance = {
-            "year": int(row["year"]),
-            "totalQuantity": int(row["total_quantity"]),
-            "totalRevenue": int(row["total_money_sold"]),
-            "avgPrice": float(row["avg_price"]),
+            "year": year,
+            "totalQuantity": quantity,
+            "totalRevenue": revenue,
+            "avgPrice": avg_price,
         }
         
         # Add growth rates if available
-        if not pd.isna(row["quantity_growth"]):
-            performance["quantityGrowth"] = float(round(row["quantity_growth"], 1))
-        if not pd.isna(row["revenue_growth"]):
-            performance["revenueGrowth"] = float(round(row["revenue_growth"], 1))
-        if not pd.isna(row["price_growth"]):
-            performance["priceGrowth"] = float(round(row["price_growth"], 1))
+        if not math.isnan(quantity_growth):
+            performance["quantityGrowth"] = round(quantity_growth, 1)
+        if not math.isnan(revenue_growth):
+            performance["revenueGrowth"] = round(revenue_growth, 1)
+        if not math.isnan(price_growth):
+            performance["priceGrowth"] = round(price_growth, 1)
             
         yearly_performance.append(performance)
     
@@ -170,25 +496,8 @@ def process_sales_data(df, category, inflation_factor=30, analysis_notes=None):
     inflation_impact = detect_inflation_impact(yearly_performance)
     
     # 5. Seasonal Analysis
-    # Define seasons
-    winter_months = [12, 1, 2]
-    spring_months = [3, 4, 5]
-    summer_months = [6, 7, 8]
-    fall_months = [9, 10, 11]
-    
-    # Function to assign season
-    def get_season(month):
-        if month in winter_months:
-            return "الشتاء"
-        elif month in spring_months:
-            return "الربيع"
-        elif month in summer_months:
-            return "الصيف"
-        else:
-            return "الخريف"
-    
     # Add season to monthly data
-    monthly_agg["season"] = monthly_agg["month"].apply(get_season)
+    monthly_agg["season"] = assign_season(monthly_agg["month"])
     
     # Aggregate by season
     seasonal_agg = monthly_agg.groupby("season").agg({
@@ -196,142 +505,52 @@ def process_sales_data(df, category, inflation_factor=30, analysis_notes=None):
         "total_money_sold": "sum"
     }).reset_index()
     
+    # Season name -> totals, for the seasonStats block of the response
+    season_totals = seasonal_agg.set_index("season")[SUM_COLUMNS].to_dict("index")
+    
     # Find strongest and weakest seasons
     strongest_season = seasonal_agg.loc[seasonal_agg["total_quantity"].idxmax(), "season"]
     weakest_season = seasonal_agg.loc[seasonal_agg["total_quantity"].idxmin(), "season"]
     
     # 6. Analyze year-over-year trends by month
     # This is key for seasonal analysis across years
-    monthly_yearly_agg = df.groupby(["year", "month"]).agg({
-        "total_quantity": "sum",
-        "total_money_sold": "sum"
-    }).reset_index()
-    
     # Add month names and seasons
-    monthly_yearly_agg["month_name"] = monthly_yearly_agg["month"].map(month_name_map)
-    monthly_yearly_agg["season"] = monthly_yearly_agg["month"].apply(get_season)
+    monthly_yearly_agg["month_name"] = assign_month_name(monthly_yearly_agg["month"])
+    monthly_yearly_agg["season"] = assign_season(monthly_yearly_agg["month"])
     
-    # Get the most recent years (up to 3) for trend analysis
-    recent_years = sorted(monthly_yearly_agg["year"].unique(), reverse=True)[:3]
-    
-    # Monthly trends by year
-    monthly_trends = {}
-    for month in range(1, 13):
-        month_data = monthly_yearly_agg[monthly_yearly_agg["month"] == month]
-        month_data = month_data[month_data["year"].isin(recent_years)].sort_values("year")
-        
-        # Skip if less than 2 years of data
-        if len(month_data) < 2:
-            continue
-            
-        # Calculate year-over-year growth
-        first_year = month_data.iloc[0]["year"]
-        last_year = month_data.iloc[-1]["year"]
-        first_qty = month_data.iloc[0]["total_quantity"]
-        last_qty = month_data.iloc[-1]["total_quantity"]
-        
-        # Calculate average annual growth rate
-        if len(month_data) > 1 and first_qty > 0:
-            years_diff = last_year - first_year
-            if years_diff > 0:
-                compound_growth = ((last_qty / first_qty) ** (1 / years_diff)) - 1
-                growth_percent = compound_growth * 100
-            else:
-                growth_percent = ((last_qty - first_qty) / first_qty) * 100
-        else:
-            growth_percent = 0
-            
-        monthly_trends[month_name_map[month]] = {
-            "growthRate": round(growth_percent, 1),
-            "lastYear": int(last_year),
-            "lastQuantity": int(last_qty),
-            "trend": "upward" if growth_percent > 5 else "downward" if growth_percent < -5 else "stable"
-        }
+    # Monthly growth trends over the most recent years (up to 3)
+    monthly_trends = compute_monthly_trends(monthly_yearly_agg, recent_years)
     
     # 7. Seasonal events analysis
     # Define important seasonal events
-    seasonal_events = [
-        {
-            "name": "رمضان",
-            "months": [8, 9, 10],  # Approximate Hijri months in Gregorian calendar
-            "description": "شهر رمضان المبارك",
-            "strategicImportance": "مرتفعة" if strongest_season in ["الصيف", "الخريف"] else "متوسطة",
-            "salesPattern": "ارتفاع" if strongest_season in ["الصيف", "الخريف"] else "معتدل",
-        },
-        {
-            "name": "عيد الفطر",
-            "months": [9, 10],
-            "description": "عيد الفطر المبارك",
-            "strategicImportance": "مرتفعة جداً" if "سبتمبر" in peak_month_names or "أكتوبر" in peak_month_names else "مرتفعة",
-            "salesPattern": "ارتفاع حاد" if "سبتمبر" in peak_month_names or "أكتوبر" in peak_month_names else "ارتفاع",
-        },
-        {
-            "name": "عيد الأضحى",
-            "months": [11, 12],
-            "description": "عيد الأضحى المبارك",
-            "strategicImportance": "مرتفعة جداً" if "نوفمبر" in peak_month_names or "ديسمبر" in peak_month_names else "مرتفعة",
-            "salesPattern": "ارتفاع حاد" if "نوفمبر" in peak_month_names or "ديسمبر" in peak_month_names else "ارتفاع",
-        },
-        {
-            "name": "العودة للمدارس",
-            "months": [8, 9],  # August/September
-            "description": "موسم العودة للمدارس",
-            "strategicImportance": "مرتفعة جداً" if category.lower() in ["مدارس", "اطفال"] or "سبتمبر" in peak_month_names else "متوسطة",
-            "salesPattern": "ارتفاع حاد" if category.lower() in ["مدارس", "اطفال"] or "سبتمبر" in peak_month_names else "معتدل",
-        },
-        {
-            "name": "الصيف",
-            "months": [6, 7, 8],  # June, July, August
-            "description": "موسم الصيف",
-            "strategicImportance": "مرتفعة" if strongest_season == "الصيف" else "متوسطة",
-            "salesPattern": "ارتفاع" if strongest_season == "الصيف" else "معتدل",
-        },
-        {
-            "name": "الشتاء",
-            "months": [12, 1, 2],  # December, January, February
-            "description": "موسم الشتاء",
-            "strategicImportance": "مرتفعة" if strongest_season == "الشتاء" else "متوسطة",
-            "salesPattern": "ارتفاع" if strongest_season == "الشتاء" else "معتدل",
-        }
-    ]
+    seasonal_events = build_seasonal_events(category, strongest_season, peak_month_names)
     
     # Enrich with strategies for each event
     for event in seasonal_events:
         event["strategies"] = generate_event_strategies(event, category, inflation_impact)
     
     # 8. Product Analysis
-    # Aggregate by product specification
-    product_agg = df.groupby("product_specification").agg({
-        "total_quantity": "sum",
-        "total_money_sold": "sum"
-    }).reset_index()
-    
-    # Sort by quantity
-    product_agg = product_agg.sort_values("total_quantity", ascending=False)
-    
-    # Calculate percentage of total
-    total_quantity = product_agg["total_quantity"].sum()
-    product_agg["percentage"] = (product_agg["total_quantity"] / total_quantity * 100).round(1)
-    
-    # Get top 5 products
-    top_products = product_agg.head(5)
+    # Aggregate by product specification (factorize + bincount)
+    product_agg = aggregate_by_product(df)
+    names = product_agg["product_specification"].to_numpy()
+    quantities = product_agg["total_quantity"].to_numpy()
+    total_quantity = quantities.sum()
+    
+    # Order by quantity, largest first, and split off the top 5
+    order = np.argsort(-quantities, kind="stable")
+    top, rest = order[:5], order[5:]
+    top_products = [
+        {"name": name, "percentage": percentage}
+        for name, percentage in zip(
+            names[top].tolist(),
+            np.round(quantities[top] / total_quantity * 100, 1).astype(float).tolist()
+        )
+    ]
     
-    # If there are less than 5 products, add "Other" category to make it 5
-    if len(top_products) < 5:
-        top_products = top_products
-    else:
-        # For more than 5, combine the rest into "Other"
-        other_quantity = product_agg.iloc[5:]["total_quantity"].sum()
-        other_percentage = (other_quantity / total_quantity * 100).round(1)
-        
-        if other_quantity > 0:
-            other_row = pd.DataFrame({
-                "product_specification": ["أخرى"],
-                "total_quantity": [other_quantity],
-                "total_money_sold": [product_agg.iloc[5:]["total_money_sold"].sum()],
-                "percentage": [other_percentage]
-            })
-            top_products = pd.concat([top_products, other_row]).reset_index(drop=True)
+    # For more than 5, combine the rest into "Other"
+    other_quantity = quantities[rest].sum()
+    if other_quantity > 0:
+        top_products.append({"name": "أخرى", "percentage": float(round(other_quantity / total_quantity * 100, 1))})
     
     # 9. Generate Pricing Recommendations
     pricing_recommendations = generate_pricing_recommendations(
@@ -356,7 +575,6 @@ def process_sales_data(df, category, inflation_factor=30, analysis_notes=None):
     
     # 13. Calculate annual totals for next year (2025) with inflation factor
     # For simplicity, use the average of the last 3 years with growth adjustments
-    recent_years = sorted(yearly_agg["year"].unique(), reverse=True)[:3]
     recent_data = yearly_agg[yearly_agg["year"].isin(recent_years)]
     
     # Calculate base values from historical data
@@ -376,22 +594,15 @@ def process_sales_data(df, category, inflation_factor=30, analysis_notes=None):
     avg_annual_revenue = int(avg_annual_revenue_base * inflation_multiplier * quantity_multiplier)
     
     # 14. Format the monthly data
-    monthly_data = []
-    for _, row in monthly_agg.iterrows():
-        monthly_data.append({
-            "month": row["month_name"],
-            "quantity": int(row["total_quantity"]),
-            "revenue": int(row["total_money_sold"]),
-            "avgPrice": float(row["avg_price"])
-        })
-    
-    # Format the top products data
-    top_products_data = []
-    for _, row in top_products.iterrows():
-        top_products_data.append({
-            "name": row["product_specification"],
-            "percentage": float(row["percentage"])
-        })
+    monthly_data = [
+        {"month": name, "quantity": quantity, "revenue": revenue, "avgPrice": avg_price}
+        for name, quantity, revenue, avg_price in zip(
+            monthly_agg["month_name"].tolist(),
+            monthly_agg["total_quantity"].astype(np.int64).tolist(),
+            monthly_agg["total_money_sold"].astype(np.int64).tolist(),
+            monthly_agg["avg_price"].astype(float).tolist()
+        )
+    ]
     
     # Prepare final response
     response_data = {
@@ -403,29 +614,18 @@ def process_sales_data(df, category, inflation_factor=30, analysis_notes=None):
         "yearlyPerformance": yearly_performance,
         "inflationImpact": inflation_impact,
         "seasonStats": {
-            "winter": {
-                "totalQuantity": int(seasonal_agg[seasonal_agg["season"] == "الشتاء"]["total_quantity"].iloc[0]),
-                "totalRevenue": int(seasonal_agg[seasonal_agg["season"] == "الشتاء"]["total_money_sold"].iloc[0])
-            },
-            "spring": {
-                "totalQuantity": int(seasonal_agg[seasonal_agg["season"] == "الربيع"]["total_quantity"].iloc[0]),
-                "totalRevenue": int(seasonal_agg[seasonal_agg["season"] == "الربيع"]["total_money_sold"].iloc[0])
-            },
-            "summer": {
-                "totalQuantity": int(seasonal_agg[seasonal_agg["season"] == "الصيف"]["total_quantity"].iloc[0]),
-                "totalRevenue": int(seasonal_agg[seasonal_agg["season"] == "الصيف"]["total_money_sold"].iloc[0])
-            },
-            "fall": {
-                "totalQuantity": int(seasonal_agg[seasonal_agg["season"] == "الخريف"]["total_quantity"].iloc[0]),
-                "totalRevenue": int(seasonal_agg[seasonal_agg["season"] == "الخريف"]["total_money_sold"].iloc[0])
+            key: {
+                "totalQuantity": int(season_totals[season]["total_quantity"]),
+                "totalRevenue": int(season_totals[season]["total_money_sold"])
             }
+            for key, season in SEASON_STAT_KEYS
         },
         "annualQuantity": avg_annual_quantity,
         "annualRevenue": avg_annual_revenue,
         "inflationFactor": inflation_factor,
         "monthlyTrends": monthly_trends,
         "seasonalEvents": seasonal_events,
-        "topProducts": top_products_data,
+        "topProducts": top_products,
         "pricingRecommendations": pricing_recommendations,
         "marketingCampaigns": marketing_campaigns,
         "businessRecommendations": business_recommendations,
@@ -433,7 +633,7 @@ def process_sales_data(df, category, inflation_factor=30, analysis_notes=None):
         "charts": {
             "monthly": monthly_chart_data,
             "seasonal": seasonal_chart_data,
-            "products": top_products["percentage"].tolist()
+            "products": [product["percentage"] for product in top_products]
         }
     }
     
@@ -466,43 +666,68 @@ def detect_inflation_impact(yearly_performance):
     
     return {"detected": False}
 
+CLOTHING_CATEGORIES = frozenset(("حريمي", "رجالي", "اطفال"))
+SHOE_CATEGORIES = frozenset(("احذية حريمي", "احذية رجالي", "احذية اطفال"))
+# Arabic has no letter case, so category names are matched without .lower()
+SCHOOL_CATEGORIES = frozenset(("مدارس", "اطفال"))
+HIGH_IMPORTANCE_LEVELS = frozenset(("مرتفعة", "مرتفعة جداً"))
+
+def is_school_category(category):
+    """Whether the category is one of SCHOOL_CATEGORIES."""
+    return category in SCHOOL_CATEGORIES
+
+def mentions_school_category(category):
+    """Whether the category name contains one of SCHOOL_CATEGORIES (e.g. "احذية اطفال")."""
+    return any(keyword in category for keyword in SCHOOL_CATEGORIES)
+
+EID_STRATEGIES = (
+    "زيادة المخزون قبل العيد بثلاثة أسابيع على الأقل",
+    "تقديم خدمات تغليف هدايا مجانية",
+    "إعداد عروض خاصة للعائلات والمشتريات المتعددة",
+)
+
+# Event name -> (base strategies, ((categories, strategies if the category
+# is one of them, strategies otherwise), ...)) for generate_event_strategies
+EVENT_STRATEGIES = {
+    "رمضان": (
+        ("تقديم عروض خاصة خلال ساعات المساء والليل",
+         "تصميم حملات تسويقية تناسب أجواء شهر رمضان"),
+        ((CLOTHING_CATEGORIES, ("تقديم تشكيلة ملابس خاصة بشهر رمضان والعيد",), ()),),
+    ),
+    "عيد الفطر": (EID_STRATEGIES, ()),
+    "عيد الأضحى": (EID_STRATEGIES, ()),
+    "العودة للمدارس": (
+        (),
+        ((SCHOOL_CATEGORIES,
+          ("توفير تشكيلة كاملة من ملابس المدارس",
+           "عروض خاصة للمشتريات بكميات كبيرة",
+           "الشراكة مع المدارس المحلية لتوفير احتياجاتهم"),
+          ("استهداف العائلات أثناء فترة التسوق للعودة للمدارس",)),),
+    ),
+    "الصيف": (
+        (),
+        ((SHOE_CATEGORIES, ("تقديم تشكيلة متنوعة من الأحذية الصيفية",), ()),
+         (CLOTHING_CATEGORIES, ("التركيز على الملابس الخفيفة والألوان الفاتحة",), ())),
+    ),
+    "الشتاء": (
+        (),
+        ((CLOTHING_CATEGORIES,
+          ("توفير تشكيلة متنوعة من الملابس الشتوية",
+           "عروض على المعاطف والملابس الثقيلة"),
+          ()),),
+    ),
+}
+
 def generate_event_strategies(event, category, inflation_impact):
     """Generate tailored strategies for seasonal events."""
-    strategies = []
-    
-    # Basic strategies by event type
-    if event["name"] == "رمضان":
-        strategies.append("تقديم عروض خاصة خلال ساعات المساء والليل")
-        strategies.append("تصميم حملات تسويقية تناسب أجواء شهر رمضان")
-        if category in ["حريمي", "رجالي", "اطفال"]:
-            strategies.append("تقديم تشكيلة ملابس خاصة بشهر رمضان والعيد")
-    
-    elif event["name"] in ["عيد الفطر", "عيد الأضحى"]:
-        strategies.append("زيادة المخزون قبل العيد بثلاثة أسابيع على الأقل")
-        strategies.append("تقديم خدمات تغليف هدايا مجانية")
-        strategies.append("إعداد عروض خاصة للعائلات والمشتريات المتعددة")
-    
-    elif event["name"] == "العودة للمدارس":
-        if category in ["مدارس", "اطفال"]:
-            strategies.append("توفير تشكيلة كاملة من ملابس المدارس")
-            strategies.append("عروض خاصة للمشتريات بكميات كبيرة")
-            strategies.append("الشراكة مع المدارس المحلية لتوفير احتياجاتهم")
-        else:
-            strategies.append("استهداف العائلات أثناء فترة التسوق للعودة للمدارس")
-    
-    elif event["name"] == "الصيف":
-        if category in ["احذية حريمي", "احذية رجالي", "احذية اطفال"]:
-            strategies.append("تقديم تشكيلة متنوعة من الأحذية الصيفية")
-        if category in ["حريمي", "رجالي", "اطفال"]:
-            strategies.append("التركيز على الملابس الخفيفة والألوان الفاتحة")
-    
-    elif event["name"] == "الشتاء":
-        if category in ["حريمي", "رجالي", "اطفال"]:
-            strategies.append("توفير تشكيلة متنوعة من الملابس الشتوية")
-            strategies.append("عروض على المعاطف والملابس الثقيلة")
+    # Basic strategies by event type, then the ones for matching categories
+    base_strategies, category_strategies = EVENT_STRATEGIES.get(event["name"], ((), ()))
+    strategies = list(base_strategies)
+    for categories, matching, other in category_strategies:
+        strategies.extend(matching if category in categories else other)
     
     # Add strategies based on importance and sales pattern
-    if event["strategicImportance"] == "مرتفعة" or event["strategicImportance"] == "مرتفعة جداً":
+    if event["strategicImportance"] in HIGH_IMPORTANCE_LEVELS:
         strategies.append("زيادة المخزون قبل الموسم بفترة كافية")
         strategies.append("تخصيص ميزانية تسويقية أعلى للموسم")
     
@@ -596,18 +821,11 @@ def generate_marketing_campaigns(peak_months, strongest_season, weakest_season,
     """Generate marketing campaign recommendations."""
     
     # Convert season to month mapping
-    season_to_month = {
-        "الشتاء": "ديسمبر",  # Winter peak month
-        "الربيع": "مارس",     # Spring peak month
-        "الصيف": "يوليو",     # Summer peak month
-        "الخريف": "سبتمبر"    # Fall peak month
-    }
-    
     # Basic campaigns
     campaigns = [
         {
             "name": f"حملة {strongest_season}",
-            "timing": season_to_month.get(strongest_season, peak_months[0] if peak_months else "ديسمبر"),
+            "timing": SEASON_TO_MONTH.get(strongest_season, peak_months[0] if peak_months else "ديسمبر"),
             "focus": "التركيز على المنتجات الأكثر مبيعًا في الموسم",
             "budget": "مرتفع"
         },
@@ -628,16 +846,16 @@ def generate_marketing_campaigns(peak_months, strongest_season, weakest_season,
     # Add weakest season campaign
     campaigns.append({
         "name": f"حملة تنشيط {weakest_season}",
-        "timing": season_to_month.get(weakest_season, "ديسمبر"),
+        "timing": SEASON_TO_MONTH.get(weakest_season, "ديسمبر"),
         "focus": "عروض خاصة لتعزيز المبيعات في الموسم الضعيف",
         "budget": "متوسط"
     })
     
     # Add seasonal event campaigns
     for event in seasonal_events:
-        if event["strategicImportance"] == "مرتفعة" or event["strategicImportance"] == "مرتفعة جداً":
+        if event["strategicImportance"] in HIGH_IMPORTANCE_LEVELS:
             # Only add high-importance events that aren't already covered
-            if not any(c["name"].find(event["name"]) >= 0 for c in campaigns):
+            if not any(event["name"] in c["name"] for c in campaigns):
                 event_campaign = {
                     "name": f"حملة {event['name']}",
                     "timing": ", ".join([str(m) for m in event["months"]]),
@@ -648,7 +866,7 @@ def generate_marketing_campaigns(peak_months, strongest_season, weakest_season,
     
     # Add product-specific campaign if we have top products
     if len(top_products) > 0:
-        top_product_name = top_products.iloc[0]["product_specification"]
+        top_product_name = top_products[0]["name"]
         campaigns.append({
             "name": f"حملة ترويج {top_product_name}",
             "timing": peak_months[0] if peak_months else "ديسمبر",
@@ -679,8 +897,7 @@ def generate_business_recommendations(category, strongest_season, weakest_season
     has_increasing_price_trend = False
     
     if len(yearly_performance) >= 2:
-        recent_years = sorted(yearly_performance, key=lambda x: x["year"])[-2:]
-        latest = recent_years[-1]
+        latest = max(yearly_performance, key=lambda x: x["year"])
         
         if "quantityGrowth" in latest and latest["quantityGrowth"] < 0:
             has_declining_trend = True
@@ -749,14 +966,8 @@ def generate_business_recommendations(category, strongest_season, weakest_season
         })
     
     # Special recommendations for specific categories
-    if "مدارس" in category.lower() or "اطفال" in category.lower():
-        school_season_found = False
-        for event in seasonal_events:
-            if event["name"] == "العودة للمدارس":
-                school_season_found = True
-                break
-        
-        if school_season_found:
+    if mentions_school_category(category):
+        if any(event["name"] == "العودة للمدارس" for event in seasonal_events):
             business_recommendations.append({
                 "title": "استراتيجية خاصة لموسم العودة للمدارس",
                 "type": "primary",
@@ -777,7 +988,7 @@ def generate_business_recommendations(category, strongest_season, weakest_season
             "type": "secondary",
             "icon": "Inventory",
             "recommendations": [
-                f"التركيز على تشكيلة واسعة من {top_products.iloc[0]['product_specification']}",
+                f"التركيز على تشكيلة واسعة من {top_products[0]['name']}",
                 "تطوير عروض خاصة للمنتجات الأكثر مبيعاً",
                 "قياس رضا العملاء عن المنتجات الرئيسية بشكل مستمر",
                 "البحث عن منتجات متكاملة للبيع المتقاطع",
@@ -824,27 +1035,25 @@ def prepare_seasonal_chart_data(seasonal_data):
     }
 
 @sales_strategy_bp.route('/categories', methods=['GET'])
+@cached_response()
 def get_categories():
     """Get available categories from the database."""
     try:
-        init_db()
-        
         # Get distinct categories from item_specification_monthly_demand
         collection = get_collection("item_specification_monthly_demand")
         categories = collection.distinct("القسم")
         
-        return jsonify(categories), 200
+        return orjson_response(categories)
         
     except Exception as e:
         print(f" Error getting categories: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 @sales_strategy_bp.route('/products-by-category/<category>', methods=['GET'])
+@cached_response()
 def get_products_by_category(category):
     """Get product specifications for a given category."""
     try:
-        init_db()
-        
         if not category:
             return jsonify({"error": "Category is required"}), 400
         
@@ -852,518 +1061,532 @@ def get_products_by_category(category):
         collection = get_collection("item_specification_monthly_demand")
         products = collection.distinct("product_specification", {"القسم": category})
         
-        return jsonify(products), 200
+        return orjson_response(products)
         
     except Exception as e:
         print(f" Error getting products for category {category}: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+def analyze_yearly_comparison(df):
+    """
+    Year-over-year comparison of a category's (year, month) totals.
+
+    :param df: DataFrame from load_category_year_month.
+    :return: Dict with yearlyComparison (oldest year first) and inflationImpact.
+    """
+    # Sum per year with plain dicts: the rollup holds at most 12 rows per
+    # year, too few for building grouped frames to pay off
+    quantity_by_year = defaultdict(int)
+    revenue_by_year = defaultdict(int)
+    for year, quantity, revenue in zip(
+        df["year"].tolist(), df["total_quantity"].tolist(), df["total_money_sold"].tolist()
+    ):
+        quantity_by_year[year] += quantity
+        revenue_by_year[year] += revenue
+    years = sorted(quantity_by_year)
+    quantities = [quantity_by_year[year] for year in years]
+    revenues = [revenue_by_year[year] for year in years]
+    
+    # Calculate average price
+    values = np.array([quantities, revenues, np.zeros(len(years))], dtype=np.float64).T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prices = values[:, 1] / values[:, 0]
+    values[:, 2] = np.round(np.nan_to_num(prices, nan=0.0, posinf=np.inf, neginf=-np.inf), 2)
+    
+    # Calculate growth rates
+    growth = np.round(growth_rates(values), 1)
+    
+    # Format for response (years in ascending order)
+    yearly_comparison = []
+    for year, quantity, revenue, price, (quantity_growth, revenue_growth, price_growth) in zip(
+        years, quantities, revenues, values[:, 2].tolist(), growth.tolist()
+    ):
+        comparison = {
+            "year": int(year),
+            "totalQuantity": int(quantity),
+            "totalRevenue": int(revenue),
+            "avgPrice": float(price),
+        }
+        
+        # Add growth rates if available (NaN != NaN)
+        if quantity_growth == quantity_growth:
+            comparison["quantityGrowth"] = quantity_growth
+        if revenue_growth == revenue_growth:
+            comparison["revenueGrowth"] = revenue_growth
+        if price_growth == price_growth:
+            comparison["priceGrowth"] = price_growth
+            
+        yearly_comparison.append(comparison)
+    
+    return {
+        "yearlyComparison": yearly_comparison,
+        "inflationImpact": detect_inflation_impact(yearly_comparison)
+    }
+
+def analyze_seasonal_events(df, category):
+    """
+    Peak months, seasons and seasonal event strategies of a category.
+
+    :param df: DataFrame from load_category_year_month.
+    :param category: Category the events and strategies are tailored to.
+    :return: Dict with peakMonths, strongestSeason, weakestSeason, seasonalEvents and inflationImpact.
+    """
+    # Monthly and yearly totals in one pass
+    monthly_agg, yearly_agg, _ = aggregate_year_month(df)
+    
+    # Add month names
+    monthly_agg["month_name"] = assign_month_name(monthly_agg["month"])
+    
+    # Find peak months
+    peak_months = monthly_agg.sort_values("total_quantity", ascending=False).head(3)
+    peak_month_names = peak_months["month_name"].tolist()
+    
+    # Add seasons to monthly data
+    monthly_agg["season"] = assign_season(monthly_agg["month"])
+    
+    # Aggregate by season
+    seasonal_agg = monthly_agg.groupby("season").agg({
+        "total_quantity": "sum",
+        "total_money_sold": "sum"
+    }).reset_index()
+    
+    # Find strongest and weakest seasons
+    strongest_season = seasonal_agg.loc[seasonal_agg["total_quantity"].idxmax(), "season"]
+    weakest_season = seasonal_agg.loc[seasonal_agg["total_quantity"].idxmin(), "season"]
+    
+    # Define seasonal events
+    seasonal_events = build_seasonal_events(category, strongest_season, peak_month_names)
+    
+    # Check for year-over-year data to detect inflation impact
+    yearly_agg["avg_price"] = yearly_agg["total_money_sold"] / yearly_agg["total_quantity"]
+    yearly_agg = yearly_agg.dropna().reset_index(drop=True)
+    
+    yearly_performance = [
+        {
+            "year": int(year),
+            "totalQuantity": int(quantity),
+            "totalRevenue": int(revenue),
+            "avgPrice": float(price),
+        }
+        for year, quantity, revenue, price in zip(
+            yearly_agg["year"].tolist(),
+            yearly_agg["total_quantity"].tolist(),
+            yearly_agg["total_money_sold"].tolist(),
+            yearly_agg["avg_price"].tolist()
+        )
+    ]
+    
+    # Detect inflation impact
+    inflation_impact = detect_inflation_impact(yearly_performance)
+    
+    # Generate strategies for each event
+    for event in seasonal_events:
+        event["strategies"] = generate_event_strategies(event, category, inflation_impact)
+    
+    return {
+        "peakMonths": peak_month_names,
+        "strongestSeason": strongest_season,
+        "weakestSeason": weakest_season,
+        "seasonalEvents": seasonal_events,
+        "inflationImpact": inflation_impact
+    }
+
+def analyze_monthly_trends(df):
+    """
+    Per-month growth trends and per-month quantity/revenue by year of a category.
+
+    :param df: DataFrame from load_category_year_month (one row per (year, month)).
+    :return: Dict with monthlyTrends and monthlyDataByYear.
+    """
+    # Quantity and revenue per year, for each month: one pass over the rows
+    # in year order, so each month's years come out ascending
+    monthly_data_by_year = {name: {} for name in MONTH_NAMES}
+    order = np.argsort(df["year"].to_numpy(), kind="stable")
+    for year, month, quantity, revenue in zip(*(df[field].to_numpy()[order].tolist() for field in YEAR_MONTH_FIELDS)):
+        if 1 <= month <= 12:
+            monthly_data_by_year[MONTH_NAMES[int(month) - 1]][int(year)] = {
+                "quantity": int(quantity),
+                "revenue": int(revenue)
+            }
+    
+    return {
+        # Monthly growth trends over the most recent years (up to 3)
+        "monthlyTrends": compute_monthly_trends(df),
+        "monthlyDataByYear": monthly_data_by_year
+    }
+
 @sales_strategy_bp.route('/compare-years/<category>', methods=['GET'])
+@etag_from_collection(ROLLUP_COLLECTION)
 def compare_years(category):
     """Compare yearly performance for a specific category."""
     try:
-        init_db()
-        
         if not category:
             return jsonify({"error": "Category is required"}), 400
         
-        # Fetch data for the category
-        collection = get_collection("item_specification_monthly_demand")
-        data = list(collection.find({"القسم": category}, {"_id": 0}))
+        body = category_analysis_body(
+            "compare_years", category,
+            lambda df: {"category": category, **analyze_yearly_comparison(df)}
+        )
         
-        if not data:
+        if body is None:
             return jsonify({"error": f"No data found for category: {category}"}), 404
         
-        # Convert to DataFrame
-        df = pd.DataFrame(data)
-        
-        # Ensure numeric values
-        df["total_quantity"] = pd.to_numeric(df["total_quantity"], errors="coerce")
-        df["total_money_sold"] = pd.to_numeric(df["total_money_sold"], errors="coerce")
-        df["year"] = pd.to_numeric(df["year"], errors="coerce")
-        df["month"] = pd.to_numeric(df["month"], errors="coerce")
-        
-        # Group by year
-        yearly_agg = df.groupby("year").agg({
-            "total_quantity": "sum",
-            "total_money_sold": "sum"
-        }).reset_index()
-        
-        # Calculate average price
-        yearly_agg["avg_price"] = yearly_agg["total_money_sold"] / yearly_agg["total_quantity"]
-        yearly_agg["avg_price"] = yearly_agg["avg_price"].fillna(0).round(2)
-        
-        # Calculate growth rates
-        yearly_agg["quantity_growth"] = yearly_agg["total_quantity"].pct_change() * 100
-        yearly_agg["revenue_growth"] = yearly_agg["total_money_sold"].pct_change() * 100
-        yearly_agg["price_growth"] = yearly_agg["avg_price"].pct_change() * 100
-        
-        # Format for response
-        yearly_comparison = []
-        for _, row in yearly_agg.iterrows():
-            comparison = {
-                "year": int(row["year"]),
-                "totalQuantity": int(row["total_quantity"]),
-                "totalRevenue": int(row["total_money_sold"]),
-                "avgPrice": float(row["avg_price"]),
-            }
-            
-            # Add growth rates if available
-            if not pd.isna(row["quantity_growth"]):
-                comparison["quantityGrowth"] = float(round(row["quantity_growth"], 1))
-            if not pd.isna(row["revenue_growth"]):
-                comparison["revenueGrowth"] = float(round(row["revenue_growth"], 1))
-            if not pd.isna(row["price_growth"]):
-                comparison["priceGrowth"] = float(round(row["price_growth"], 1))
-                
-            yearly_comparison.append(comparison)
-        
-        # Sort by year
-        yearly_comparison = sorted(yearly_comparison, key=lambda x: x["year"])
-        
-        # Detect inflation impact
-        inflation_impact = detect_inflation_impact(yearly_comparison)
-        
-        return jsonify({
-            "category": category,
-            "yearlyComparison": yearly_comparison,
-            "inflationImpact": inflation_impact
-        }), 200
+        return Response(body, content_type=JSON_CONTENT_TYPE), 200
         
     except Exception as e:
         print(f" Error comparing years for category {category}: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 @sales_strategy_bp.route('/seasonal-events/<category>', methods=['GET'])
+@etag_from_collection(ROLLUP_COLLECTION)
 def get_seasonal_events(category):
     """Get seasonal events impact for a specific category."""
     try:
-        init_db()
-        
         if not category:
             return jsonify({"error": "Category is required"}), 400
         
-        # Fetch data for the category
-        collection = get_collection("item_specification_monthly_demand")
-        data = list(collection.find({"القسم": category}, {"_id": 0}))
+        body = category_analysis_body(
+            "seasonal_events", category,
+            lambda df: {"category": category, **analyze_seasonal_events(df, category)}
+        )
         
-        if not data:
+        if body is None:
             return jsonify({"error": f"No data found for category: {category}"}), 404
         
-        # Convert to DataFrame
-        df = pd.DataFrame(data)
-        
-        # Ensure numeric values
-        df["total_quantity"] = pd.to_numeric(df["total_quantity"], errors="coerce")
-        df["total_money_sold"] = pd.to_numeric(df["total_money_sold"], errors="coerce")
-        df["year"] = pd.to_numeric(df["year"], errors="coerce")
-        df["month"] = pd.to_numeric(df["month"], errors="coerce")
-        
-        # Define month names
-        month_names = [
-            'يناير', 'فبراير', 'مارس', 'أبريل', 'مايو', 'يونيو',
-            'يوليو', 'أغسطس', 'سبتمبر', 'أكتوبر', 'نوفمبر', 'ديسمبر'
-        ]
-        
-        # Create month name mapping
-        month_name_map = {i+1: name for i, name in enumerate(month_names)}
-        
-        # Monthly analysis
-        monthly_agg = df.groupby("month").agg({
-            "total_quantity": "sum",
-            "total_money_sold": "sum"
-        }).reset_index()
-        
-        # Add month names
-        monthly_agg["month_name"] = monthly_agg["month"].map(month_name_map)
-        
-        # Find peak months
-        peak_months = monthly_agg.sort_values("total_quantity", ascending=False).head(3)
-        peak_month_names = peak_months["month_name"].tolist()
-        
-        # Define seasons
-        winter_months = [12, 1, 2]
-        spring_months = [3, 4, 5]
-        summer_months = [6, 7, 8]
-        fall_months = [9, 10, 11]
-        
-        # Function to assign season
-        def get_season(month):
-            if month in winter_months:
-                return "الشتاء"
-            elif month in spring_months:
-                return "الربيع"
-            elif month in summer_months:
-                return "الصيف"
-            else:
-                return "الخريف"
-        
-        # Add seasons to monthly data
-        monthly_agg["season"] = monthly_agg["month"].apply(get_season)
-        
-        # Aggregate by season
-        seasonal_agg = monthly_agg.groupby("season").agg({
-            "total_quantity": "sum",
-            "total_money_sold": "sum"
-        }).reset_index()
-        
-        # Find strongest and weakest seasons
-        strongest_season = seasonal_agg.loc[seasonal_agg["total_quantity"].idxmax(), "season"]
-        weakest_season = seasonal_agg.loc[seasonal_agg["total_quantity"].idxmin(), "season"]
-        
-        # Define seasonal events
-        seasonal_events = [
-            {
-                "name": "رمضان",
-                "months": [8, 9, 10],  # Approximate Hijri months in Gregorian calendar
-                "description": "شهر رمضان المبارك",
-                "strategicImportance": "مرتفعة" if strongest_season in ["الصيف", "الخريف"] else "متوسطة",
-                "salesPattern": "ارتفاع" if strongest_season in ["الصيف", "الخريف"] else "معتدل",
-            },
-            {
-                "name": "عيد الفطر",
-                "months": [9, 10],
-                "description": "عيد الفطر المبارك",
-                "strategicImportance": "مرتفعة جداً" if "سبتمبر" in peak_month_names or "أكتوبر" in peak_month_names else "مرتفعة",
-                "salesPattern": "ارتفاع حاد" if "سبتمبر" in peak_month_names or "أكتوبر" in peak_month_names else "ارتفاع",
-            },
-            {
-                "name": "عيد الأضحى",
-                "months": [11, 12],
-                "description": "عيد الأضحى المبارك",
-                "strategicImportance": "مرتفعة جداً" if "نوفمبر" in peak_month_names or "ديسمبر" in peak_month_names else "مرتفعة",
-                "salesPattern": "ارتفاع حاد" if "نوفمبر" in peak_month_names or "ديسمبر" in peak_month_names else "ارتفاع",
-            },
-            {
-                "name": "العودة للمدارس",
-                "months": [8, 9],  # August/September
-                "description": "موسم العودة للمدارس",
-                "strategicImportance": "مرتفعة جداً" if category.lower() in ["مدارس", "اطفال"] or "سبتمبر" in peak_month_names else "متوسطة",
-                "salesPattern": "ارتفاع حاد" if category.lower() in ["مدارس", "اطفال"] or "سبتمبر" in peak_month_names else "معتدل",
-            },
-            {
-                "name": "الصيف",
-                "months": [6, 7, 8],  # June, July, August
-                "description": "موسم الصيف",
-                "strategicImportance": "مرتفعة" if strongest_season == "الصيف" else "متوسطة",
-                "salesPattern": "ارتفاع" if strongest_season == "الصيف" else "معتدل",
-            },
-            {
-                "name": "الشتاء",
-                "months": [12, 1, 2],  # December, January, February
-                "description": "موسم الشتاء",
-                "strategicImportance": "مرتفعة" if strongest_season == "الشتاء" else "متوسطة",
-                "salesPattern": "ارتفاع" if strongest_season == "الشتاء" else "معتدل",
-            }
-        ]
-        
-        # Check for year-over-year data to detect inflation impact
-        yearly_agg = df.groupby("year").agg({
-            "total_quantity": "sum",
-            "total_money_sold": "sum"
-        }).reset_index()
-        
-        yearly_agg["avg_price"] = yearly_agg["total_money_sold"] / yearly_agg["total_quantity"]
-        yearly_agg = yearly_agg.dropna().reset_index(drop=True)
-        
-        yearly_performance = []
-        for _, row in yearly_agg.iterrows():
-            performance = {
-                "year": int(row["year"]),
-                "totalQuantity": int(row["total_quantity"]),
-                "totalRevenue": int(row["total_money_sold"]),
-                "avgPrice": float(row["avg_price"]),
-            }
-            yearly_performance.append(performance)
-        
-        # Detect inflation impact
-        inflation_impact = detect_inflation_impact(yearly_performance)
-        
-        # Generate strategies for each event
-        for event in seasonal_events:
-            event["strategies"] = generate_event_strategies(event, category, inflation_impact)
-        
-        return jsonify({
-            "category": category,
-            "peakMonths": peak_month_names,
-            "strongestSeason": strongest_season,
-            "weakestSeason": weakest_season,
-            "seasonalEvents": seasonal_events,
-            "inflationImpact": inflation_impact
-        }), 200
+        return Response(body, content_type=JSON_CONTENT_TYPE), 200
         
     except Exception as e:
         print(f" Error getting seasonal events for category {category}: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 @sales_strategy_bp.route('/monthly-trends/<category>', methods=['GET'])
-def get_monthly_trends(category):
+@etag_from_collection(ROLLUP_COLLECTION)
+def get_category_monthly_trends(category):
     """Get monthly trends across years for a specific category."""
     try:
-        init_db()
-        
         if not category:
             return jsonify({"error": "Category is required"}), 400
         
-        # Fetch data for the category
-        collection = get_collection("item_specification_monthly_demand")
-        data = list(collection.find({"القسم": category}, {"_id": 0}))
+        body = category_analysis_body(
+            "monthly_trends", category,
+            lambda df: {"category": category, **analyze_monthly_trends(df)}
+        )
         
-        if not data:
+        if body is None:
             return jsonify({"error": f"No data found for category: {category}"}), 404
         
-        # Convert to DataFrame
-        df = pd.DataFrame(data)
+        return Response(body, content_type=JSON_CONTENT_TYPE), 200
         
-        # Ensure numeric values
-        df["total_quantity"] = pd.to_numeric(df["total_quantity"], errors="coerce")
-        df["total_money_sold"] = pd.to_numeric(df["total_money_sold"], errors="coerce")
-        df["year"] = pd.to_numeric(df["year"], errors="coerce")
-        df["month"] = pd.to_numeric(df["month"], errors="coerce")
-        
-        # Define month names
-        month_names = [
-            'يناير', 'فبراير', 'مارس', 'أبريل', 'مايو', 'يونيو',
-            'يوليو', 'أغسطس', 'سبتمبر', 'أكتوبر', 'نوفمبر', 'ديسمبر'
-        ]
-        
-        # Create month name mapping
-        month_name_map = {i+1: name for i, name in enumerate(month_names)}
-        
-        # Group by year and month
-        monthly_yearly_agg = df.groupby(["year", "month"]).agg({
-            "total_quantity": "sum",
-            "total_money_sold": "sum"
-        }).reset_index()
-        
-        # Add month names
-        monthly_yearly_agg["month_name"] = monthly_yearly_agg["month"].map(month_name_map)
-        
-        # Get the most recent years (up to 3) for trend analysis
-        recent_years = sorted(monthly_yearly_agg["year"].unique(), reverse=True)[:3]
-        
-        # Monthly trends by year
-        monthly_trends = {}
-        monthly_data_by_year = {}
+    except Exception as e:
+        print(f" Error getting monthly trends for category {category}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@sales_strategy_bp.route('/full-analysis/<category>', methods=['GET'])
+@etag_from_collection(ROLLUP_COLLECTION)
+def get_full_analysis(category):
+    """Get the yearly, seasonal and monthly analyses of a category in one response."""
+    try:
+        if not category:
+            return jsonify({"error": "Category is required"}), 400
         
-        for month in range(1, 13):
-            month_data = monthly_yearly_agg[monthly_yearly_agg["month"] == month]
-            month_data_by_year = {}
-            
-            for year in sorted(month_data["year"].unique()):
-                year_data = month_data[month_data["year"] == year]
-                if not year_data.empty:
-                    month_data_by_year[int(year)] = {
-                        "quantity": int(year_data["total_quantity"].iloc[0]),
-                        "revenue": int(year_data["total_money_sold"].iloc[0])
-                    }
-            
-            monthly_data_by_year[month_name_map[month]] = month_data_by_year
-            
-            # Calculate trends for recent years
-            recent_month_data = month_data[month_data["year"].isin(recent_years)].sort_values("year")
-            
-            # Skip if less than 2 years of data
-            if len(recent_month_data) < 2:
-                continue
-                
-            # Calculate year-over-year growth
-            first_year = recent_month_data.iloc[0]["year"]
-            last_year = recent_month_data.iloc[-1]["year"]
-            first_qty = recent_month_data.iloc[0]["total_quantity"]
-            last_qty = recent_month_data.iloc[-1]["total_quantity"]
-            
-            # Calculate average annual growth rate
-            if len(recent_month_data) > 1 and first_qty > 0:
-                years_diff = last_year - first_year
-                if years_diff > 0:
-                    compound_growth = ((last_qty / first_qty) ** (1 / years_diff)) - 1
-                    growth_percent = compound_growth * 100
-                else:
-                    growth_percent = ((last_qty - first_qty) / first_qty) * 100
-            else:
-                growth_percent = 0
-                
-            monthly_trends[month_name_map[month]] = {
-                "growthRate": round(growth_percent, 1),
-                "lastYear": int(last_year),
-                "lastQuantity": int(last_qty),
-                "trend": "upward" if growth_percent > 5 else "downward" if growth_percent < -5 else "stable"
+        # One rollup read feeds all three analyses
+        body = category_analysis_body(
+            "full_analysis", category,
+            lambda df: {
+                "category": category,
+                "yearly": analyze_yearly_comparison(df),
+                "seasonal": analyze_seasonal_events(df, category),
+                "monthly": analyze_monthly_trends(df)
             }
+        )
         
-        return {
-            "category": category,
-            "monthlyTrends": monthly_trends,
-            "monthlyDataByYear": monthly_data_by_year
-        }
+        if body is None:
+            return jsonify({"error": f"No data found for category: {category}"}), 404
+        
+        return Response(body, content_type=JSON_CONTENT_TYPE), 200
         
     except Exception as e:
-        print(f" Error getting monthly trends for category {category}: {str(e)}")
-        raise
+        print(f" Error getting full analysis for category {category}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+def build_seasonal_recommendations(df, category):
+    """
+    Combine the seasonal, monthly and yearly analyses of a category into recommendations.
+
+    :param df: DataFrame from load_category_year_month.
+    :param category: Category the recommendations are for.
+    :return: Recommendations payload.
+    """
+    # Analyze seasonal patterns and events
+    seasonal_events_data = analyze_seasonal_events(df, category)
+    
+    # Get monthly trends
+    monthly_trends_data = analyze_monthly_trends(df)
+    
+    # Analyze year-over-year performance
+    yearly_comparison_data = analyze_yearly_comparison(df)
+    
+    # Combine all analyses for comprehensive recommendations
+    return {
+        "category": category,
+        "seasonalEvents": seasonal_events_data.get("seasonalEvents", []),
+        "peakMonths": seasonal_events_data.get("peakMonths", []),
+        "strongestSeason": seasonal_events_data.get("strongestSeason", ""),
+        "weakestSeason": seasonal_events_data.get("weakestSeason", ""),
+        "monthlyTrends": monthly_trends_data.get("monthlyTrends", {}),
+        "yearlyComparison": yearly_comparison_data.get("yearlyComparison", []),
+        "inflationImpact": yearly_comparison_data.get("inflationImpact", {"detected": False}),
+        "marketingStrategies": generate_marketing_strategies(
+            category, 
+            seasonal_events_data,
+            monthly_trends_data,
+            yearly_comparison_data
+        ),
+        "pricingStrategies": generate_pricing_strategies(
+            category,
+            seasonal_events_data,
+            yearly_comparison_data
+        ),
+        "inventoryStrategies": generate_inventory_strategies(
+            category,
+            seasonal_events_data,
+            monthly_trends_data
+        )
+    }
 
 @sales_strategy_bp.route('/seasonal-recommendations/<category>', methods=['GET'])
+@etag_from_collection(ROLLUP_COLLECTION)
 def get_seasonal_recommendations(category):
     """Get detailed seasonal recommendations for a specific category."""
     try:
-        init_db()
-        
         if not category:
             return jsonify({"error": "Category is required"}), 400
-            
-        # Analyze seasonal patterns and events
-        seasonal_events_data = get_seasonal_events(category)
-        
-        # Get monthly trends
-        monthly_trends_data = get_monthly_trends(category)
         
-        # Analyze year-over-year performance
-        yearly_comparison_data = compare_years(category)
+        # Every analysis runs on the same frame, loaded once
+        body = category_analysis_body(
+            "seasonal_recommendations", category,
+            lambda df: build_seasonal_recommendations(df, category)
+        )
         
-        # Combine all analyses for comprehensive recommendations
-        recommendations = {
-            "category": category,
-            "seasonalEvents": seasonal_events_data.get("seasonalEvents", []),
-            "peakMonths": seasonal_events_data.get("peakMonths", []),
-            "strongestSeason": seasonal_events_data.get("strongestSeason", ""),
-            "weakestSeason": seasonal_events_data.get("weakestSeason", ""),
-            "monthlyTrends": monthly_trends_data.get("monthlyTrends", {}),
-            "yearlyComparison": yearly_comparison_data.get("yearlyComparison", []),
-            "inflationImpact": yearly_comparison_data.get("inflationImpact", {"detected": False}),
-            "marketingStrategies": generate_marketing_strategies(
-                category, 
-                seasonal_events_data,
-                monthly_trends_data,
-                yearly_comparison_data
-            ),
-            "pricingStrategies": generate_pricing_strategies(
-                category,
-                seasonal_events_data,
-                yearly_comparison_data
-            ),
-            "inventoryStrategies": generate_inventory_strategies(
-                category,
-                seasonal_events_data,
-                monthly_trends_data
-            )
-        }
+        if body is None:
+            return jsonify({"error": f"No data found for category: {category}"}), 404
         
-        return jsonify(recommendations), 200
+        return Response(body, content_type=JSON_CONTENT_TYPE), 200
         
     except Exception as e:
         print(f" Error generating seasonal recommendations for {category}: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+# Fixed tactic lists of the marketing/pricing/inventory recommendations; only
+# the season, event and month names are filled in per category
+STRONG_SEASON_MARKETING_TACTICS = (
+    "زيادة الميزانية الإعلانية بنسبة 25-30% خلال هذا الموسم",
+    "التركيز على عرض المنتجات الأكثر طلباً في واجهة العرض",
+    "إطلاق حملات على وسائل التواصل الاجتماعي قبل الموسم بأسبوعين",
+    "تنظيم فعاليات ترويجية خاصة خلال فترة الذروة"
+)
+
+WEAK_SEASON_MARKETING_TACTICS = (
+    "تقديم عروض ترويجية حصرية خلال هذا الموسم",
+    "إطلاق منتجات جديدة أو حصرية لجذب اهتمام العملاء",
+    "التركيز على حملات الولاء واستهداف العملاء الحاليين",
+    "الترويج للقيمة المضافة للمنتجات بدلاً من التركيز على السعر فقط"
+)
+
+INFLATION_MARKETING_STRATEGY = {
+    "type": "economic",
+    "title": "استراتيجية التسويق في ظل التضخم",
+    "description": "تعديل الاستراتيجية التسويقية لمواجهة تأثير التضخم على سلوك المستهلك",
+    "tactics": (
+        "التركيز على إبراز القيمة المضافة للمنتجات لتبرير الأسعار",
+        "تطوير حملات تروج لجودة المنتجات وعمرها الافتراضي",
+        "تقديم خيارات دفع مرنة أو خطط تقسيط لتسهيل الشراء",
+        "إطلاق منتجات بفئات سعرية مختلفة لتناسب مختلف القدرات الشرائية",
+        "تطوير برامج ولاء تقدم مزايا غير سعرية للعملاء"
+    )
+}
+
+EID_MARKETING_TACTICS = (
+    "إطلاق حملة ترويجية قبل العيد بثلاثة أسابيع",
+    "تصميم عروض هدايا مميزة مع تغليف خاص للعيد",
+    "تنفيذ استراتيجية تسويق متكاملة عبر القنوات المختلفة",
+    "تقديم خصومات تصاعدية مع زيادة قيمة المشتريات"
+)
+
+# Event name -> marketing tactics, for high-importance events
+EVENT_MARKETING_TACTICS = {
+    "رمضان": (
+        "تصميم حملات إعلانية تعكس روح شهر رمضان",
+        "تكثيف الإعلانات خلال فترات المساء بعد الإفطار",
+        "تقديم عروض خاصة تناسب احتياجات التسوق الرمضانية",
+        "إطلاق حملات تسويق تفاعلية على منصات التواصل الاجتماعي"
+    ),
+    "عيد الفطر": EID_MARKETING_TACTICS,
+    "عيد الأضحى": EID_MARKETING_TACTICS,
+    "العودة للمدارس": (
+        "إطلاق حملة 'العودة للمدرسة' قبل بداية العام الدراسي بشهر",
+        "تقديم عروض خاصة للمشتريات العائلية أو للمدارس",
+        "تطوير حملات تسويقية تستهدف الأهالي والطلاب",
+        "الترويج لمنتجات متكاملة كحزم متكاملة بسعر مميز"
+    )
+}
+
+RECOVERY_MARKETING_TACTICS = (
+    "تحليل أسباب انخفاض المبيعات في هذه الشهور",
+    "تقديم عروض ترويجية مخصصة خلال هذه الفترات",
+    "تكثيف التواصل مع العملاء من خلال حملات عبر البريد الإلكتروني والرسائل",
+    "تطوير أنشطة تسويقية مبتكرة لجذب العملاء خلال هذه الفترات"
+)
+
+# Event name -> pricing tactic ({event} is the event name), for high-importance events
+EVENT_PRICING_TACTICS = {
+    "عيد الفطر": "تطبيق أسعار خاصة لمنتجات {event} مع التركيز على جودة المنتج",
+    "عيد الأضحى": "تطبيق أسعار خاصة لمنتجات {event} مع التركيز على جودة المنتج",
+    "العودة للمدارس": "تقديم خصومات تصاعدية على مشتريات العودة للمدارس كلما زادت الكمية",
+    "رمضان": "تطوير باقات منتجات بأسعار خاصة خلال شهر رمضان"
+}
+
+INFLATION_PRICING_TACTICS = (
+    "زيادة الأسعار تدريجياً بدلاً من زيادات كبيرة مفاجئة",
+    "تطوير منتجات بفئات سعرية متنوعة لتلبية احتياجات مختلف العملاء",
+    "تقديم خصومات استراتيجية على منتجات مختارة لزيادة حجم المبيعات"
+)
+
+HIGH_INFLATION_PRICING_TACTICS = (
+    "تخفيض هامش الربح على بعض المنتجات للحفاظ على حجم المبيعات",
+    "إعادة تقييم هيكل التكاليف للبحث عن فرص لخفض التكاليف"
+)
+
+VALUE_PRICING_STRATEGY = {
+    "type": "value",
+    "title": "استراتيجية التسعير على أساس القيمة",
+    "description": "تسعير المنتجات على أساس القيمة المقدمة للعملاء وليس فقط التكلفة",
+    "tactics": (
+        "إبراز مزايا وفوائد المنتجات لتبرير أسعارها",
+        "تقديم ضمانات وخدمات إضافية لتعزيز القيمة المدركة",
+        "تصنيف المنتجات وفقاً لمستويات جودة مختلفة مع تسعير مناسب لكل مستوى",
+        "إجراء استطلاعات دورية لقياس مدى تقبل العملاء للأسعار"
+    )
+}
+
+STRONG_SEASON_INVENTORY_TACTICS = (
+    "توسيع تشكيلة المنتجات المعروضة خلال هذا الموسم",
+    "تأمين خط إمداد مرن ومستمر خلال فترة الذروة",
+    "تعزيز نظام تتبع المخزون لتفادي نفاد المنتجات الأكثر طلباً"
+)
+
+WEAK_SEASON_INVENTORY_TACTICS = (
+    "التركيز على المنتجات الأساسية والأكثر مبيعاً",
+    "جدولة عمليات الجرد وإعادة التنظيم خلال هذا الموسم",
+    "تطوير برامج تصفية للمنتجات بطيئة الحركة"
+)
+
+EID_INVENTORY_TACTICS = (
+    "زيادة المخزون قبل {event} بثلاثة أسابيع على الأقل",
+    "توفير مخزون إضافي للمنتجات الأكثر طلباً خلال العيد",
+    "تحضير مواد تغليف خاصة بالعيد مسبقاً"
+)
+
+# Event name -> inventory tactics ({event} is the event name), for high-importance events
+EVENT_INVENTORY_TACTICS = {
+    "عيد الفطر": EID_INVENTORY_TACTICS,
+    "عيد الأضحى": EID_INVENTORY_TACTICS,
+    "العودة للمدارس": (
+        "تحضير مخزون متنوع من المنتجات المدرسية قبل بداية العام الدراسي بشهرين",
+        "وضع خطة توريد مرنة تستجيب للطلب المتزايد",
+        "تنظيم المخزون وفقاً للفئات العمرية والمراحل الدراسية"
+    ),
+    "رمضان": (
+        "تعديل ساعات تجديد المخزون لتتناسب مع أنماط التسوق في رمضان",
+        "زيادة المخزون من المنتجات الأكثر طلباً في رمضان"
+    )
+}
+
+# Monthly inventory tactics; {} is the " و"-joined month names
+UPWARD_MONTHS_INVENTORY_TACTIC = "زيادة المخزون قبل أشهر {} التي تشهد نمواً في المبيعات"
+DOWNWARD_MONTHS_INVENTORY_TACTIC = "تخفيض المخزون خلال أشهر {} التي تشهد انخفاضاً في المبيعات"
+PEAK_MONTHS_INVENTORY_TACTIC = "تأمين كميات كافية من المنتجات الأكثر طلباً خلال أشهر الذروة {}"
+
+MONTHLY_INVENTORY_TACTICS = (
+    "تطوير نظام إنذار مبكر لانخفاض مستويات المخزون",
+    "تحليل بيانات المبيعات الشهرية بشكل دوري لتعديل خطط المخزون"
+)
+
+GENERAL_INVENTORY_STRATEGY = {
+    "type": "general",
+    "title": "استراتيجية إدارة المخزون العامة",
+    "description": "تحسين كفاءة إدارة المخزون بشكل عام على مدار السنة",
+    "tactics": (
+        "تطبيق نظام تصنيف ABC للمنتجات لتحديد أولويات إدارة المخزون",
+        "تحسين دقة توقعات الطلب باستخدام تحليل البيانات التاريخية",
+        "تطوير شراكات مرنة مع الموردين للاستجابة السريعة للتغيرات في الطلب",
+        "مراجعة وتحسين مستويات المخزون الاحتياطي بشكل دوري",
+        "تقليل وقت الانتظار بين الطلب والتوريد لتحسين دوران المخزون"
+    )
+}
+
+def strategy_from_template(template):
+    """Copy of a fixed strategy template with its own tactics list."""
+    return {**template, "tactics": list(template["tactics"])}
+
 def generate_marketing_strategies(category, seasonal_data, monthly_data, yearly_data):
     """Generate detailed marketing strategies based on all analyses."""
     strategies = []
+    add_strategy = strategies.append
     
     # Extract key data points
     strong_season = seasonal_data.get("strongestSeason", "")
     weak_season = seasonal_data.get("weakestSeason", "")
-    peak_months = seasonal_data.get("peakMonths", [])
     seasonal_events = seasonal_data.get("seasonalEvents", [])
     inflation_impact = yearly_data.get("inflationImpact", {"detected": False})
     monthly_trends = monthly_data.get("monthlyTrends", {})
     
     # Base marketing strategies for strong seasons and peak months
     if strong_season:
-        strategies.append({
+        add_strategy({
             "type": "seasonal",
             "title": f"استراتيجية تسويق موسم {strong_season}",
             "description": f"تكثيف الحملات التسويقية خلال موسم {strong_season} للاستفادة من ارتفاع الطلب",
-            "tactics": [
-                "زيادة الميزانية الإعلانية بنسبة 25-30% خلال هذا الموسم",
-                "التركيز على عرض المنتجات الأكثر طلباً في واجهة العرض",
-                "إطلاق حملات على وسائل التواصل الاجتماعي قبل الموسم بأسبوعين",
-                "تنظيم فعاليات ترويجية خاصة خلال فترة الذروة"
-            ]
+            "tactics": list(STRONG_SEASON_MARKETING_TACTICS)
         })
     
     # Marketing strategies for weak seasons to boost sales
     if weak_season:
-        strategies.append({
+        add_strategy({
             "type": "seasonal",
             "title": f"استراتيجية تحفيز المبيعات في موسم {weak_season}",
             "description": f"تنشيط المبيعات خلال موسم {weak_season} الذي يشهد انخفاضاً في الطلب",
-            "tactics": [
-                "تقديم عروض ترويجية حصرية خلال هذا الموسم",
-                "إطلاق منتجات جديدة أو حصرية لجذب اهتمام العملاء",
-                "التركيز على حملات الولاء واستهداف العملاء الحاليين",
-                "الترويج للقيمة المضافة للمنتجات بدلاً من التركيز على السعر فقط"
-            ]
+            "tactics": list(WEAK_SEASON_MARKETING_TACTICS)
         })
     
     # Add inflation-specific strategies if detected
     if inflation_impact and inflation_impact.get("detected", False):
-        strategies.append({
-            "type": "economic",
-            "title": "استراتيجية التسويق في ظل التضخم",
-            "description": "تعديل الاستراتيجية التسويقية لمواجهة تأثير التضخم على سلوك المستهلك",
-            "tactics": [
-                "التركيز على إبراز القيمة المضافة للمنتجات لتبرير الأسعار",
-                "تطوير حملات تروج لجودة المنتجات وعمرها الافتراضي",
-                "تقديم خيارات دفع مرنة أو خطط تقسيط لتسهيل الشراء",
-                "إطلاق منتجات بفئات سعرية مختلفة لتناسب مختلف القدرات الشرائية",
-                "تطوير برامج ولاء تقدم مزايا غير سعرية للعملاء"
-            ]
-        })
+        add_strategy(strategy_from_template(INFLATION_MARKETING_STRATEGY))
     
-    # Add strategies for specific events
+    # Add strategies for specific events (seasons such as الصيف/الشتاء have no
+    # event tactics, so they are covered by the seasonal strategies above)
     for event in seasonal_events:
-        if event.get("strategicImportance") in ["مرتفعة", "مرتفعة جداً"]:
+        if event.get("strategicImportance") in HIGH_IMPORTANCE_LEVELS:
             event_name = event.get("name", "")
-            
-            # Skip if already covered in seasonal strategies
-            if (event_name == "الصيف" and strong_season == "الصيف") or \
-               (event_name == "الشتاء" and strong_season == "الشتاء"):
-                continue
-                
-            event_strategies = []
-            
-            if event_name == "رمضان":
-                event_strategies = [
-                    "تصميم حملات إعلانية تعكس روح شهر رمضان",
-                    "تكثيف الإعلانات خلال فترات المساء بعد الإفطار",
-                    "تقديم عروض خاصة تناسب احتياجات التسوق الرمضانية",
-                    "إطلاق حملات تسويق تفاعلية على منصات التواصل الاجتماعي"
-                ]
-            elif event_name in ["عيد الفطر", "عيد الأضحى"]:
-                event_strategies = [
-                    "إطلاق حملة ترويجية قبل العيد بثلاثة أسابيع",
-                    "تصميم عروض هدايا مميزة مع تغليف خاص للعيد",
-                    "تنفيذ استراتيجية تسويق متكاملة عبر القنوات المختلفة",
-                    "تقديم خصومات تصاعدية مع زيادة قيمة المشتريات"
-                ]
-            elif event_name == "العودة للمدارس":
-                event_strategies = [
-                    "إطلاق حملة 'العودة للمدرسة' قبل بداية العام الدراسي بشهر",
-                    "تقديم عروض خاصة للمشتريات العائلية أو للمدارس",
-                    "تطوير حملات تسويقية تستهدف الأهالي والطلاب",
-                    "الترويج لمنتجات متكاملة كحزم متكاملة بسعر مميز"
-                ]
+            event_strategies = EVENT_MARKETING_TACTICS.get(event_name)
             
             if event_strategies:
-                strategies.append({
+                add_strategy({
                     "type": "event",
                     "title": f"استراتيجية تسويق {event_name}",
                     "description": f"تحقيق أقصى استفادة من موسم {event_name}",
-                    "tactics": event_strategies
+                    "tactics": list(event_strategies)
                 })
     
     # Add strategies for months with declining sales trends
     declining_months = [month for month, data in monthly_trends.items() if data.get("trend") == "downward"]
     if declining_months:
         months_str = " و".join(declining_months)
-        strategies.append({
+        add_strategy({
             "type": "recovery",
             "title": f"استراتيجية تحسين أداء المبيعات في شهور {months_str}",
             "description": "معالجة انخفاض الأداء في الشهور التي تظهر اتجاهاً هبوطياً",
-            "tactics": [
-                "تحليل أسباب انخفاض المبيعات في هذه الشهور",
-                "تقديم عروض ترويجية مخصصة خلال هذه الفترات",
-                "تكثيف التواصل مع العملاء من خلال حملات عبر البريد الإلكتروني والرسائل",
-                "تطوير أنشطة تسويقية مبتكرة لجذب العملاء خلال هذه الفترات"
-            ]
+            "tactics": list(RECOVERY_MARKETING_TACTICS)
         })
     
     return strategies
@@ -1371,16 +1594,16 @@ def generate_marketing_strategies(category, seasonal_data, monthly_data, yearly_
 def generate_pricing_strategies(category, seasonal_data, yearly_data):
     """Generate pricing strategies based on seasonal patterns and economic indicators."""
     strategies = []
+    add_strategy = strategies.append
     
     # Extract key data
     strong_season = seasonal_data.get("strongestSeason", "")
     weak_season = seasonal_data.get("weakestSeason", "")
     seasonal_events = seasonal_data.get("seasonalEvents", [])
     inflation_impact = yearly_data.get("inflationImpact", {"detected": False})
-    yearly_comparison = yearly_data.get("yearlyComparison", [])
     
     # General seasonal pricing strategy
-    strategies.append({
+    add_strategy({
         "type": "seasonal",
         "title": "استراتيجية التسعير الموسمية",
         "description": "تعديل الأسعار وفقاً للطلب الموسمي لتحقيق أقصى ربحية",
@@ -1395,21 +1618,14 @@ def generate_pricing_strategies(category, seasonal_data, yearly_data):
     # Pricing strategies for special events
     event_pricing_tactics = []
     for event in seasonal_events:
-        if event.get("strategicImportance") in ["مرتفعة", "مرتفعة جداً"]:
+        if event.get("strategicImportance") in HIGH_IMPORTANCE_LEVELS:
             event_name = event.get("name", "")
-            
-            if event_name in ["عيد الفطر", "عيد الأضحى"]:
-                tactic = f"تطبيق أسعار خاصة لمنتجات {event_name} مع التركيز على جودة المنتج"
-                event_pricing_tactics.append(tactic)
-            elif event_name == "العودة للمدارس":
-                tactic = "تقديم خصومات تصاعدية على مشتريات العودة للمدارس كلما زادت الكمية"
-                event_pricing_tactics.append(tactic)
-            elif event_name == "رمضان":
-                tactic = "تطوير باقات منتجات بأسعار خاصة خلال شهر رمضان"
-                event_pricing_tactics.append(tactic)
+            tactic = EVENT_PRICING_TACTICS.get(event_name)
+            if tactic:
+                event_pricing_tactics.append(tactic.format(event=event_name))
     
     if event_pricing_tactics:
-        strategies.append({
+        add_strategy({
             "type": "event",
             "title": "استراتيجية تسعير المناسبات الخاصة",
             "description": "تعديل الأسعار خلال المناسبات الخاصة لتحقيق التوازن بين المبيعات والربحية",
@@ -1418,21 +1634,15 @@ def generate_pricing_strategies(category, seasonal_data, yearly_data):
     
     # Inflation-based pricing strategy
     if inflation_impact and inflation_impact.get("detected", False):
-        avg_price_increase = inflation_impact.get("avgPriceIncrease", 0)
         quantity_decrease = inflation_impact.get("quantityDecrease", 0)
         
-        inflation_tactics = [
-            "زيادة الأسعار تدريجياً بدلاً من زيادات كبيرة مفاجئة",
-            "تطوير منتجات بفئات سعرية متنوعة لتلبية احتياجات مختلف العملاء",
-            "تقديم خصومات استراتيجية على منتجات مختارة لزيادة حجم المبيعات"
-        ]
+        inflation_tactics = list(INFLATION_PRICING_TACTICS)
         
         # Add specific tactics based on severity
         if quantity_decrease > 15:  # High impact
-            inflation_tactics.append("تخفيض هامش الربح على بعض المنتجات للحفاظ على حجم المبيعات")
-            inflation_tactics.append("إعادة تقييم هيكل التكاليف للبحث عن فرص لخفض التكاليف")
+            inflation_tactics.extend(HIGH_INFLATION_PRICING_TACTICS)
         
-        strategies.append({
+        add_strategy({
             "type": "economic",
             "title": "استراتيجية التسعير في ظل التضخم",
             "description": "تعديل استراتيجية التسعير لمواجهة التضخم مع الحفاظ على حجم المبيعات",
@@ -1440,23 +1650,14 @@ def generate_pricing_strategies(category, seasonal_data, yearly_data):
         })
     
     # Value-based pricing strategy
-    strategies.append({
-        "type": "value",
-        "title": "استراتيجية التسعير على أساس القيمة",
-        "description": "تسعير المنتجات على أساس القيمة المقدمة للعملاء وليس فقط التكلفة",
-        "tactics": [
-            "إبراز مزايا وفوائد المنتجات لتبرير أسعارها",
-            "تقديم ضمانات وخدمات إضافية لتعزيز القيمة المدركة",
-            "تصنيف المنتجات وفقاً لمستويات جودة مختلفة مع تسعير مناسب لكل مستوى",
-            "إجراء استطلاعات دورية لقياس مدى تقبل العملاء للأسعار"
-        ]
-    })
+    add_strategy(strategy_from_template(VALUE_PRICING_STRATEGY))
     
     return strategies
 
 def generate_inventory_strategies(category, seasonal_data, monthly_data):
     """Generate inventory management strategies based on seasonal patterns."""
     strategies = []
+    add_strategy = strategies.append
     
     # Extract key data
     strong_season = seasonal_data.get("strongestSeason", "")
@@ -1467,117 +1668,109 @@ def generate_inventory_strategies(category, seasonal_data, monthly_data):
     
     # Base inventory strategy by season
     if strong_season:
-        strategies.append({
+        add_strategy({
             "type": "seasonal",
             "title": f"إدارة المخزون لموسم {strong_season}",
             "description": f"تحسين مستويات المخزون استعداداً لموسم {strong_season} الذي يشهد ارتفاعاً في الطلب",
             "tactics": [
                 f"زيادة مستويات المخزون قبل بداية موسم {strong_season} بشهر على الأقل",
-                "توسيع تشكيلة المنتجات المعروضة خلال هذا الموسم",
-                "تأمين خط إمداد مرن ومستمر خلال فترة الذروة",
-                "تعزيز نظام تتبع المخزون لتفادي نفاد المنتجات الأكثر طلباً"
+                *STRONG_SEASON_INVENTORY_TACTICS
             ]
         })
     
     if weak_season:
-        strategies.append({
+        add_strategy({
             "type": "seasonal",
             "title": f"إدارة المخزون لموسم {weak_season}",
             "description": f"تحسين كفاءة المخزون خلال موسم {weak_season} لتقليل التكاليف وتجنب التكدس",
             "tactics": [
                 f"تخفيض مستويات المخزون خلال موسم {weak_season} لتجنب التكدس",
-                "التركيز على المنتجات الأساسية والأكثر مبيعاً",
-                "جدولة عمليات الجرد وإعادة التنظيم خلال هذا الموسم",
-                "تطوير برامج تصفية للمنتجات بطيئة الحركة"
+                *WEAK_SEASON_INVENTORY_TACTICS
             ]
         })
     
     # Special event inventory strategies
-    event_inventory_tactics = {}
     for event in seasonal_events:
-        if event.get("strategicImportance") in ["مرتفعة", "مرتفعة جداً"]:
+        if event.get("strategicImportance") in HIGH_IMPORTANCE_LEVELS:
             event_name = event.get("name", "")
+            tactics = EVENT_INVENTORY_TACTICS.get(event_name)
             
-            if event_name not in event_inventory_tactics:
-                event_inventory_tactics[event_name] = []
-            
-            if event_name in ["عيد الفطر", "عيد الأضحى"]:
-                event_inventory_tactics[event_name].extend([
-                    f"زيادة المخزون قبل {event_name} بثلاثة أسابيع على الأقل",
-                    "توفير مخزون إضافي للمنتجات الأكثر طلباً خلال العيد",
-                    "تحضير مواد تغليف خاصة بالعيد مسبقاً"
-                ])
-            elif event_name == "العودة للمدارس":
-                event_inventory_tactics[event_name].extend([
-                    "تحضير مخزون متنوع من المنتجات المدرسية قبل بداية العام الدراسي بشهرين",
-                    "وضع خطة توريد مرنة تستجيب للطلب المتزايد",
-                    "تنظيم المخزون وفقاً للفئات العمرية والمراحل الدراسية"
-                ])
-            elif event_name == "رمضان":
-                event_inventory_tactics[event_name].extend([
-                    "تعديل ساعات تجديد المخزون لتتناسب مع أنماط التسوق في رمضان",
-                    "زيادة المخزون من المنتجات الأكثر طلباً في رمضان"
-                ])
-    
-    # Create strategies from event tactics
-    for event_name, tactics in event_inventory_tactics.items():
-        if tactics:
-            strategies.append({
-                "type": "event",
-                "title": f"إدارة المخزون لموسم {event_name}",
-                "description": f"تحسين إدارة المخزون استعداداً لموسم {event_name}",
-                "tactics": tactics
-            })
+            if tactics:
+                add_strategy({
+                    "type": "event",
+                    "title": f"إدارة المخزون لموسم {event_name}",
+                    "description": f"تحسين إدارة المخزون استعداداً لموسم {event_name}",
+                    "tactics": [tactic.format(event=event_name) for tactic in tactics]
+                })
     
     # Monthly inventory planning
-    upward_months = [month for month, data in monthly_trends.items() if data.get("trend") == "upward"]
-    downward_months = [month for month, data in monthly_trends.items() if data.get("trend") == "downward"]
+    upward_months = []
+    downward_months = []
+    for month, data in monthly_trends.items():
+        trend = data.get("trend")
+        if trend == "upward":
+            upward_months.append(month)
+        elif trend == "downward":
+            downward_months.append(month)
     
     monthly_inventory_tactics = []
     if upward_months:
-        months_str = " و".join(upward_months)
-        monthly_inventory_tactics.append(f"زيادة المخزون قبل أشهر {months_str} التي تشهد نمواً في المبيعات")
+        monthly_inventory_tactics.append(UPWARD_MONTHS_INVENTORY_TACTIC.format(" و".join(upward_months)))
     
     if downward_months:
-        months_str = " و".join(downward_months)
-        monthly_inventory_tactics.append(f"تخفيض المخزون خلال أشهر {months_str} التي تشهد انخفاضاً في المبيعات")
+        monthly_inventory_tactics.append(DOWNWARD_MONTHS_INVENTORY_TACTIC.format(" و".join(downward_months)))
     
     if peak_months:
-        months_str = " و".join(peak_months)
-        monthly_inventory_tactics.append(f"تأمين كميات كافية من المنتجات الأكثر طلباً خلال أشهر الذروة {months_str}")
+        monthly_inventory_tactics.append(PEAK_MONTHS_INVENTORY_TACTIC.format(" و".join(peak_months)))
     
     if monthly_inventory_tactics:
-        strategies.append({
+        add_strategy({
             "type": "monthly",
             "title": "خطة إدارة المخزون الشهرية",
             "description": "تحسين إدارة المخزون وفقاً للاتجاهات الشهرية للمبيعات",
-            "tactics": monthly_inventory_tactics + [
-                "تطوير نظام إنذار مبكر لانخفاض مستويات المخزون",
-                "تحليل بيانات المبيعات الشهرية بشكل دوري لتعديل خطط المخزون"
-            ]
+            "tactics": monthly_inventory_tactics + list(MONTHLY_INVENTORY_TACTICS)
         })
     
     # General inventory management
-    strategies.append({
-        "type": "general",
-        "title": "استراتيجية إدارة المخزون العامة",
-        "description": "تحسين كفاءة إدارة المخزون بشكل عام على مدار السنة",
-        "tactics": [
-            "تطبيق نظام تصنيف ABC للمنتجات لتحديد أولويات إدارة المخزون",
-            "تحسين دقة توقعات الطلب باستخدام تحليل البيانات التاريخية",
-            "تطوير شراكات مرنة مع الموردين للاستجابة السريعة للتغيرات في الطلب",
-            "مراجعة وتحسين مستويات المخزون الاحتياطي بشكل دوري",
-            "تقليل وقت الانتظار بين الطلب والتوريد لتحسين دوران المخزون"
-        ]
-    })
+    add_strategy(strategy_from_template(GENERAL_INVENTORY_STRATEGY))
     
     return strategies
 
+def build_performance_analysis(df, category, inflation_factor, analysis_notes):
+    """
+    Full performance analysis of a category: the three analyses, insights and recommendations.
+
+    :param df: DataFrame from load_category_year_month.
+    :param category: Category being analyzed.
+    :param inflation_factor: Expected inflation (percent) supplied by the user.
+    :param analysis_notes: Free-text notes echoed back in the response.
+    :return: Performance analysis payload.
+    """
+    # Run comprehensive analysis
+    seasonal = analyze_seasonal_events(df, category)
+    monthly = analyze_monthly_trends(df)
+    yearly = analyze_yearly_comparison(df)
+    analysis = {"seasonal": seasonal, "monthly": monthly, "yearly": yearly}
+    
+    return {
+        "category": category,
+        "analysis": analysis,
+        "inflationFactor": inflation_factor,
+        "analysisNotes": analysis_notes,
+        # Specialized analysis based on trends
+        "performanceInsights": generate_performance_insights(category, analysis, inflation_factor),
+        # Strategic recommendations
+        "strategicRecommendations": {
+            "marketing": generate_marketing_strategies(category, seasonal, monthly, yearly),
+            "pricing": generate_pricing_strategies(category, seasonal, yearly),
+            "inventory": generate_inventory_strategies(category, seasonal, monthly)
+        }
+    }
+
 @sales_strategy_bp.route('/performance-analysis/<category>', methods=['POST'])
 def analyze_performance(category):
     """Comprehensive performance analysis with user input for specific strategic needs."""
     try:
-        init_db()
         data = request.get_json()
         
         if not category:
@@ -1587,54 +1780,213 @@ def analyze_performance(category):
         inflation_factor = data.get('inflation_factor', 30)  # Default 30%
         analysis_notes = data.get('analysis_notes', '')
         
-        # Run comprehensive analysis
-        result = {
-            "category": category,
-            "analysis": {
-                "seasonal": get_seasonal_events(category),
-                "monthly": get_monthly_trends(category),
-                "yearly": compare_years(category)
-            },
-            "inflationFactor": inflation_factor,
-            "analysisNotes": analysis_notes
-        }
-        
-        # Add specialized analysis based on trends
-        result["performanceInsights"] = generate_performance_insights(
-            category, 
-            result["analysis"],
-            inflation_factor
+        # Same inputs and rollup version -> same body
+        body = category_analysis_body(
+            ("performance_analysis", request_key(inflation_factor, analysis_notes)), category,
+            lambda df: build_performance_analysis(df, category, inflation_factor, analysis_notes)
         )
         
-        # Generate strategic recommendations
-        result["strategicRecommendations"] = {
-            "marketing": generate_marketing_strategies(
-                category,
-                result["analysis"]["seasonal"],
-                result["analysis"]["monthly"],
-                result["analysis"]["yearly"]
-            ),
-            "pricing": generate_pricing_strategies(
-                category,
-                result["analysis"]["seasonal"],
-                result["analysis"]["yearly"]
-            ),
-            "inventory": generate_inventory_strategies(
-                category,
-                result["analysis"]["seasonal"],
-                result["analysis"]["monthly"]
-            )
-        }
+        if body is None:
+            return jsonify({"error": f"No data found for category: {category}"}), 404
         
-        return jsonify(result), 200
+        return Response(body, content_type=JSON_CONTENT_TYPE), 200
         
     except Exception as e:
-        print(f" Error analyzing performance for {category}: {str(e)}")
+        current_app.logger.exception("Error analyzing performance for %s", category)
         return jsonify({"error": str(e)}), 500
 
+INFLATION_FACTOR_RECOMMENDATIONS = (
+    "مراجعة استراتيجية التسعير للحفاظ على حجم المبيعات",
+    "تقديم منتجات بفئات سعرية متنوعة لتلبية مختلف الاحتياجات",
+    "تطوير برامج تحفيزية للحفاظ على العملاء الحاليين"
+)
+
+DEMAND_DECLINE_RECOMMENDATIONS = (
+    "تطوير حملات ترويجية لتحفيز الطلب",
+    "إجراء استطلاعات رأي للعملاء لفهم أسباب انخفاض الطلب",
+    "تحسين جودة المنتجات أو إضافة مزايا جديدة"
+)
+
+DEMAND_GROWTH_RECOMMENDATIONS = (
+    "تأمين مستويات مخزون كافية لتلبية الطلب المتزايد",
+    "دراسة أسباب النمو واستثمارها في التسويق",
+    "تطوير تشكيلة المنتجات بناءً على تفضيلات العملاء"
+)
+
+STRONG_SEASON_RECOMMENDATIONS = (
+    "تطوير حملات تسويقية مكثفة خلال هذا الموسم",
+    "تدريب فريق المبيعات على إدارة فترات الذروة",
+    "تعديل الأسعار بما يتناسب مع ارتفاع الطلب"
+)
+
+WEAK_SEASON_RECOMMENDATIONS = (
+    "تطوير عروض ترويجية خاصة لتحفيز المبيعات",
+    "تخفيض مستويات المخزون لتجنب التكدس",
+    "الاستفادة من هذه الفترة لتجديد المنتجات والتخطيط",
+    "تقديم خصومات على المنتجات بطيئة الحركة"
+)
+
+GROWING_MONTHS_RECOMMENDATIONS = (
+    "زيادة المخزون قبل هذه الشهور بفترة كافية",
+    "تكثيف الحملات التسويقية خلال هذه الفترات",
+    "استثمار هذه الفترات في تقديم منتجات جديدة"
+)
+
+DECLINING_MONTHS_RECOMMENDATIONS = (
+    "تطوير عروض ترويجية خاصة لتحفيز المبيعات",
+    "تخفيض مستويات المخزون خلال هذه الفترات",
+    "دراسة أسباب انخفاض المبيعات واتخاذ إجراءات تصحيحية"
+)
+
+INFLATION_INSIGHT_STRATEGIES = (
+    {
+        "title": "استراتيجية التسعير في ظل التضخم",
+        "recommendations": (
+            "زيادة الأسعار بشكل تدريجي بدلاً من زيادات مفاجئة كبيرة",
+            "تطوير منتجات بفئات سعرية متنوعة لتلبية احتياجات مختلف العملاء",
+            "تقديم خصومات استراتيجية على منتجات مختارة للحفاظ على حجم المبيعات",
+            "إعادة تقييم هيكل التكاليف والبحث عن فرص لتحسين الكفاءة"
+        )
+    },
+    {
+        "title": "استراتيجية القيمة المضافة",
+        "recommendations": (
+            "التركيز على إبراز القيمة المضافة للمنتجات لتبرير الأسعار",
+            "تقديم خدمات إضافية تميز المنتجات عن المنافسين",
+            "تطوير برامج ولاء لتعزيز العلاقة مع العملاء",
+            "الاهتمام بتجربة العملاء لتحقيق مستويات أعلى من الرضا"
+        )
+    }
+)
+
+MARKET_SHARE_INSIGHT_STRATEGY = {
+    "title": "استراتيجية الحفاظ على الحصة السوقية",
+    "recommendations": (
+        "إعادة تقييم هوامش الربح للمنتجات الأكثر حساسية للسعر",
+        "تطوير منتجات اقتصادية تناسب القدرة الشرائية المتغيرة",
+        "الاستثمار في تحسين كفاءة سلسلة التوريد لخفض التكاليف",
+        "التركيز على الميزة التنافسية غير السعرية (الجودة، الخدمة، التوفر)"
+    )
+}
+
+BASE_SCENARIO_RECOMMENDATIONS = (
+    "الاستعداد المبكر للمواسم والمناسبات الخاصة",
+    "تعديل استراتيجية التسعير بما يتناسب مع التغيرات الاقتصادية",
+    "التركيز على تحسين تجربة العملاء لتعزيز الولاء",
+    "مراقبة مستمرة لسلوك العملاء والاستجابة السريعة للتغيرات"
+)
+
+# Optimistic and pessimistic forecasts, added after the base scenario
+FORECAST_SCENARIOS = (
+    {
+        "scenario": "السيناريو المتفائل",
+        "description": "توقع تحسن في أداء المبيعات مع انخفاض تأثير التضخم وزيادة الطلب",
+        "factors": (
+            "انخفاض معدلات التضخم وتحسن القدرة الشرائية",
+            "تحسن في الأداء الاقتصادي العام",
+            "نجاح الحملات التسويقية وزيادة الحصة السوقية"
+        ),
+        "recommendations": (
+            "الاستثمار في توسيع تشكيلة المنتجات",
+            "زيادة المخزون استعداداً للنمو المتوقع",
+            "تطوير استراتيجيات تسويقية جديدة للاستفادة من التحسن الاقتصادي"
+        )
+    },
+    {
+        "scenario": "السيناريو المتشائم",
+        "description": "توقع استمرار انخفاض الطلب وزيادة تأثير التضخم",
+        "factors": (
+            "استمرار الضغوط التضخمية وانخفاض القدرة الشرائية",
+            "تزايد المنافسة في السوق",
+            "تغير في أنماط الاستهلاك"
+        ),
+        "recommendations": (
+            "تخفيض مستويات المخزون وتحسين كفاءة إدارته",
+            "التركيز على المنتجات الأساسية والأكثر مبيعاً",
+            "تقديم خيارات منتجات اقتصادية",
+            "تطوير استراتيجيات للحفاظ على العملاء الحاليين"
+        )
+    }
+)
+
+EID_INSIGHT_RECOMMENDATIONS = (
+    "بدء الاستعداد قبل العيد بثلاثة أسابيع على الأقل",
+    "تقديم باقات هدايا مميزة مع خدمات تغليف خاصة",
+    "تقديم عروض تصاعدية للمشتريات الكبيرة",
+    "تخصيص حملة تسويقية خاصة لفترة ما قبل العيد"
+)
+
+# Recommendations that do not depend on the category, by event name
+COMMON_EVENT_INSIGHT_RECOMMENDATIONS = {
+    "رمضان": (
+        "تصميم حملات تسويقية خاصة بشهر رمضان",
+        "تعديل ساعات العمل لتناسب أنماط التسوق الرمضانية",
+        "تقديم عروض خاصة للتسوق بعد الإفطار",
+        "تجهيز مخزون كافٍ من المنتجات الأكثر طلباً"
+    ),
+    "عيد الفطر": EID_INSIGHT_RECOMMENDATIONS,
+    "عيد الأضحى": EID_INSIGHT_RECOMMENDATIONS
+}
+
+# (event name, whether the category mentions a school category) -> event insight recommendations
+EVENT_INSIGHT_RECOMMENDATIONS = {
+    **{
+        (event_name, school_category): recommendations
+        for event_name, recommendations in COMMON_EVENT_INSIGHT_RECOMMENDATIONS.items()
+        for school_category in (True, False)
+    },
+    ("العودة للمدارس", True): (
+        "بدء الاستعداد قبل بداية العام الدراسي بشهرين",
+        "تقديم عروض خاصة للمدارس والمشتريات الجماعية",
+        "تطوير باقات متكاملة من المستلزمات المدرسية",
+        "تنظيم حملات تسويقية تستهدف الأهالي والطلاب"
+    ),
+    ("العودة للمدارس", False): (
+        "الاستفادة من موسم العودة للمدارس لجذب العائلات",
+        "تطوير عروض مشتركة مع منتجات مدرسية",
+        "زيادة الحملات الإعلانية خلال فترة التحضير للمدارس"
+    )
+}
+
+# Fallback for events without specific recommendations ({event} is the event name)
+GENERIC_EVENT_RECOMMENDATIONS = (
+    "تطوير استراتيجية تسويقية خاصة بموسم {event}",
+    "زيادة المخزون من المنتجات المناسبة للموسم",
+    "تقديم عروض خاصة خلال هذه الفترة"
+)
+
+def insight_from_template(template):
+    """Copy of a fixed insight strategy template with its own recommendations list."""
+    return {**template, "recommendations": list(template["recommendations"])}
+
+def forecast_from_template(template):
+    """Copy of a fixed forecast scenario template with its own factors and recommendations lists."""
+    return {**template, "factors": list(template["factors"]), "recommendations": list(template["recommendations"])}
+
+def yearly_change(latest_year, previous_year, growth_key, total_key):
+    """
+    Percent change between two yearly comparison entries.
+
+    :param latest_year: Latest yearlyComparison entry.
+    :param previous_year: Entry for the year before it.
+    :param growth_key: Precomputed growth field (e.g. "quantityGrowth"), used when present.
+    :param total_key: Field to compute the change from otherwise (e.g. "totalQuantity").
+    :return: Change in percent, or 0 if it cannot be computed.
+    """
+    growth = latest_year.get(growth_key)
+    if growth is not None:
+        return growth
+    
+    latest_total = latest_year.get(total_key)
+    previous_total = previous_year.get(total_key)
+    if latest_total is not None and previous_total is not None and previous_total > 0:
+        return ((latest_total - previous_total) / previous_total) * 100
+    return 0
+
 def generate_performance_insights(category, analysis_data, inflation_factor):
     """Generate in-depth performance insights based on all analyses."""
     insights = []
+    add_insight = insights.append
     
     # Extract key data points
     seasonal_data = analysis_data.get("seasonal", {})
@@ -1647,116 +1999,78 @@ def generate_performance_insights(category, analysis_data, inflation_factor):
     seasonal_events = seasonal_data.get("seasonalEvents", [])
     inflation_impact = yearly_data.get("inflationImpact", {"detected": False})
     yearly_comparison = yearly_data.get("yearlyComparison", [])
+    # Latest two years, newest first (years are unique)
+    newest_two = heapq.nlargest(2, yearly_comparison, key=lambda x: x.get("year", 0))
     monthly_trends = monthly_data.get("monthlyTrends", {})
     
     # Overall performance trend insights
-    if yearly_comparison and len(yearly_comparison) >= 2:
-        sorted_years = sorted(yearly_comparison, key=lambda x: x.get("year", 0))
-        latest_year = sorted_years[-1]
-        previous_year = sorted_years[-2]
-        
-        quantity_change = 0
-        revenue_change = 0
-        price_change = 0
-        
-        if "quantityGrowth" in latest_year:
-            quantity_change = latest_year["quantityGrowth"]
-        elif "totalQuantity" in latest_year and "totalQuantity" in previous_year and previous_year["totalQuantity"] > 0:
-            quantity_change = ((latest_year["totalQuantity"] - previous_year["totalQuantity"]) / previous_year["totalQuantity"]) * 100
-            
-        if "revenueGrowth" in latest_year:
-            revenue_change = latest_year["revenueGrowth"]
-        elif "totalRevenue" in latest_year and "totalRevenue" in previous_year and previous_year["totalRevenue"] > 0:
-            revenue_change = ((latest_year["totalRevenue"] - previous_year["totalRevenue"]) / previous_year["totalRevenue"]) * 100
-            
-        if "priceGrowth" in latest_year:
-            price_change = latest_year["priceGrowth"]
-        elif "avgPrice" in latest_year and "avgPrice" in previous_year and previous_year["avgPrice"] > 0:
-            price_change = ((latest_year["avgPrice"] - previous_year["avgPrice"]) / previous_year["avgPrice"]) * 100
+    if len(newest_two) >= 2:
+        latest_year, previous_year = newest_two
         
-        # Create general performance insight
-        performance_status = "مستقر" if -5 <= quantity_change <= 5 else "متزايد" if quantity_change > 5 else "متناقص"
-        performance_insight = {
-            "type": "overall",
-            "title": f"أداء قسم {category} العام",
-            "trend": performance_status,
-            "description": f"أداء القسم {performance_status} مع تغير في الكمية بنسبة {quantity_change:.1f}% وتغير في الإيرادات بنسبة {revenue_change:.1f}%",
-            "factors": []
-        }
+        quantity_change = yearly_change(latest_year, previous_year, "quantityGrowth", "totalQuantity")
+        revenue_change = yearly_change(latest_year, previous_year, "revenueGrowth", "totalRevenue")
+        price_change = yearly_change(latest_year, previous_year, "priceGrowth", "avgPrice")
         
-        # Add factors affecting performance
+        # Factors affecting performance
+        factors = []
         if quantity_change < -5 and price_change > 5:
-            performance_insight["factors"].append({
+            factors.append({
                 "name": "تأثير التضخم",
                 "description": f"يوجد مؤشرات على تأثير التضخم حيث ارتفعت الأسعار بنسبة {price_change:.1f}% بينما انخفضت الكميات بنسبة {abs(quantity_change):.1f}%",
                 "severity": "عالية" if abs(quantity_change) > 15 else "متوسطة",
-                "recommendations": [
-                    "مراجعة استراتيجية التسعير للحفاظ على حجم المبيعات",
-                    "تقديم منتجات بفئات سعرية متنوعة لتلبية مختلف الاحتياجات",
-                    "تطوير برامج تحفيزية للحفاظ على العملاء الحاليين"
-                ]
+                "recommendations": list(INFLATION_FACTOR_RECOMMENDATIONS)
             })
         elif quantity_change < -10:
-            performance_insight["factors"].append({
+            factors.append({
                 "name": "انخفاض الطلب",
                 "description": f"تراجع حجم المبيعات بشكل ملحوظ بنسبة {abs(quantity_change):.1f}%",
                 "severity": "عالية" if abs(quantity_change) > 20 else "متوسطة",
-                "recommendations": [
-                    "تطوير حملات ترويجية لتحفيز الطلب",
-                    "إجراء استطلاعات رأي للعملاء لفهم أسباب انخفاض الطلب",
-                    "تحسين جودة المنتجات أو إضافة مزايا جديدة"
-                ]
+                "recommendations": list(DEMAND_DECLINE_RECOMMENDATIONS)
             })
         elif quantity_change > 15:
-            performance_insight["factors"].append({
+            factors.append({
                 "name": "نمو الطلب",
                 "description": f"نمو ملحوظ في حجم المبيعات بنسبة {quantity_change:.1f}%",
                 "severity": "إيجابية",
-                "recommendations": [
-                    "تأمين مستويات مخزون كافية لتلبية الطلب المتزايد",
-                    "دراسة أسباب النمو واستثمارها في التسويق",
-                    "تطوير تشكيلة المنتجات بناءً على تفضيلات العملاء"
-                ]
+                "recommendations": list(DEMAND_GROWTH_RECOMMENDATIONS)
             })
         
-        insights.append(performance_insight)
+        # General performance insight
+        performance_status = "مستقر" if -5 <= quantity_change <= 5 else "متزايد" if quantity_change > 5 else "متناقص"
+        add_insight({
+            "type": "overall",
+            "title": f"أداء قسم {category} العام",
+            "trend": performance_status,
+            "description": f"أداء القسم {performance_status} مع تغير في الكمية بنسبة {quantity_change:.1f}% وتغير في الإيرادات بنسبة {revenue_change:.1f}%",
+            "factors": factors
+        })
     
     # Seasonal insights
     if strongest_season:
-        seasonal_insight = {
+        add_insight({
             "type": "seasonal",
             "title": "تحليل الأداء الموسمي",
             "description": f"موسم {strongest_season} هو الأقوى أداءً، بينما موسم {weakest_season} هو الأضعف",
-            "seasons": []
-        }
-        
-        # Add peak seasons data
-        seasonal_insight["seasons"].append({
-            "name": strongest_season,
-            "status": "قوي",
-            "description": f"يُعد {strongest_season} موسم الذروة لمبيعات هذا القسم",
-            "recommendations": [
-                f"زيادة المخزون قبل موسم {strongest_season} بفترة كافية",
-                "تطوير حملات تسويقية مكثفة خلال هذا الموسم",
-                "تدريب فريق المبيعات على إدارة فترات الذروة",
-                "تعديل الأسعار بما يتناسب مع ارتفاع الطلب"
-            ]
-        })
-        
-        # Add weak seasons data
-        seasonal_insight["seasons"].append({
-            "name": weakest_season,
-            "status": "ضعيف",
-            "description": f"يشهد موسم {weakest_season} أدنى مستويات المبيعات",
-            "recommendations": [
-                "تطوير عروض ترويجية خاصة لتحفيز المبيعات",
-                "تخفيض مستويات المخزون لتجنب التكدس",
-                "الاستفادة من هذه الفترة لتجديد المنتجات والتخطيط",
-                "تقديم خصومات على المنتجات بطيئة الحركة"
+            "seasons": [
+                # Peak season
+                {
+                    "name": strongest_season,
+                    "status": "قوي",
+                    "description": f"يُعد {strongest_season} موسم الذروة لمبيعات هذا القسم",
+                    "recommendations": [
+                        f"زيادة المخزون قبل موسم {strongest_season} بفترة كافية",
+                        *STRONG_SEASON_RECOMMENDATIONS
+                    ]
+                },
+                # Weak season
+                {
+                    "name": weakest_season,
+                    "status": "ضعيف",
+                    "description": f"يشهد موسم {weakest_season} أدنى مستويات المبيعات",
+                    "recommendations": list(WEAK_SEASON_RECOMMENDATIONS)
+                }
             ]
         })
-        
-        insights.append(seasonal_insight)
     
     # Monthly trends insights
     if monthly_trends:
@@ -1764,20 +2078,11 @@ def generate_performance_insights(category, analysis_data, inflation_factor):
         declining_months = []
         
         for month, data in monthly_trends.items():
-            if data.get("trend") == "upward":
-                growing_months.append({
-                    "name": month,
-                    "growth_rate": data.get("growthRate", 0)
-                })
-            elif data.get("trend") == "downward":
-                declining_months.append({
-                    "name": month,
-                    "decline_rate": abs(data.get("growthRate", 0))
-                })
-        
-        # Sort by growth/decline rate
-        growing_months.sort(key=lambda x: x["growth_rate"], reverse=True)
-        declining_months.sort(key=lambda x: x["decline_rate"], reverse=True)
+            trend = data.get("trend")
+            if trend == "upward":
+                growing_months.append((month, data.get("growthRate", 0)))
+            elif trend == "downward":
+                declining_months.append((month, abs(data.get("growthRate", 0))))
         
         if growing_months or declining_months:
             monthly_insight = {
@@ -1789,47 +2094,33 @@ def generate_performance_insights(category, analysis_data, inflation_factor):
             
             # Add top growing months
             if growing_months:
-                top_growing = growing_months[:3]  # Top 3 growing months
-                monthly_names = ", ".join([m["name"] for m in top_growing])
+                top_growing = heapq.nlargest(3, growing_months, key=itemgetter(1))  # Top 3 growing months
+                monthly_names = ", ".join([name for name, _ in top_growing])
                 monthly_insight["months"].append({
                     "type": "growing",
                     "names": monthly_names,
                     "description": f"أشهر {monthly_names} تظهر نمواً ملحوظاً في المبيعات",
-                    "recommendations": [
-                        "زيادة المخزون قبل هذه الشهور بفترة كافية",
-                        "تكثيف الحملات التسويقية خلال هذه الفترات",
-                        "استثمار هذه الفترات في تقديم منتجات جديدة"
-                    ]
+                    "recommendations": list(GROWING_MONTHS_RECOMMENDATIONS)
                 })
             
             # Add top declining months
             if declining_months:
-                top_declining = declining_months[:3]  # Top 3 declining months
-                monthly_names = ", ".join([m["name"] for m in top_declining])
+                top_declining = heapq.nlargest(3, declining_months, key=itemgetter(1))  # Top 3 declining months
+                monthly_names = ", ".join([name for name, _ in top_declining])
                 monthly_insight["months"].append({
                     "type": "declining",
                     "names": monthly_names,
                     "description": f"أشهر {monthly_names} تشهد انخفاضاً في المبيعات",
-                    "recommendations": [
-                        "تطوير عروض ترويجية خاصة لتحفيز المبيعات",
-                        "تخفيض مستويات المخزون خلال هذه الفترات",
-                        "دراسة أسباب انخفاض المبيعات واتخاذ إجراءات تصحيحية"
-                    ]
+                    "recommendations": list(DECLINING_MONTHS_RECOMMENDATIONS)
                 })
             
-            insights.append(monthly_insight)
+            add_insight(monthly_insight)
     
     # Special events insights
-    special_events_insight = {
-        "type": "events",
-        "title": "أثر المناسبات الخاصة على المبيعات",
-        "description": "تحليل أثر المناسبات والمواسم الخاصة على أداء المبيعات",
-        "events": []
-    }
-    
-    # Process special events
+    event_insights = []
+    school_category = mentions_school_category(category)
     for event in seasonal_events:
-        if event.get("strategicImportance") in ["مرتفعة", "مرتفعة جداً"]:
+        if event.get("strategicImportance") in HIGH_IMPORTANCE_LEVELS:
             event_name = event.get("name", "")
             sales_pattern = event.get("salesPattern", "")
             
@@ -1842,50 +2133,29 @@ def generate_performance_insights(category, analysis_data, inflation_factor):
             }
             
             # Add specific recommendations based on event type
-            if event_name == "رمضان":
-                event_insight["recommendations"] = [
-                    "تصميم حملات تسويقية خاصة بشهر رمضان",
-                    "تعديل ساعات العمل لتناسب أنماط التسوق الرمضانية",
-                    "تقديم عروض خاصة للتسوق بعد الإفطار",
-                    "تجهيز مخزون كافٍ من المنتجات الأكثر طلباً"
-                ]
-            elif event_name in ["عيد الفطر", "عيد الأضحى"]:
-                event_insight["recommendations"] = [
-                    "بدء الاستعداد قبل العيد بثلاثة أسابيع على الأقل",
-                    "تقديم باقات هدايا مميزة مع خدمات تغليف خاصة",
-                    "تقديم عروض تصاعدية للمشتريات الكبيرة",
-                    "تخصيص حملة تسويقية خاصة لفترة ما قبل العيد"
-                ]
-            elif event_name == "العودة للمدارس":
-                if "مدارس" in category.lower() or "اطفال" in category.lower():
-                    event_insight["recommendations"] = [
-                        "بدء الاستعداد قبل بداية العام الدراسي بشهرين",
-                        "تقديم عروض خاصة للمدارس والمشتريات الجماعية",
-                        "تطوير باقات متكاملة من المستلزمات المدرسية",
-                        "تنظيم حملات تسويقية تستهدف الأهالي والطلاب"
-                    ]
-                else:
-                    event_insight["recommendations"] = [
-                        "الاستفادة من موسم العودة للمدارس لجذب العائلات",
-                        "تطوير عروض مشتركة مع منتجات مدرسية",
-                        "زيادة الحملات الإعلانية خلال فترة التحضير للمدارس"
-                    ]
+            recommendations = EVENT_INSIGHT_RECOMMENDATIONS.get((event_name, school_category))
+            if recommendations:
+                event_insight["recommendations"] = list(recommendations)
             else:
                 # Generic recommendations for other events
                 event_insight["recommendations"] = [
-                    f"تطوير استراتيجية تسويقية خاصة بموسم {event_name}",
-                    "زيادة المخزون من المنتجات المناسبة للموسم",
-                    "تقديم عروض خاصة خلال هذه الفترة"
+                    recommendation.format(event=event_name)
+                    for recommendation in GENERIC_EVENT_RECOMMENDATIONS
                 ]
             
-            special_events_insight["events"].append(event_insight)
+            event_insights.append(event_insight)
     
     # Only add events insight if we have special events
-    if special_events_insight["events"]:
-        insights.append(special_events_insight)
+    if event_insights:
+        add_insight({
+            "type": "events",
+            "title": "أثر المناسبات الخاصة على المبيعات",
+            "description": "تحليل أثر المناسبات والمواسم الخاصة على أداء المبيعات",
+            "events": event_insights
+        })
     
     # Inflation impact insights
-    if inflation_impact and inflation_impact.get("detected", True):
+    if inflation_impact and inflation_impact.get("detected", False):
         inflation_severity = inflation_impact.get("severity", "medium")
         avg_price_increase = inflation_impact.get("avgPriceIncrease", 0)
         quantity_decrease = inflation_impact.get("quantityDecrease", 0)
@@ -1895,69 +2165,43 @@ def generate_performance_insights(category, analysis_data, inflation_factor):
             "title": "تأثير التضخم على أداء المبيعات",
             "severity": inflation_severity,
             "description": f"تأثير ملحوظ للتضخم مع زيادة الأسعار بنسبة {avg_price_increase:.1f}% وانخفاض الكميات بنسبة {quantity_decrease:.1f}%",
-            "strategies": [
-                {
-                    "title": "استراتيجية التسعير في ظل التضخم",
-                    "recommendations": [
-                        "زيادة الأسعار بشكل تدريجي بدلاً من زيادات مفاجئة كبيرة",
-                        "تطوير منتجات بفئات سعرية متنوعة لتلبية احتياجات مختلف العملاء",
-                        "تقديم خصومات استراتيجية على منتجات مختارة للحفاظ على حجم المبيعات",
-                        "إعادة تقييم هيكل التكاليف والبحث عن فرص لتحسين الكفاءة"
-                    ]
-                },
-                {
-                    "title": "استراتيجية القيمة المضافة",
-                    "recommendations": [
-                        "التركيز على إبراز القيمة المضافة للمنتجات لتبرير الأسعار",
-                        "تقديم خدمات إضافية تميز المنتجات عن المنافسين",
-                        "تطوير برامج ولاء لتعزيز العلاقة مع العملاء",
-                        "الاهتمام بتجربة العملاء لتحقيق مستويات أعلى من الرضا"
-                    ]
-                }
-            ]
+            "strategies": [insight_from_template(template) for template in INFLATION_INSIGHT_STRATEGIES]
         }
         
         # Add specific strategies based on severity
         if inflation_severity == "high":
-            inflation_insight["strategies"].append({
-                "title": "استراتيجية الحفاظ على الحصة السوقية",
-                "recommendations": [
-                    "إعادة تقييم هوامش الربح للمنتجات الأكثر حساسية للسعر",
-                    "تطوير منتجات اقتصادية تناسب القدرة الشرائية المتغيرة",
-                    "الاستثمار في تحسين كفاءة سلسلة التوريد لخفض التكاليف",
-                    "التركيز على الميزة التنافسية غير السعرية (الجودة، الخدمة، التوفر)"
-                ]
-            })
+            inflation_insight["strategies"].append(insight_from_template(MARKET_SHARE_INSIGHT_STRATEGY))
         
-        insights.append(inflation_insight)
-    
-    # Future forecasting insights
-    future_insight = {
-        "type": "forecast",
-        "title": "توقعات الأداء المستقبلي",
-        "description": f"توقعات أداء قسم {category} خلال الفترة القادمة في ضوء الاتجاهات الحالية",
-        "forecasts": []
-    }
+        add_insight(inflation_insight)
     
-    # Add different forecast scenarios based on analysis
-    if yearly_comparison and len(yearly_comparison) >= 2:
-        sorted_years = sorted(yearly_comparison, key=lambda x: x.get("year", 0))
-        latest_year = sorted_years[-1]
+    # Future forecasting insights, with scenarios based on the yearly trend
+    if len(newest_two) >= 2:
+        future_insight = {
+            "type": "forecast",
+            "title": "توقعات الأداء المستقبلي",
+            "description": f"توقعات أداء قسم {category} خلال الفترة القادمة في ضوء الاتجاهات الحالية",
+            "forecasts": []
+        }
+        
+        latest_year = newest_two[0]
+        
+        quantity_growth = latest_year.get("quantityGrowth")
+        price_growth = latest_year.get("priceGrowth")
         
         # Quantity trend forecast
         quantity_trend = "مستقر"
-        if "quantityGrowth" in latest_year:
-            if latest_year["quantityGrowth"] > 5:
+        if quantity_growth is not None:
+            if quantity_growth > 5:
                 quantity_trend = "متزايد"
-            elif latest_year["quantityGrowth"] < -5:
+            elif quantity_growth < -5:
                 quantity_trend = "متناقص"
         
         # Price trend forecast
         price_trend = "مستقر"
-        if "priceGrowth" in latest_year:
-            if latest_year["priceGrowth"] > 5:
+        if price_growth is not None:
+            if price_growth > 5:
                 price_trend = "متزايد"
-            elif latest_year["priceGrowth"] < -5:
+            elif price_growth < -5:
                 price_trend = "متناقص"
         
         # Base scenario
@@ -1969,110 +2213,36 @@ def generate_performance_insights(category, analysis_data, inflation_factor):
                 f"موسم {strongest_season} سيستمر كأقوى موسم للمبيعات" if strongest_season else "استمرار التذبذب الموسمي في المبيعات",
                 "الاستفادة من المناسبات الخاصة في زيادة المبيعات"
             ],
-            "recommendations": [
-                "الاستعداد المبكر للمواسم والمناسبات الخاصة",
-                "تعديل استراتيجية التسعير بما يتناسب مع التغيرات الاقتصادية",
-                "التركيز على تحسين تجربة العملاء لتعزيز الولاء",
-                "مراقبة مستمرة لسلوك العملاء والاستجابة السريعة للتغيرات"
-            ]
-        })
-        
-        # Optimistic scenario
-        future_insight["forecasts"].append({
-            "scenario": "السيناريو المتفائل",
-            "description": "توقع تحسن في أداء المبيعات مع انخفاض تأثير التضخم وزيادة الطلب",
-            "factors": [
-                "انخفاض معدلات التضخم وتحسن القدرة الشرائية",
-                "تحسن في الأداء الاقتصادي العام",
-                "نجاح الحملات التسويقية وزيادة الحصة السوقية"
-            ],
-            "recommendations": [
-                "الاستثمار في توسيع تشكيلة المنتجات",
-                "زيادة المخزون استعداداً للنمو المتوقع",
-                "تطوير استراتيجيات تسويقية جديدة للاستفادة من التحسن الاقتصادي"
-            ]
+            "recommendations": list(BASE_SCENARIO_RECOMMENDATIONS)
         })
         
-        # Pessimistic scenario
-        future_insight["forecasts"].append({
-            "scenario": "السيناريو المتشائم",
-            "description": "توقع استمرار انخفاض الطلب وزيادة تأثير التضخم",
-            "factors": [
-                "استمرار الضغوط التضخمية وانخفاض القدرة الشرائية",
-                "تزايد المنافسة في السوق",
-                "تغير في أنماط الاستهلاك"
-            ],
-            "recommendations": [
-                "تخفيض مستويات المخزون وتحسين كفاءة إدارته",
-                "التركيز على المنتجات الأساسية والأكثر مبيعاً",
-                "تقديم خيارات منتجات اقتصادية",
-                "تطوير استراتيجيات للحفاظ على العملاء الحاليين"
-            ]
-        })
+        # Optimistic and pessimistic scenarios
+        future_insight["forecasts"].extend(
+            forecast_from_template(template) for template in FORECAST_SCENARIOS
+        )
         
-        insights.append(future_insight)
+        add_insight(future_insight)
     
     return insights
 
+# Plan -> (title, description); {category} is the category name
+ACTION_PLAN_TEMPLATES = {
+    "marketing": ("خطة العمل التسويقية", "خطة عمل تسويقية متكاملة لقسم {category} بناءً على تحليل الأداء"),
+    "pricing": ("خطة استراتيجية التسعير", "خطة استراتيجية للتسعير لقسم {category} مع مراعاة التأثيرات الاقتصادية"),
+    "inventory": ("خطة إدارة المخزون", "خطة متكاملة لإدارة مخزون قسم {category} وفقاً للاتجاهات الموسمية")
+}
+
+ACTION_PLAN_TIMEFRAMES = (
+    ("immediate", "إجراءات فورية (1-3 أشهر)"),
+    ("short_term", "إجراءات قصيرة المدى (3-6 أشهر)"),
+    ("long_term", "إجراءات طويلة المدى (6-12 شهر)")
+)
+
 # Helper function to generate strategic action plans for various business aspects
 def generate_strategic_action_plan(category, insights, inflation_factor=30):
     """Generate a comprehensive strategic action plan based on performance insights."""
-    action_plans = {
-        "marketing": {
-            "title": "خطة العمل التسويقية",
-            "description": f"خطة عمل تسويقية متكاملة لقسم {category} بناءً على تحليل الأداء",
-            "timeframes": {
-                "immediate": {
-                    "title": "إجراءات فورية (1-3 أشهر)",
-                    "actions": []
-                },
-                "short_term": {
-                    "title": "إجراءات قصيرة المدى (3-6 أشهر)",
-                    "actions": []
-                },
-                "long_term": {
-                    "title": "إجراءات طويلة المدى (6-12 شهر)",
-                    "actions": []
-                }
-            }
-        },
-        "pricing": {
-            "title": "خطة استراتيجية التسعير",
-            "description": f"خطة استراتيجية للتسعير لقسم {category} مع مراعاة التأثيرات الاقتصادية",
-            "timeframes": {
-                "immediate": {
-                    "title": "إجراءات فورية (1-3 أشهر)",
-                    "actions": []
-                },
-                "short_term": {
-                    "title": "إجراءات قصيرة المدى (3-6 أشهر)",
-                    "actions": []
-                },
-                "long_term": {
-                    "title": "إجراءات طويلة المدى (6-12 شهر)",
-                    "actions": []
-                }
-            }
-        },
-        "inventory": {
-            "title": "خطة إدارة المخزون",
-            "description": f"خطة متكاملة لإدارة مخزون قسم {category} وفقاً للاتجاهات الموسمية",
-            "timeframes": {
-                "immediate": {
-                    "title": "إجراءات فورية (1-3 أشهر)",
-                    "actions": []
-                },
-                "short_term": {
-                    "title": "إجراءات قصيرة المدى (3-6 أشهر)",
-                    "actions": []
-                },
-                "long_term": {
-                    "title": "إجراءات طويلة المدى (6-12 شهر)",
-                    "actions": []
-                }
-            }
-        }
-    }
+    # (plan, timeframe) -> actions, gathered before the plans are assembled
+    actions = defaultdict(list)
     
     # Process all insights to extract action items
     for insight in insights:
@@ -2085,21 +2255,21 @@ def generate_strategic_action_plan(category, insights, inflation_factor=30):
             
             if trend == "متناقص":
                 # Marketing actions for declining performance
-                action_plans["marketing"]["timeframes"]["immediate"]["actions"].extend([
+                actions["marketing", "immediate"].extend([
                     "إجراء تحليل فوري لأسباب انخفاض المبيعات",
                     "تطوير حملة ترويجية عاجلة لتنشيط المبيعات",
                     "مراجعة استراتيجية التواصل مع العملاء وتحسينها"
                 ])
                 
                 # Pricing actions for declining performance
-                action_plans["pricing"]["timeframes"]["immediate"]["actions"].extend([
+                actions["pricing", "immediate"].extend([
                     "مراجعة هيكل الأسعار ومقارنته بالمنافسين",
                     "تقديم عروض خاصة على المنتجات الأكثر طلباً",
                     "دراسة إمكانية تخفيض هوامش الربح مؤقتاً للحفاظ على حجم المبيعات"
                 ])
                 
                 # Inventory actions for declining performance
-                action_plans["inventory"]["timeframes"]["immediate"]["actions"].extend([
+                actions["inventory", "immediate"].extend([
                     "تقليل مستويات المخزون تدريجياً",
                     "التركيز على المنتجات سريعة الحركة",
                     "تطوير خطة لتصفية المخزون بطيء الحركة"
@@ -2107,21 +2277,21 @@ def generate_strategic_action_plan(category, insights, inflation_factor=30):
             
             elif trend == "متزايد":
                 # Marketing actions for growing performance
-                action_plans["marketing"]["timeframes"]["short_term"]["actions"].extend([
+                actions["marketing", "short_term"].extend([
                     "تحليل أسباب النمو وتعزيز العوامل الإيجابية",
                     "زيادة الميزانية التسويقية للبناء على النمو الحالي",
                     "توسيع استهداف شرائح جديدة من العملاء"
                 ])
                 
                 # Pricing actions for growing performance
-                action_plans["pricing"]["timeframes"]["short_term"]["actions"].extend([
+                actions["pricing", "short_term"].extend([
                     "مراجعة هيكل الأسعار لتحقيق أقصى ربحية مع الحفاظ على النمو",
                     "تقديم برامج ولاء ومكافآت للعملاء المتكررين",
                     "دراسة إمكانية تحسين هوامش الربح تدريجياً"
                 ])
                 
                 # Inventory actions for growing performance
-                action_plans["inventory"]["timeframes"]["immediate"]["actions"].extend([
+                actions["inventory", "immediate"].extend([
                     "زيادة مستويات المخزون لتلبية الطلب المتزايد",
                     "توسيع تشكيلة المنتجات",
                     "تطوير نظام إنذار مبكر لانخفاض المخزون"
@@ -2133,7 +2303,7 @@ def generate_strategic_action_plan(category, insights, inflation_factor=30):
                     severity = factor.get("severity", "متوسطة")
                     
                     # Marketing actions for inflation
-                    action_plans["marketing"]["timeframes"]["short_term"]["actions"].extend([
+                    actions["marketing", "short_term"].extend([
                         "تطوير حملات تسويقية تركز على القيمة المضافة للمنتجات",
                         "تعزيز التواصل مع العملاء لشرح سياسات التسعير",
                         "إطلاق حملات تستهدف العملاء ذوي الولاء العالي"
@@ -2152,10 +2322,10 @@ def generate_strategic_action_plan(category, insights, inflation_factor=30):
                             "إعادة تقييم شامل لهيكل التكاليف للحد من تأثير التضخم"
                         ])
                     
-                    action_plans["pricing"]["timeframes"]["immediate"]["actions"].extend(pricing_actions)
+                    actions["pricing", "immediate"].extend(pricing_actions)
                     
                     # Inventory actions for inflation
-                    action_plans["inventory"]["timeframes"]["short_term"]["actions"].extend([
+                    actions["inventory", "short_term"].extend([
                         "تحسين كفاءة سلسلة التوريد لتقليل التكاليف",
                         "التركيز على المنتجات ذات هامش الربح الأعلى",
                         "تخفيض المخزون من المنتجات ذات الحساسية السعرية العالية"
@@ -2172,18 +2342,18 @@ def generate_strategic_action_plan(category, insights, inflation_factor=30):
                 
                 if status == "قوي":
                     # Strong season actions
-                    action_plans["marketing"]["timeframes"]["short_term"]["actions"].extend([
+                    actions["marketing", "short_term"].extend([
                         f"تطوير حملة تسويقية مخصصة لموسم {season_name}",
                         "زيادة الميزانية التسويقية خلال هذا الموسم",
                         "تنظيم فعاليات ترويجية خاصة خلال فترة الذروة"
                     ])
                     
-                    action_plans["pricing"]["timeframes"]["short_term"]["actions"].extend([
+                    actions["pricing", "short_term"].extend([
                         f"رفع الأسعار بنسبة 10-15% خلال موسم {season_name}",
                         "تقديم عروض خاصة على المنتجات المكملة لزيادة متوسط قيمة المشتريات"
                     ])
                     
-                    action_plans["inventory"]["timeframes"]["short_term"]["actions"].extend([
+                    actions["inventory", "short_term"].extend([
                         f"زيادة المخزون قبل موسم {season_name} بشهر على الأقل",
                         "توسيع تشكيلة المنتجات خلال هذا الموسم",
                         "تأمين خط إمداد مرن ومستمر خلال فترة الذروة"
@@ -2191,19 +2361,19 @@ def generate_strategic_action_plan(category, insights, inflation_factor=30):
                 
                 elif status == "ضعيف":
                     # Weak season actions
-                    action_plans["marketing"]["timeframes"]["short_term"]["actions"].extend([
+                    actions["marketing", "short_term"].extend([
                         f"تطوير حملات ترويجية خاصة لتنشيط المبيعات في موسم {season_name}",
                         "تقديم عروض حصرية للعملاء الدائمين",
                         "استخدام استراتيجيات التسويق الرقمي بشكل مكثف"
                     ])
                     
-                    action_plans["pricing"]["timeframes"]["short_term"]["actions"].extend([
+                    actions["pricing", "short_term"].extend([
                         f"تخفيض الأسعار بنسبة 5-10% خلال موسم {season_name}",
                         "تقديم خصومات تصاعدية مع زيادة قيمة المشتريات",
                         "تطوير برامج ولاء وحوافز للعملاء"
                     ])
                     
-                    action_plans["inventory"]["timeframes"]["short_term"]["actions"].extend([
+                    actions["inventory", "short_term"].extend([
                         f"تخفيض مستويات المخزون خلال موسم {season_name}",
                         "التركيز على المنتجات الأساسية والأكثر مبيعاً",
                         "تطوير برامج تصفية للمنتجات بطيئة الحركة"
@@ -2220,35 +2390,35 @@ def generate_strategic_action_plan(category, insights, inflation_factor=30):
                 
                 if month_type == "growing":
                     # Growing months actions
-                    action_plans["marketing"]["timeframes"]["short_term"]["actions"].extend([
+                    actions["marketing", "short_term"].extend([
                         f"تكثيف الحملات التسويقية قبل وخلال أشهر {month_names}",
                         "استخدام التحليلات للتنبؤ بالمنتجات الأكثر طلباً في هذه الأشهر"
                     ])
                     
-                    action_plans["pricing"]["timeframes"]["short_term"]["actions"].extend([
+                    actions["pricing", "short_term"].extend([
                         f"تعديل الأسعار بما يتناسب مع زيادة الطلب في أشهر {month_names}",
                         "تقديم عروض خاصة على المنتجات المكملة"
                     ])
                     
-                    action_plans["inventory"]["timeframes"]["short_term"]["actions"].extend([
+                    actions["inventory", "short_term"].extend([
                         f"زيادة المخزون قبل أشهر {month_names}",
                         "توفير تشكيلة واسعة من المنتجات"
                     ])
                 
                 elif month_type == "declining":
                     # Declining months actions
-                    action_plans["marketing"]["timeframes"]["short_term"]["actions"].extend([
+                    actions["marketing", "short_term"].extend([
                         f"تطوير حملات ترويجية مخصصة لأشهر {month_names}",
                         "استهداف العملاء السابقين بعروض خاصة",
                         "تنويع قنوات التسويق لزيادة الوصول"
                     ])
                     
-                    action_plans["pricing"]["timeframes"]["short_term"]["actions"].extend([
+                    actions["pricing", "short_term"].extend([
                         f"تخفيض الأسعار خلال أشهر {month_names}",
                         "تقديم خصومات استثنائية على المنتجات بطيئة الحركة"
                     ])
                     
-                    action_plans["inventory"]["timeframes"]["short_term"]["actions"].extend([
+                    actions["inventory", "short_term"].extend([
                         f"تخفيض مستويات المخزون خلال أشهر {month_names}",
                         "جدولة عمليات الجرد وإعادة التنظيم"
                     ])
@@ -2263,7 +2433,7 @@ def generate_strategic_action_plan(category, insights, inflation_factor=30):
                 recommendations = event.get("recommendations", [])
                 
                 # Only process important events
-                if importance in ["مرتفعة", "مرتفعة جداً"]:
+                if importance in HIGH_IMPORTANCE_LEVELS:
                     # Add the recommendations to appropriate action plans
                     marketing_actions = []
                     pricing_actions = []
@@ -2278,13 +2448,13 @@ def generate_strategic_action_plan(category, insights, inflation_factor=30):
                             inventory_actions.append(rec)
                     
                     if marketing_actions:
-                        action_plans["marketing"]["timeframes"]["short_term"]["actions"].extend(marketing_actions)
+                        actions["marketing", "short_term"].extend(marketing_actions)
                     
                     if pricing_actions:
-                        action_plans["pricing"]["timeframes"]["short_term"]["actions"].extend(pricing_actions)
+                        actions["pricing", "short_term"].extend(pricing_actions)
                     
                     if inventory_actions:
-                        action_plans["inventory"]["timeframes"]["short_term"]["actions"].extend(inventory_actions)
+                        actions["inventory", "short_term"].extend(inventory_actions)
         
         # Process economic insights
         elif insight_type == "economic":
@@ -2297,11 +2467,11 @@ def generate_strategic_action_plan(category, insights, inflation_factor=30):
                 # Categorize recommendations by department
                 for rec in recommendations:
                     if "تسويق" in rec or "القيمة" in rec or "العملاء" in rec or "تجربة" in rec:
-                        action_plans["marketing"]["timeframes"]["immediate"]["actions"].append(rec)
+                        actions["marketing", "immediate"].append(rec)
                     elif "سعر" in rec or "خصم" in rec or "قيمة" in rec:
-                        action_plans["pricing"]["timeframes"]["immediate"]["actions"].append(rec)
+                        actions["pricing", "immediate"].append(rec)
                     elif "مخزون" in rec or "توريد" in rec or "تكاليف" in rec:
-                        action_plans["inventory"]["timeframes"]["immediate"]["actions"].append(rec)
+                        actions["inventory", "immediate"].append(rec)
         
         # Process forecast insights
         elif insight_type == "forecast":
@@ -2314,195 +2484,138 @@ def generate_strategic_action_plan(category, insights, inflation_factor=30):
                 # Only process base scenario for action plans
                 if scenario == "السيناريو الأساسي":
                     # Add long term actions
-                    action_plans["marketing"]["timeframes"]["long_term"]["actions"].extend([rec for rec in recommendations if "تسويق" in rec or "عملاء" in rec or "حمل" in rec])
-                    action_plans["pricing"]["timeframes"]["long_term"]["actions"].extend([rec for rec in recommendations if "سعر" in rec or "خصم" in rec])
-                    action_plans["inventory"]["timeframes"]["long_term"]["actions"].extend([rec for rec in recommendations if "مخزون" in rec or "كمي" in rec])
+                    actions["marketing", "long_term"].extend([rec for rec in recommendations if "تسويق" in rec or "عملاء" in rec or "حمل" in rec])
+                    actions["pricing", "long_term"].extend([rec for rec in recommendations if "سعر" in rec or "خصم" in rec])
+                    actions["inventory", "long_term"].extend([rec for rec in recommendations if "مخزون" in rec or "كمي" in rec])
     
-    # Remove duplicate actions
-    for dept in action_plans:
-        for timeframe in action_plans[dept]["timeframes"]:
-            action_plans[dept]["timeframes"][timeframe]["actions"] = list(set(action_plans[dept]["timeframes"][timeframe]["actions"]))
+    # Assemble the plans, removing duplicate actions
+    return {
+        plan: {
+            "title": title,
+            "description": description.format(category=category),
+            "timeframes": {
+                timeframe: {"title": timeframe_title, "actions": list(set(actions[plan, timeframe]))}
+                for timeframe, timeframe_title in ACTION_PLAN_TIMEFRAMES
+            }
+        }
+        for plan, (title, description) in ACTION_PLAN_TEMPLATES.items()
+    }
+
+def cross_year_groups(df, key):
+    """
+    Per-year totals, unit price and year-over-year changes for every month or season.
+
+    One groupby over the whole frame; changes are computed for all groups at
+    once and reset at the first year of each group.
+
+    :param df: load_category_rows frame (with a season column when key is "season").
+    :param key: Column to compare across years ("month" or "season").
+    :return: Dict of key value -> (year items oldest first, whether the latest year
+             combines a >5% quantity drop with a >5% unit price rise)
+    """
+    totals = df.groupby([key, "year"], sort=True)[SUM_COLUMNS].sum().reset_index()
+    
+    # Unit price and year-over-year changes in one NumPy pass
+    values = totals[SUM_COLUMNS].to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        unit_prices = np.round(values[:, 1] / values[:, 0], 2)
+    changes = growth_rates(np.column_stack((values[:, 0], unit_prices)))
+    
+    keys = totals[key].to_numpy()
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = keys[1:] != keys[:-1]
+    last = np.append(first[1:], True)
+    changes[first] = np.nan
+    
+    # Declining quantities with rising prices in the latest year of a group
+    # with at least two years
+    with np.errstate(invalid="ignore"):
+        inflation = last & ~first & (changes[:, 0] < -5) & (changes[:, 1] > 5)
+    
+    groups = {}
+    for group, year, quantity, revenue, price, (quantity_change, price_change), is_last, has_inflation_impact in zip(
+        keys.tolist(),
+        totals["year"].tolist(),
+        totals["total_quantity"].tolist(),
+        totals["total_money_sold"].tolist(),
+        unit_prices.tolist(),
+        np.round(changes, 1).tolist(),
+        last.tolist(),
+        inflation.tolist()
+    ):
+        year_item = {
+            "year": int(year),
+            "quantity": int(quantity),
+            "revenue": float(revenue),
+            "unit_price": price
+        }
+        
+        if quantity_change == quantity_change:
+            year_item["quantity_change"] = quantity_change
+        if price_change == price_change:
+            year_item["price_change"] = price_change
+        
+        years = groups.setdefault(group, ([], False))[0]
+        years.append(year_item)
+        if is_last:
+            groups[group] = (years, has_inflation_impact)
     
-    return action_plans
+    return groups
 
 @sales_strategy_bp.route('/cross-year-comparison/<category>', methods=['GET'])
 def cross_year_comparison(category):
     """Compare sales performance across years for the same months/seasons."""
     try:
-        init_db()
-        
         if not category:
             return jsonify({"error": "Category is required"}), 400
         
-        # Fetch data for the category
-        collection = get_collection("item_specification_monthly_demand")
-        data = list(collection.find({"القسم": category}, {"_id": 0}))
+        # Fetch the category's rows, already numeric
+        df = load_category_rows(category)
         
-        if not data:
+        if df.empty:
             return jsonify({"error": f"No data found for category: {category}"}), 404
         
-        # Convert to DataFrame
-        df = pd.DataFrame(data)
-        
-        # Ensure numeric values
-        df["total_quantity"] = pd.to_numeric(df["total_quantity"], errors="coerce")
-        df["total_money_sold"] = pd.to_numeric(df["total_money_sold"], errors="coerce")
-        df["year"] = pd.to_numeric(df["year"], errors="coerce")
-        df["month"] = pd.to_numeric(df["month"], errors="coerce")
-        
-        # Define month names
-        month_names = [
-            'يناير', 'فبراير', 'مارس', 'أبريل', 'مايو', 'يونيو',
-            'يوليو', 'أغسطس', 'سبتمبر', 'أكتوبر', 'نوفمبر', 'ديسمبر'
-        ]
-        
-        # Create month name mapping
-        month_name_map = {i+1: name for i, name in enumerate(month_names)}
-        
         # Cross-year comparison by month
         monthly_comparison = []
+        month_groups = cross_year_groups(df, "month")
         
         for month in range(1, 13):
-            month_data = df[df["month"] == month]
-            
-            if month_data.empty:
+            if month not in month_groups:
                 continue
                 
-            # Group by year
-            year_data = month_data.groupby("year").agg({
-                "total_quantity": "sum",
-                "total_money_sold": "sum"
-            }).reset_index()
-            
-            # Calculate unit price
-            year_data["unit_price"] = year_data["total_money_sold"] / year_data["total_quantity"]
-            year_data["unit_price"] = year_data["unit_price"].round(2)
-            
-            # Check for declining quantities with rising prices
-            has_declining_quantity = False
-            has_rising_prices = False
-            
-            if len(year_data) >= 2:
-                sorted_data = year_data.sort_values("year")
-                
-                # Calculate year-over-year changes
-                sorted_data["qty_change"] = sorted_data["total_quantity"].pct_change() * 100
-                sorted_data["price_change"] = sorted_data["unit_price"].pct_change() * 100
-                
-                # Check last year's change
-                latest_data = sorted_data.iloc[-1]
-                
-                if "qty_change" in latest_data and "price_change" in latest_data:
-                    has_declining_quantity = latest_data["qty_change"] < -5  # More than 5% decrease
-                    has_rising_prices = latest_data["price_change"] > 5  # More than 5% increase
+            years, has_inflation_impact = month_groups[month]
             
             # Format data for response
             month_comparison = {
                 "month": month,
-                "month_name": month_name_map[month],
-                "years": [],
-                "has_inflation_impact": has_declining_quantity and has_rising_prices
+                "month_name": MONTH_NAME_MAP[month],
+                "years": years,
+                "has_inflation_impact": has_inflation_impact
             }
             
-            for _, row in year_data.iterrows():
-                year_item = {
-                    "year": int(row["year"]),
-                    "quantity": int(row["total_quantity"]),
-                    "revenue": float(row["total_money_sold"]),
-                    "unit_price": float(row["unit_price"])
-                }
-                
-                if "qty_change" in row and not pd.isna(row["qty_change"]):
-                    year_item["quantity_change"] = float(round(row["qty_change"], 1))
-                
-                if "price_change" in row and not pd.isna(row["price_change"]):
-                    year_item["price_change"] = float(round(row["price_change"], 1))
-                
-                month_comparison["years"].append(year_item)
-            
             monthly_comparison.append(month_comparison)
         
         # Cross-year comparison by season
-        # Define seasons
-        winter_months = [12, 1, 2]
-        spring_months = [3, 4, 5]
-        summer_months = [6, 7, 8]
-        fall_months = [9, 10, 11]
-        
-        # Function to assign season
-        def get_season(month):
-            if month in winter_months:
-                return "الشتاء"
-            elif month in spring_months:
-                return "الربيع"
-            elif month in summer_months:
-                return "الصيف"
-            else:
-                return "الخريف"
-        
         # Add season to data
-        df["season"] = df["month"].apply(get_season)
+        df["season"] = assign_season(df["month"])
         
         # Cross-year comparison by season
         seasonal_comparison = []
+        season_groups = cross_year_groups(df, "season")
         
         for season in ["الشتاء", "الربيع", "الصيف", "الخريف"]:
-            season_data = df[df["season"] == season]
-            
-            if season_data.empty:
+            if season not in season_groups:
                 continue
                 
-            # Group by year
-            year_data = season_data.groupby("year").agg({
-                "total_quantity": "sum",
-                "total_money_sold": "sum"
-            }).reset_index()
-            
-            # Calculate unit price
-            year_data["unit_price"] = year_data["total_money_sold"] / year_data["total_quantity"]
-            year_data["unit_price"] = year_data["unit_price"].round(2)
-            
-            # Check for declining quantities with rising prices
-            has_declining_quantity = False
-            has_rising_prices = False
-            
-            if len(year_data) >= 2:
-                sorted_data = year_data.sort_values("year")
-                
-                # Calculate year-over-year changes
-                sorted_data["qty_change"] = sorted_data["total_quantity"].pct_change() * 100
-                sorted_data["price_change"] = sorted_data["unit_price"].pct_change() * 100
-                
-                # Check last year's change
-                latest_data = sorted_data.iloc[-1]
-                
-                if "qty_change" in latest_data and "price_change" in latest_data:
-                    has_declining_quantity = latest_data["qty_change"] < -5  # More than 5% decrease
-                    has_rising_prices = latest_data["price_change"] > 5  # More than 5% increase
+            years, has_inflation_impact = season_groups[season]
             
             # Format data for response
             season_comparison = {
                 "season": season,
-                "years": [],
-                "has_inflation_impact": has_declining_quantity and has_rising_prices
+                "years": years,
+                "has_inflation_impact": has_inflation_impact
             }
             
-            for _, row in year_data.iterrows():
-                year_item = {
-                    "year": int(row["year"]),
-                    "quantity": int(row["total_quantity"]),
-                    "revenue": float(row["total_money_sold"]),
-                    "unit_price": float(row["unit_price"])
-                }
-                
-                if "qty_change" in row and not pd.isna(row["qty_change"]):
-                    year_item["quantity_change"] = float(round(row["qty_change"], 1))
-                
-                if "price_change" in row and not pd.isna(row["price_change"]):
-                    year_item["price_change"] = float(round(row["price_change"], 1))
-                
-                season_comparison["years"].append(year_item)
-            
             seasonal_comparison.append(season_comparison)
         
         # Identify overall inflation impact
@@ -2593,57 +2706,30 @@ def cross_year_comparison(category):
         
         strategic_insights["event_strategies"] = event_strategies
         
-        return jsonify({
+        return orjson_response({
             "category": category,
             "monthly_comparison": monthly_comparison,
             "seasonal_comparison": seasonal_comparison,
             "strategic_insights": strategic_insights
-        }), 200
+        })
         
     except Exception as e:
         print(f" Error in cross-year comparison for {category}: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+# Key seasonal events and the names of their typical months, in the order
+# the cross-year comparison reports them
+MONTHLY_EVENT_WINDOWS = tuple(
+    {"name": name, "month_names": frozenset(MONTH_NAME_MAP[month] for month in EVENT_MONTHS[name])}
+    for name in ("رمضان", "عيد الفطر", "عيد الأضحى", "العودة للمدارس", "الشتاء", "الصيف")
+)
+
 def generate_seasonal_event_strategies(category, monthly_data):
     """Generate strategies for seasonal events based on monthly performance data."""
     event_strategies = []
     
-    # Define key seasonal events and their typical months
-    seasonal_events = [
-        {
-            "name": "رمضان",
-            "months": [8, 9, 10],  # Approximate Ramadan months
-            "month_names": ["أغسطس", "سبتمبر", "أكتوبر"]
-        },
-        {
-            "name": "عيد الفطر",
-            "months": [9, 10],  # Approximate Eid al-Fitr months
-            "month_names": ["سبتمبر", "أكتوبر"]
-        },
-        {
-            "name": "عيد الأضحى",
-            "months": [11, 12],  # Approximate Eid al-Adha months
-            "month_names": ["نوفمبر", "ديسمبر"]
-        },
-        {
-            "name": "العودة للمدارس",
-            "months": [8, 9],  # Back to school months
-            "month_names": ["أغسطس", "سبتمبر"]
-        },
-        {
-            "name": "الشتاء",
-            "months": [12, 1, 2],  # Winter months
-            "month_names": ["ديسمبر", "يناير", "فبراير"]
-        },
-        {
-            "name": "الصيف",
-            "months": [6, 7, 8],  # Summer months
-            "month_names": ["يونيو", "يوليو", "أغسطس"]
-        }
-    ]
-    
     # Check if there's growth in the event months
-    for event in seasonal_events:
+    for event in MONTHLY_EVENT_WINDOWS:
         event_months = event["month_names"]
         
         # Check if there's data for these months
@@ -2709,7 +2795,7 @@ def generate_seasonal_event_strategies(category, monthly_data):
                 ]
             
             elif event["name"] == "العودة للمدارس":
-                if category.lower() in ["مدارس", "اطفال"]:
+                if is_school_category(category):
                     strategies["marketing_strategies"] = [
                         "إطلاق حملة 'العودة للمدرسة' قبل بداية العام الدراسي بشهر",
                         "تقديم عروض خاصة للمشتريات العائلية أو للمدارس",
@@ -2755,36 +2841,15 @@ def generate_seasonal_event_strategies(category, monthly_data):
 def monthly_performance_comparison(category):
     """Compare performance of the same month across different years to detect seasonal patterns and annual trends."""
     try:
-        init_db()
-        
         if not category:
             return jsonify({"error": "Category is required"}), 400
         
-        # Fetch data for the category
-        collection = get_collection("item_specification_monthly_demand")
-        data = list(collection.find({"القسم": category}, {"_id": 0}))
+        # Fetch the category's rows, already numeric
+        df = load_category_rows(category)
         
-        if not data:
+        if df.empty:
             return jsonify({"error": f"No data found for category: {category}"}), 404
         
-        # Convert to DataFrame
-        df = pd.DataFrame(data)
-        
-        # Ensure numeric values
-        df["total_quantity"] = pd.to_numeric(df["total_quantity"], errors="coerce")
-        df["total_money_sold"] = pd.to_numeric(df["total_money_sold"], errors="coerce")
-        df["year"] = pd.to_numeric(df["year"], errors="coerce")
-        df["month"] = pd.to_numeric(df["month"], errors="coerce")
-        
-        # Define month names
-        month_names = [
-            'يناير', 'فبراير', 'مارس', 'أبريل', 'مايو', 'يونيو',
-            'يوليو', 'أغسطس', 'سبتمبر', 'أكتوبر', 'نوفمبر', 'ديسمبر'
-        ]
-        
-        # Create month name mapping
-        month_name_map = {i+1: name for i, name in enumerate(month_names)}
-        
         # Group by month and year
         monthly_yearly = df.groupby(["month", "year"]).agg({
             "total_quantity": "sum",
@@ -2808,9 +2873,7 @@ def monthly_performance_comparison(category):
             month_data = month_data.sort_values("year")
             
             # Calculate year-over-year growth rates
-            month_data["quantity_growth"] = month_data["total_quantity"].pct_change() * 100
-            month_data["revenue_growth"] = month_data["total_money_sold"].pct_change() * 100
-            month_data["price_growth"] = month_data["unit_price"].pct_change() * 100
+            add_growth_columns(month_data, "unit_price")
             
             # Prepare data for response
             years_data = []
@@ -2847,7 +2910,7 @@ def monthly_performance_comparison(category):
                     if latest_year["price_growth"] > 5 and latest_year["quantity_growth"] < 0:
                         has_inflation_impact = True
             
-            months_comparison[month_name_map[month]] = {
+            months_comparison[MONTH_NAME_MAP[month]] = {
                 "years_data": years_data,
                 "avg_metrics": avg_metrics,
                 "has_inflation_impact": has_inflation_impact
@@ -2882,7 +2945,7 @@ def monthly_performance_comparison(category):
             }).reset_index()
             
             # Add month names
-            monthly_agg["month_name"] = monthly_agg["month"].map(month_name_map)
+            monthly_agg["month_name"] = assign_month_name(monthly_agg["month"])
             
             # Calculate average price
             monthly_agg["avg_price"] = monthly_agg["total_money_sold"] / monthly_agg["total_quantity"]
@@ -2895,12 +2958,12 @@ def monthly_performance_comparison(category):
                 "avg_prices": monthly_agg["avg_price"].round(2).tolist()
             }
         
-        return jsonify({
+        return orjson_response({
             "category": category,
             "months_comparison": months_comparison,
             "yearly_patterns": yearly_patterns,
             "strategic_insights": insights
-        }), 200
+        })
         
     except Exception as e:
         print(f" Error in monthly performance comparison for {category}: {str(e)}")
@@ -3073,7 +3136,6 @@ def generate_monthly_inventory_strategies(top_months, bottom_months):
 def seasonal_event_analysis(category):
     """Analyze impact of seasonal events on sales and generate strategies."""
     try:
-        init_db()
         data = request.get_json()
         
         # Get which seasonal events to analyze
@@ -3087,49 +3149,20 @@ def seasonal_event_analysis(category):
         if not category:
             return jsonify({"error": "Category is required"}), 400
         
-        # Fetch data for the category
-        collection = get_collection("item_specification_monthly_demand")
-        item_data = list(collection.find({"القسم": category}, {"_id": 0}))
+        # Fetch the category's rows, already numeric
+        df = load_category_rows(category)
         
-        if not item_data:
+        if df.empty:
             return jsonify({"error": f"No data found for category: {category}"}), 404
         
-        # Convert to DataFrame
-        df = pd.DataFrame(item_data)
-        
-        # Ensure numeric values
-        df["total_quantity"] = pd.to_numeric(df["total_quantity"], errors="coerce")
-        df["total_money_sold"] = pd.to_numeric(df["total_money_sold"], errors="coerce")
-        df["year"] = pd.to_numeric(df["year"], errors="coerce")
-        df["month"] = pd.to_numeric(df["month"], errors="coerce")
-        
-        # Define month names
-        month_names = [
-            'يناير', 'فبراير', 'مارس', 'أبريل', 'مايو', 'يونيو',
-            'يوليو', 'أغسطس', 'سبتمبر', 'أكتوبر', 'نوفمبر', 'ديسمبر'
-        ]
-        
-        # Map month numbers to names
-        month_name_map = {i+1: name for i, name in enumerate(month_names)}
-        
-        # Define seasonal events mapping to months (approximate)
-        seasonal_event_months = {
-            "رمضان": [8, 9, 10],  # Approximate Hijri months in Gregorian
-            "عيد الفطر": [9, 10],
-            "عيد الأضحى": [11, 12],
-            "العودة للمدارس": [8, 9],
-            "الصيف": [6, 7, 8],
-            "الشتاء": [12, 1, 2]
-        }
-        
         # Analyze each requested event
         event_analysis = []
         
         for event_name in events:
-            if event_name not in seasonal_event_months:
+            if event_name not in EVENT_MONTHS:
                 continue
                 
-            event_months = seasonal_event_months[event_name]
+            event_months = EVENT_MONTHS[event_name]
             
             # Filter data for this event's months
             event_data = df[df["month"].isin(event_months)]
@@ -3148,9 +3181,7 @@ def seasonal_event_analysis(category):
             yearly_event_data["avg_price"] = yearly_event_data["avg_price"].round(2)
             
             # Calculate year-over-year growth
-            yearly_event_data["quantity_growth"] = yearly_event_data["total_quantity"].pct_change() * 100
-            yearly_event_data["revenue_growth"] = yearly_event_data["total_money_sold"].pct_change() * 100
-            yearly_event_data["price_growth"] = yearly_event_data["avg_price"].pct_change() * 100
+            add_growth_columns(yearly_event_data)
             
             # Prepare years data for response
             years_data = []
@@ -3229,7 +3260,7 @@ def seasonal_event_analysis(category):
             )
             
             # Prepare month names
-            event_month_names = [month_name_map[m] for m in event_months if m in month_name_map]
+            event_month_names = [MONTH_NAME_MAP[m] for m in event_months if m in MONTH_NAME_MAP]
             
             # Create event analysis object
             event_analysis.append({
@@ -3245,12 +3276,12 @@ def seasonal_event_analysis(category):
         # Generate comprehensive calendar for yearly planning
         event_calendar = generate_event_calendar(event_analysis, category)
         
-        return jsonify({
+        return orjson_response({
             "category": category,
             "event_analysis": event_analysis,
             "event_calendar": event_calendar,
             "inflation_factor": inflation_factor
-        }), 200
+        })
         
     except Exception as e:
         print(f" Error in seasonal event analysis for {category}: {str(e)}")
@@ -3307,7 +3338,7 @@ def generate_event_specific_strategies(event_name, category, growth_trend, has_i
         ]
     
     elif event_name == "العودة للمدارس":
-        if category.lower() in ["مدارس", "اطفال"]:
+        if is_school_category(category):
             strategies["marketing"] = [
                 "إطلاق حملة 'العودة للمدرسة' قبل بداية العام الدراسي بشهر",
                 "تقديم عروض خاصة للمشتريات العائلية أو للمدارس",
@@ -3546,7 +3577,6 @@ def generate_event_calendar(event_analysis, category):
 def analyze_inflation_impact(category):
     """Analyze the impact of inflation on sales and generate mitigation strategies."""
     try:
-        init_db()
         data = request.get_json()
         
         inflation_factor = data.get('inflation_factor', 30)  # Default inflation factor
@@ -3554,22 +3584,12 @@ def analyze_inflation_impact(category):
         if not category:
             return jsonify({"error": "Category is required"}), 400
         
-        # Fetch data for the category
-        collection = get_collection("item_specification_monthly_demand")
-        item_data = list(collection.find({"القسم": category}, {"_id": 0}))
+        # Fetch the category's rows, already numeric
+        df = load_category_rows(category)
         
-        if not item_data:
+        if df.empty:
             return jsonify({"error": f"No data found for category: {category}"}), 404
         
-        # Convert to DataFrame
-        df = pd.DataFrame(item_data)
-        
-        # Ensure numeric values
-        df["total_quantity"] = pd.to_numeric(df["total_quantity"], errors="coerce")
-        df["total_money_sold"] = pd.to_numeric(df["total_money_sold"], errors="coerce")
-        df["year"] = pd.to_numeric(df["year"], errors="coerce")
-        df["month"] = pd.to_numeric(df["month"], errors="coerce")
-        
         # Calculate yearly aggregates
         yearly_agg = df.groupby("year").agg({
             "total_quantity": "sum",
@@ -3581,9 +3601,7 @@ def analyze_inflation_impact(category):
         yearly_agg["avg_price"] = yearly_agg["avg_price"].fillna(0).round(2)
         
         # Calculate year-over-year growth rates
-        yearly_agg["quantity_growth"] = yearly_agg["total_quantity"].pct_change() * 100
-        yearly_agg["revenue_growth"] = yearly_agg["total_money_sold"].pct_change() * 100
-        yearly_agg["price_growth"] = yearly_agg["avg_price"].pct_change() * 100
+        add_growth_columns(yearly_agg)
         
         # Format data for response
         yearly_data = []
@@ -3640,15 +3658,6 @@ def analyze_inflation_impact(category):
         monthly_impact = []
         
         if inflation_impact["detected"]:
-            # Define month names
-            month_names = [
-                'يناير', 'فبراير', 'مارس', 'أبريل', 'مايو', 'يونيو',
-                'يوليو', 'أغسطس', 'سبتمبر', 'أكتوبر', 'نوفمبر', 'ديسمبر'
-            ]
-            
-            # Map month numbers to names
-            month_name_map = {i+1: name for i, name in enumerate(month_names)}
-            
             for month in range(1, 13):
                 month_data = df[df["month"] == month]
                 
@@ -3680,7 +3689,7 @@ def analyze_inflation_impact(category):
                     # Check for inflation impact
                     if price_change > 5 and quantity_change < 0:
                         monthly_impact.append({
-                            "month": month_name_map[month],
+                            "month": MONTH_NAME_MAP[month],
                             "month_number": month,
                             "price_increase": float(price_change.round(1)),
                             "quantity_decrease": float(abs(quantity_change.round(1))),
@@ -3709,7 +3718,7 @@ def analyze_inflation_impact(category):
             price_elasticity
         )
         
-        return jsonify({
+        return orjson_response({
             "category": category,
             "yearly_data": yearly_data,
             "inflation_impact": inflation_impact,
@@ -3718,7 +3727,7 @@ def analyze_inflation_impact(category):
             "price_elasticity": price_elasticity,
             "mitigation_strategies": strategies,
             "pricing_scenarios": pricing_scenarios
-        }), 200
+        })
         
     except Exception as e:
         print(f" Error in inflation impact analysis for {category}: {str(e)}")
@@ -4026,7 +4035,6 @@ def forecast_pricing_scenarios(yearly_data, inflation_factor, price_elasticity):
 def comprehensive_strategy(category):
     """Generate a comprehensive business strategy based on all analyses."""
     try:
-        init_db()
         data = request.get_json()
         
         inflation_factor = data.get('inflation_factor', 30)  # Default inflation factor
@@ -4035,22 +4043,12 @@ def comprehensive_strategy(category):
         if not category:
             return jsonify({"error": "Category is required"}), 400
         
-        # Fetch data for the category
-        collection = get_collection("item_specification_monthly_demand")
-        item_data = list(collection.find({"القسم": category}, {"_id": 0}))
+        # Fetch the category's rows, already numeric
+        df = load_category_rows(category)
         
-        if not item_data:
+        if df.empty:
             return jsonify({"error": f"No data found for category: {category}"}), 404
         
-        # Convert to DataFrame
-        df = pd.DataFrame(item_data)
-        
-        # Ensure numeric values
-        df["total_quantity"] = pd.to_numeric(df["total_quantity"], errors="coerce")
-        df["total_money_sold"] = pd.to_numeric(df["total_money_sold"], errors="coerce")
-        df["year"] = pd.to_numeric(df["year"], errors="coerce")
-        df["month"] = pd.to_numeric(df["month"], errors="coerce")
-        
         # Process the sales data
         strategy_data = process_sales_data(df, category, inflation_factor, analysis_notes)
         
@@ -4088,7 +4086,7 @@ def comprehensive_strategy(category):
             "analysis_notes": analysis_notes
         }
         
-        return jsonify(comprehensive_response), 200
+        return orjson_response(comprehensive_response)
         
     except Exception as e:
         print(f" Error generating comprehensive strategy for {category}: {str(e)}")
@@ -4096,15 +4094,6 @@ def comprehensive_strategy(category):
 
 def run_monthly_comparison(df, category):
     """Run monthly performance comparison analysis."""
-    # Define month names
-    month_names = [
-        'يناير', 'فبراير', 'مارس', 'أبريل', 'مايو', 'يونيو',
-        'يوليو', 'أغسطس', 'سبتمبر', 'أكتوبر', 'نوفمبر', 'ديسمبر'
-    ]
-    
-    # Create month name mapping
-    month_name_map = {i+1: name for i, name in enumerate(month_names)}
-    
     # Group by month and year
     monthly_yearly = df.groupby(["month", "year"]).agg({
         "total_quantity": "sum",
@@ -4128,9 +4117,7 @@ def run_monthly_comparison(df, category):
         month_data = month_data.sort_values("year")
         
         # Calculate year-over-year growth rates
-        month_data["quantity_growth"] = month_data["total_quantity"].pct_change() * 100
-        month_data["revenue_growth"] = month_data["total_money_sold"].pct_change() * 100
-        month_data["price_growth"] = month_data["unit_price"].pct_change() * 100
+        add_growth_columns(month_data, "unit_price")
         
         # Prepare data for response
         years_data = []
@@ -4167,7 +4154,7 @@ def run_monthly_comparison(df, category):
                 if latest_year["price_growth"] > 5 and latest_year["quantity_growth"] < 0:
                     has_inflation_impact = True
         
-        months_comparison[month_name_map[month]] = {
+        months_comparison[MONTH_NAME_MAP[month]] = {
             "years_data": years_data,
             "avg_metrics": avg_metrics,
             "has_inflation_impact": has_inflation_impact
@@ -4177,25 +4164,8 @@ def run_monthly_comparison(df, category):
 
 def run_seasonal_comparison(df, category):
     """Run seasonal performance comparison analysis."""
-    # Define seasons
-    winter_months = [12, 1, 2]
-    spring_months = [3, 4, 5]
-    summer_months = [6, 7, 8]
-    fall_months = [9, 10, 11]
-    
-    # Function to assign season
-    def get_season(month):
-        if month in winter_months:
-            return "الشتاء"
-        elif month in spring_months:
-            return "الربيع"
-        elif month in summer_months:
-            return "الصيف"
-        else:
-            return "الخريف"
-    
     # Add season to data
-    df["season"] = df["month"].apply(get_season)
+    df["season"] = assign_season(df["month"])
     
     # Group by season and year
     seasonal_yearly = df.groupby(["season", "year"]).agg({
@@ -4220,9 +4190,7 @@ def run_seasonal_comparison(df, category):
         season_data = season_data.sort_values("year")
         
         # Calculate year-over-year growth rates
-        season_data["quantity_growth"] = season_data["total_quantity"].pct_change() * 100
-        season_data["revenue_growth"] = season_data["total_money_sold"].pct_change() * 100
-        season_data["price_growth"] = season_data["unit_price"].pct_change() * 100
+        add_growth_columns(season_data, "unit_price")
         
         # Prepare data for response
         years_data = []
@@ -4280,9 +4248,7 @@ def run_inflation_analysis(df, category, inflation_factor):
     yearly_agg["avg_price"] = yearly_agg["avg_price"].fillna(0).round(2)
     
     # Calculate year-over-year growth rates
-    yearly_agg["quantity_growth"] = yearly_agg["total_quantity"].pct_change() * 100
-    yearly_agg["revenue_growth"] = yearly_agg["total_money_sold"].pct_change() * 100
-    yearly_agg["price_growth"] = yearly_agg["avg_price"].pct_change() * 100
+    add_growth_columns(yearly_agg)
     
     # Format data for response
     yearly_data = []
@@ -4494,7 +4460,7 @@ def generate_comprehensive_recommendations(strategy_data, monthly_comparison, se
     seasonal_events = strategy_data.get("seasonalEvents", [])
     
     for event in seasonal_events:
-        if event.get("strategicImportance") in ["مرتفعة", "مرتفعة جداً"]:
+        if event.get("strategicImportance") in HIGH_IMPORTANCE_LEVELS:
             event_strategies = event.get("strategies", [])
             
             recommendations["seasonal_strategy"]["seasonal_events"].append({
@@ -4616,27 +4582,15 @@ def generate_comprehensive_recommendations(strategy_data, monthly_comparison, se
 def sales_trends_dashboard(category):
     """Generate a comprehensive sales trends dashboard with key metrics and insights."""
     try:
-        init_db()
-        
         if not category:
             return jsonify({"error": "Category is required"}), 400
         
-        # Fetch data for the category
-        collection = get_collection("item_specification_monthly_demand")
-        item_data = list(collection.find({"القسم": category}, {"_id": 0}))
+        # Fetch the category's rows, already numeric
+        df = load_category_rows(category)
         
-        if not item_data:
+        if df.empty:
             return jsonify({"error": f"No data found for category: {category}"}), 404
         
-        # Convert to DataFrame
-        df = pd.DataFrame(item_data)
-        
-        # Ensure numeric values
-        df["total_quantity"] = pd.to_numeric(df["total_quantity"], errors="coerce")
-        df["total_money_sold"] = pd.to_numeric(df["total_money_sold"], errors="coerce")
-        df["year"] = pd.to_numeric(df["year"], errors="coerce")
-        df["month"] = pd.to_numeric(df["month"], errors="coerce")
-        
         # 1. Generate yearly trends
         yearly_trends = get_yearly_trends(df)
         
@@ -4655,7 +4609,7 @@ def sales_trends_dashboard(category):
         # 6. Generate insights and alerts
         insights = generate_dashboard_insights(yearly_trends, monthly_trends, seasonal_trends, kpis, category)
         
-        return jsonify({
+        return orjson_response({
             "category": category,
             "kpis": kpis,
             "yearly_trends": yearly_trends,
@@ -4663,7 +4617,7 @@ def sales_trends_dashboard(category):
             "seasonal_trends": seasonal_trends,
             "product_trends": product_trends,
             "insights": insights
-        }), 200
+        })
         
     except Exception as e:
         print(f" Error generating sales trends dashboard for {category}: {str(e)}")
@@ -4682,9 +4636,7 @@ def get_yearly_trends(df):
     yearly_agg["avg_price"] = yearly_agg["avg_price"].fillna(0).round(2)
     
     # Calculate year-over-year growth rates
-    yearly_agg["quantity_growth"] = yearly_agg["total_quantity"].pct_change() * 100
-    yearly_agg["revenue_growth"] = yearly_agg["total_money_sold"].pct_change() * 100
-    yearly_agg["price_growth"] = yearly_agg["avg_price"].pct_change() * 100
+    add_growth_columns(yearly_agg)
     
     # Format for response
     years_data = []
@@ -4741,15 +4693,6 @@ def get_yearly_trends(df):
 
 def get_monthly_trends(df):
     """Generate monthly sales trends data."""
-    # Define month names
-    month_names = [
-        'يناير', 'فبراير', 'مارس', 'أبريل', 'مايو', 'يونيو',
-        'يوليو', 'أغسطس', 'سبتمبر', 'أكتوبر', 'نوفمبر', 'ديسمبر'
-    ]
-    
-    # Map month numbers to names
-    month_name_map = {i+1: name for i, name in enumerate(month_names)}
-    
     # Group by month
     monthly_agg = df.groupby("month").agg({
         "total_quantity": "sum",
@@ -4761,7 +4704,7 @@ def get_monthly_trends(df):
     monthly_agg["avg_price"] = monthly_agg["avg_price"].fillna(0).round(2)
     
     # Add month names
-    monthly_agg["month_name"] = monthly_agg["month"].map(month_name_map)
+    monthly_agg["month_name"] = assign_month_name(monthly_agg["month"])
     
     # Calculate distribution percentages
     total_quantity = monthly_agg["total_quantity"].sum()
@@ -4814,25 +4757,8 @@ def get_monthly_trends(df):
 
 def get_seasonal_trends(df):
     """Generate seasonal sales trends data."""
-    # Define seasons
-    winter_months = [12, 1, 2]
-    spring_months = [3, 4, 5]
-    summer_months = [6, 7, 8]
-    fall_months = [9, 10, 11]
-    
-    # Function to assign season
-    def get_season(month):
-        if month in winter_months:
-            return "الشتاء"
-        elif month in spring_months:
-            return "الربيع"
-        elif month in summer_months:
-            return "الصيف"
-        else:
-            return "الخريف"
-    
     # Add season to data
-    df["season"] = df["month"].apply(get_season)
+    df["season"] = assign_season(df["month"])
     
     # Group by season
     seasonal_agg = df.groupby("season").agg({
@@ -4870,8 +4796,8 @@ def get_seasonal_trends(df):
     weakest_season = seasonal_agg.loc[seasonal_agg["total_quantity"].idxmin(), "season"]
     
     # Calculate seasonality strength (ratio of strongest to weakest season)
-    strongest_quantity = seasonal_agg.loc[seasonal_agg["season"] == strongest_season, "total_quantity"].iloc[0]
-    weakest_quantity = seasonal_agg.loc[seasonal_agg["season"] == weakest_season, "total_quantity"].iloc[0]
+    strongest_quantity = seasonal_agg["total_quantity"].max()
+    weakest_quantity = seasonal_agg["total_quantity"].min()
     
     seasonality_ratio = strongest_quantity / weakest_quantity if weakest_quantity > 0 else 1
     
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, url_for
 import os
 import sys
 import pandas as pd
@@ -6,13 +6,11 @@ import csv
 from werkzeug.utils import secure_filename
 from datetime import datetime
 import subprocess
-import threading
 import time
 import json
-from app.models.database import init_db, insert_data, fetch_data, get_collection
+from app.models.database import insert_data, get_collection
 from app.routes.auth import token_required, admin_required
-import threading
-from app.utils.process_data_pipeline import run_pipeline, get_pipeline_status
+from app.utils.process_data_pipeline import get_pipeline_status, start_pipeline
 
 upload_bp = Blueprint('upload', __name__)
 
@@ -196,14 +194,11 @@ def upload_data():
             # Convert to list of dictionaries
             records = df.to_dict(orient='records')
             
-            # Initialize database
-            init_db()
-            
             # Determine collection name based on data type
             collection_name = "sales" if data_type == "sales" else "purchases"
             
             # Get existing data count
-            existing_count = len(fetch_data(collection_name))
+            existing_count = get_collection(collection_name).estimated_document_count()
             
             # Append to collection instead of replacing
             inserted_count = append_to_collection(collection_name, records)
@@ -245,15 +240,20 @@ def process_data():
                 "message": "لم يتم رفع أي ملف بعد"
             }), 400
         
-        # Start the pipeline in a separate thread
-        processing_thread = threading.Thread(target=run_pipeline)
-        processing_thread.daemon = True
-        processing_thread.start()
+        # Only one pipeline run at a time; clients poll the status endpoint.
+        # Step statuses are reset before returning so pollers never see the
+        # previous run, and the pipeline runs in a separate thread
+        if not start_pipeline():
+            return jsonify({
+                "success": False,
+                "message": "معالجة البيانات قيد التشغيل بالفعل"
+            }), 409
         
         return jsonify({
             "success": True,
-            "message": "بدأت معالجة البيانات"
-        }), 200
+            "message": "بدأت معالجة البيانات",
+            "status_url": url_for('upload.get_process_status')
+        }), 202
         
     except Exception as e:
         print(f"Error starting data processing: {str(e)}")
@@ -278,12 +278,9 @@ def get_process_status():
 def get_collection_stats():
     """Get stats about the collections (count of records)."""
     try:
-        # Initialize database
-        init_db()
-        
         # Get counts
-        sales_count = len(fetch_data("sales"))
-        purchases_count = len(fetch_data("purchases"))
+        sales_count = get_collection("sales").estimated_document_count()
+        purchases_count = get_collection("purchases").estimated_document_count()
         
         return jsonify({
             "success": True,
@@ -1,12 +1,23 @@
-from flask import Blueprint, request, jsonify, Response
-import json
-from app.models.database import fetch_data
+from flask import Blueprint, request
+from collections import defaultdict
+from itertools import chain
+from app.models.database import fetch_data, fetch_cursor, get_collection, numeric_field
+from app.utils.orjson_response import orjson_response, stream_json_list
+from app.utils.cache import cached_response
+from app.utils.helper import parse_pagination, etag_from_collection, to_float
 import pandas as pd
+import numpy as np
 from datetime import datetime
 
 visualization_bp = Blueprint('visualization', __name__)
 
+# Only the fields the monthly/seasonal handlers read from category_monthly_demand
+MONTHLY_DEMAND_PROJECTION = {"_id": 0, "القسم": 1, "year": 1, "month": 1, "total_quantity": 1, "total_money_sold": 1}
+MONTHLY_DEMAND_NUMERIC_COLUMNS = ["year", "month", "total_quantity", "total_money_sold"]
+
 @visualization_bp.route('/demand-forecasting', methods=['GET'])
+@etag_from_collection("predicted_demand_2025")
+@cached_response()
 def get_demand_forecasting():
     try:
         # Fetch predicted demand data for 2025
@@ -15,10 +26,10 @@ def get_demand_forecasting():
         # If no data is found, return an empty result with a warning
         if not predicted_data:
             print("⚠ No predicted demand data found for 2025")
-            return jsonify({
+            return orjson_response({
                 "demand_data": {},
                 "message": "No predicted demand data available for 2025. Please ensure historical data is available and predictions have been generated."
-            }), 200
+            }, 200)
 
         # Convert to DataFrame
         df = pd.DataFrame(predicted_data)
@@ -36,14 +47,15 @@ def get_demand_forecasting():
             result[category] = monthly_demand
 
         # Convert to JSON with UTF-8 encoding
-        json_response = json.dumps({"demand_data": result}, ensure_ascii=False, indent=4)
-        return Response(json_response, content_type="application/json; charset=utf-8")
+        return orjson_response({"demand_data": result})
 
     except Exception as e:
         print(f" Error fetching predicted demand data: {str(e)}")
-        return jsonify({"error": f"Failed to fetch predicted demand data: {str(e)}"}), 500
+        return orjson_response({"error": f"Failed to fetch predicted demand data: {str(e)}"}, 500)
 
 @visualization_bp.route('/demand-forecasting-items', methods=['GET'])
+@etag_from_collection("predicted_item_demand_2025")
+@cached_response()
 def get_demand_forecasting_items():
     try:
         # Fetch predicted demand data for 2025 (item specifications within categories)
@@ -52,10 +64,10 @@ def get_demand_forecasting_items():
         # If no data is found, return an empty result with a warning
         if not predicted_data:
             print("⚠ No predicted item demand data found for 2025")
-            return jsonify({
+            return orjson_response({
                 "demand_data_items": {},
                 "message": "No predicted item demand data available for 2025. Please ensure historical data is available and predictions have been generated."
-            }), 200
+            }, 200)
 
         # Convert to DataFrame
         df = pd.DataFrame(predicted_data)
@@ -78,12 +90,11 @@ def get_demand_forecasting_items():
             result[category] = category_result
 
         # Convert to JSON with UTF-8 encoding
-        json_response = json.dumps({"demand_data_items": result}, ensure_ascii=False, indent=4)
-        return Response(json_response, content_type="application/json; charset=utf-8")
+        return orjson_response({"demand_data_items": result})
 
     except Exception as e:
         print(f" Error fetching predicted item demand data: {str(e)}")
-        return jsonify({"error": f"Failed to fetch predicted item demand data: {str(e)}"}), 500
+        return orjson_response({"error": f"Failed to fetch predicted item demand data: {str(e)}"}, 500)
 
 @visualization_bp.route('/sales-rate', methods=['GET'])
 def get_sales_rate():
@@ -93,51 +104,57 @@ def get_sales_rate():
         start_date = request.args.get('start_date')  # Format: DD/MM/YYYY
         end_date = request.args.get('end_date')      # Format: DD/MM/YYYY
 
-        # Fetch sales data from classified_sales
-        sales_data = fetch_data("classified_sales", projection={"_id": 0, "القسم": 1, "الكمية": 1, "التاريخ": 1})
-
-        if not sales_data:
+        # Sum quantities per raw date string straight off the cursor; only the
+        # distinct dates are kept in memory, not every sale
+        query = {"القسم": category} if category else {"القسم": {"$ne": None}}
+        cursor = fetch_cursor("classified_sales", query, {"_id": 0, "الكمية": 1, "التاريخ": 1})
+        quantity_by_date = defaultdict(float)
+        seen = False
+        for sale in cursor:
+            seen = True
+            quantity = to_float(sale.get("الكمية"))
+            if quantity is not None and sale.get("التاريخ"):
+                quantity_by_date[sale["التاريخ"]] += quantity
+
+        if not seen and not category:
             print("⚠ No records found in classified_sales")
-            return jsonify({
+            return orjson_response({
                 "sales_rate_data": [],
                 "message": "No sales data found in the 'classified_sales' collection."
-            }), 200
-
-        # Convert to DataFrame
-        df = pd.DataFrame(sales_data)
-        df["الكمية"] = pd.to_numeric(df["الكمية"], errors="coerce")
-        df["التاريخ"] = pd.to_datetime(df["التاريخ"], format="%d/%m/%Y")
-        df.dropna(subset=["الكمية", "التاريخ", "القسم"], inplace=True)
+            }, 200)
 
-        # Filter by category if provided
-        if category:
-            df = df[df['القسم'] == category]
+        # Parse each distinct date once
+        quantity_by_date = {
+            datetime.strptime(date, "%d/%m/%Y"): quantity
+            for date, quantity in quantity_by_date.items()
+        }
 
         # Filter by date range if provided
         if start_date and end_date:
-            start = pd.to_datetime(start_date, format="%d/%m/%Y")
-            end = pd.to_datetime(end_date, format="%d/%m/%Y")
-            df = df[(df['التاريخ'] >= start) & (df['التاريخ'] <= end)]
+            start = datetime.strptime(start_date, "%d/%m/%Y")
+            end = datetime.strptime(end_date, "%d/%m/%Y")
+            quantity_by_date = {date: quantity for date, quantity in quantity_by_date.items() if start <= date <= end}
 
         # Calculate total quantity
-        total_quantity = df["الكمية"].sum()
+        total_quantity = sum(quantity_by_date.values())
         if total_quantity == 0:
-            return jsonify({
+            return orjson_response({
                 "sales_rate_data": [],
                 "message": "No sales data found within the specified range."
-            }), 200
+            }, 200)
 
         # Calculate sales rate by date
-        df['sales_rate'] = (df['الكمية'] / total_quantity) * 100
-        result = df.groupby('التاريخ').agg({'sales_rate': 'sum'}).reset_index().to_dict(orient="records")
+        result = [
+            {"التاريخ": date, "sales_rate": quantity / total_quantity * 100}
+            for date, quantity in sorted(quantity_by_date.items())
+        ]
 
         # Convert to JSON with UTF-8 encoding
-        json_response = json.dumps({"sales_rate_data": result}, ensure_ascii=False, indent=4)
-        return Response(json_response, content_type="application/json; charset=utf-8")
+        return orjson_response({"sales_rate_data": result})
 
     except Exception as e:
         print(f" Error fetching sales rate data: {str(e)}")
-        return jsonify({"error": f"Failed to fetch sales rate data: {str(e)}"}), 500
+        return orjson_response({"error": f"Failed to fetch sales rate data: {str(e)}"}, 500)
 
 @visualization_bp.route('/monthly-demand', methods=['GET'])
 def get_monthly_demand():
@@ -149,40 +166,51 @@ def get_monthly_demand():
 
         # Validate parameters
         if not categories or not start_month_year or not end_month_year:
-            return jsonify({"message": "Missing parameters"}), 400
+            return orjson_response({"message": "Missing parameters"}, 400)
 
         # Parse month-year to extract year and month
         start = datetime.strptime(start_month_year + '-01', '%Y-%m-%d')
         end = datetime.strptime(end_month_year + '-01', '%Y-%m-%d')
 
+        # Push the category and year-range filters down to MongoDB. Years stored
+        # as strings cannot be range-compared there, so they are all fetched and
+        # trimmed by the month range below after pd.to_numeric.
+        query = {"$or": [
+            {"year": {"$gte": start.year, "$lte": end.year}},
+            {"year": {"$type": "string"}}
+        ]}
+        if categories[0]:  # Check if categories list is not empty
+            query["القسم"] = {"$in": categories}
+
         # Fetch data from category_monthly_demand
-        demand_data = fetch_data("category_monthly_demand", projection={"_id": 0})
+        demand_data = fetch_data("category_monthly_demand", query=query, projection=MONTHLY_DEMAND_PROJECTION)
 
         if not demand_data:
+            if get_collection("category_monthly_demand").find_one({}, {"_id": 1}) is not None:
+                # The collection has data, just none for these filters
+                return orjson_response({
+                    "monthly_demand_data": [],
+                    "message": "No data found within the specified range."
+                }, 200)
             print("⚠ No records found in category_monthly_demand")
-            return jsonify({
+            return orjson_response({
                 "monthly_demand_data": [],
                 "message": "No data found in the 'category_monthly_demand' collection."
-            }), 200
+            }, 200)
 
         # Convert to DataFrame
         df = pd.DataFrame(demand_data)
-        df["year"] = pd.to_numeric(df["year"], errors="coerce")
-        df["month"] = pd.to_numeric(df["month"], errors="coerce")
-        df["total_quantity"] = pd.to_numeric(df["total_quantity"], errors="coerce")
-        df["total_money_sold"] = pd.to_numeric(df["total_money_sold"], errors="coerce")
+        # Mongo usually returns numbers already; only coerce a mixed/string block
+        numeric = df[MONTHLY_DEMAND_NUMERIC_COLUMNS]
+        if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in numeric.dtypes):
+            df[MONTHLY_DEMAND_NUMERIC_COLUMNS] = numeric.apply(pd.to_numeric, errors="coerce")
         df.dropna(subset=["القسم", "year", "month", "total_quantity", "total_money_sold"], inplace=True)
 
-        # Filter by categories
-        if categories[0]:  # Check if categories list is not empty
-            df = df[df['القسم'].isin(categories)]
-
-        # Filter by month-year range
+        # Trim the boundary years to the requested months
+        month_key = df['year'] * 12 + df['month']
         df = df[
-            (df['year'] > start.year) |
-            ((df['year'] == start.year) & (df['month'] >= start.month)) &
-            (df['year'] < end.year) |
-            ((df['year'] == end.year) & (df['month'] <= end.month))
+            (month_key >= start.year * 12 + start.month) &
+            (month_key <= end.year * 12 + end.month)
         ]
 
         # Group by category, year, and month to sum total_quantity and total_money_sold
@@ -192,18 +220,41 @@ def get_monthly_demand():
         }).reset_index()
 
         if result.empty:
-            return jsonify({
+            return orjson_response({
                 "monthly_demand_data": [],
                 "message": "No data found within the specified range."
-            }), 200
+            }, 200)
 
         # Convert to JSON with UTF-8 encoding
-        json_response = json.dumps({"monthly_demand_data": result.to_dict(orient="records")}, ensure_ascii=False, indent=4)
-        return Response(json_response, content_type="application/json; charset=utf-8")
+        return orjson_response({"monthly_demand_data": result.to_dict(orient="records")})
 
     except Exception as e:
         print(f" Error fetching monthly demand data: {str(e)}")
-        return jsonify({"error": f"Failed to fetch monthly demand data: {str(e)}"}), 500
+        return orjson_response({"error": f"Failed to fetch monthly demand data: {str(e)}"}, 500)
+
+def seasonal_analysis_pipeline(category=None, year=None):
+    """
+    Pipeline for /seasonal-analysis rows.
+
+    year/month/total_quantity/total_money_sold are converted with numeric_field,
+    so numeric strings are kept as numbers; rows with a missing category or a
+    non-numeric/NaN value are dropped, as pd.to_numeric + dropna did.
+
+    :param category: Category to keep, or None/'all' for every category.
+    :param year: Year to keep, or None/'all' for every year.
+    :return: Aggregation pipeline list.
+    """
+    category_filter = category if category and category != 'all' else {"$ne": None}
+    numeric_filter = {field: {"$gte": float("-inf")} for field in MONTHLY_DEMAND_NUMERIC_COLUMNS}
+    if year and year != 'all':
+        numeric_filter["year"] = int(year)
+    projection = {"_id": 0, "القسم": 1}
+    projection.update({field: numeric_field(field, "double") for field in MONTHLY_DEMAND_NUMERIC_COLUMNS})
+    return [
+        {"$match": {"القسم": category_filter}},
+        {"$project": projection},
+        {"$match": numeric_filter}
+    ]
 
 @visualization_bp.route('/seasonal-analysis', methods=['GET'])
 def get_seasonal_analysis():
@@ -212,46 +263,68 @@ def get_seasonal_analysis():
         category = request.args.get('category')
         year = request.args.get('year')
         
-        # Fetch data from category_monthly_demand
-        demand_data = fetch_data("category_monthly_demand", projection={"_id": 0})
+        # Filtering and numeric conversion run in MongoDB; rows are streamed from the cursor
+        collection = get_collection("category_monthly_demand")
+        cursor = collection.aggregate(seasonal_analysis_pipeline(category, year), batchSize=500)
+        first_row = next(cursor, None)
 
-        if not demand_data:
+        if first_row is None and collection.find_one({}, {"_id": 1}) is None:
             print("⚠ No records found in category_monthly_demand")
-            return jsonify({
+            return orjson_response({
                 "monthly_demand_data": [],
                 "message": "No data found in the 'category_monthly_demand' collection."
-            }), 200
+            }, 200)
 
-        # Convert to DataFrame
-        df = pd.DataFrame(demand_data)
-        df["year"] = pd.to_numeric(df["year"], errors="coerce")
-        df["month"] = pd.to_numeric(df["month"], errors="coerce")
-        df["total_quantity"] = pd.to_numeric(df["total_quantity"], errors="coerce")
-        df["total_money_sold"] = pd.to_numeric(df["total_money_sold"], errors="coerce")
-        df.dropna(subset=["القسم", "year", "month", "total_quantity", "total_money_sold"], inplace=True)
-
-        # Apply filters if provided
-        if category and category != 'all':
-            df = df[df['القسم'] == category]
-        if year and year != 'all':
-            df = df[df['year'] == int(year)]
-
-        # Convert to JSON with UTF-8 encoding
-        json_response = json.dumps({
-            "monthly_demand_data": df.to_dict(orient="records"),
-            "message": None
-        }, ensure_ascii=False, indent=4)
-        
-        return Response(json_response, content_type="application/json; charset=utf-8")
+        rows = chain([first_row], cursor) if first_row is not None else []
+        return stream_json_list("monthly_demand_data", rows, {"message": None})
 
     except Exception as e:
         print(f" Error fetching seasonal analysis data: {str(e)}")
-        return jsonify({"error": f"Failed to fetch seasonal analysis data: {str(e)}"}), 500
+        return orjson_response({"error": f"Failed to fetch seasonal analysis data: {str(e)}"}, 500)
 
 # Add this endpoint to your visualization.py file
 
 # Replace the existing category-performance endpoint in visualization.py with this updated version:
 
+FORECAST_YEAR = 2025
+
+def build_forecast_query(args, with_month=False):
+    """Build the predicted-demand query from category/specification(/month) parameters."""
+    query = {"year": FORECAST_YEAR}
+    category = args.get('category')
+    if category:
+        query["القسم"] = category
+    specification = args.get('specification')
+    if specification:
+        query["product_specification"] = specification
+    if with_month:
+        month = args.get('month')
+        if month:
+            query["month"] = int(month)
+    return query
+
+def sum_by_group(keys, records):
+    """
+    Sum total_money_sold and total_quantity per group key.
+
+    Keys are factorized once and summed with np.bincount instead of a
+    per-record dict update. Groups keep their first-appearance order.
+    Yields (key, sales, quantity) tuples.
+    """
+    key_array = np.empty(len(keys), dtype=object)
+    key_array[:] = keys
+    codes, groups = pd.factorize(key_array)
+    sales = np.array([record['total_money_sold'] for record in records])
+    quantities = np.array([record['total_quantity'] for record in records])
+    sales_sums = np.bincount(codes, weights=sales, minlength=len(groups))
+    quantity_sums = np.bincount(codes, weights=quantities, minlength=len(groups))
+    # bincount always returns floats; keep integer sales and quantities integral
+    if sales.dtype.kind in 'iu':
+        sales_sums = sales_sums.astype(np.int64)
+    if quantities.dtype.kind in 'iu':
+        quantity_sums = quantity_sums.astype(np.int64)
+    return zip(groups, sales_sums.tolist(), quantity_sums.tolist())
+
 @visualization_bp.route('/category-performance', methods=['GET'])
 def get_category_performance():
     try:
@@ -281,7 +354,7 @@ def get_category_performance():
         category_data = fetch_data("category_monthly_demand", query=query, projection={"_id": 0})
         
         if not category_data:
-            return jsonify({
+            return orjson_response({
                 "status": "success",
                 "message": "لا توجد بيانات متاحة للمعايير المحددة",
                 "performance_data": []
@@ -292,46 +365,30 @@ def get_category_performance():
         
         if group_by == 'yearly':
             # Group by year and category
-            yearly_data = {}
-            for item in category_data:
-                key = (item['year'], item['القسم'])
-                if key not in yearly_data:
-                    yearly_data[key] = {
-                        'year': item['year'],
-                        'Category': item['القسم'],
-                        'Date': f"{item['year']}-01-01",
-                        'Sales': 0,
-                        'Quantity': 0
-                    }
-                yearly_data[key]['Sales'] += item['total_money_sold']
-                yearly_data[key]['Quantity'] += item['total_quantity']
-            
-            processed_data = list(yearly_data.values())
+            keys = [(item['year'], item['القسم']) for item in category_data]
+            for (year, category), sales, quantity in sum_by_group(keys, category_data):
+                processed_data.append({
+                    'year': year,
+                    'Category': category,
+                    'Date': f"{year}-01-01",
+                    'Sales': sales,
+                    'Quantity': quantity
+                })
             
         elif group_by == 'quarterly':
-            # Group by year, quarter and category
-            quarterly_data = {}
-            for item in category_data:
-                # Calculate quarter (1-4)
-                quarter = (item['month'] - 1) // 3 + 1
-                key = (item['year'], quarter, item['القسم'])
-                
+            # Group by year, quarter (1-4) and category
+            keys = [(item['year'], (item['month'] - 1) // 3 + 1, item['القسم']) for item in category_data]
+            for (year, quarter, category), sales, quantity in sum_by_group(keys, category_data):
                 # First month of the quarter for the date
                 quarter_month = ((quarter - 1) * 3) + 1
-                
-                if key not in quarterly_data:
-                    quarterly_data[key] = {
-                        'year': item['year'],
-                        'quarter': quarter,
-                        'Category': item['القسم'],
-                        'Date': f"{item['year']}-{quarter_month:02d}-01",
-                        'Sales': 0,
-                        'Quantity': 0
-                    }
-                quarterly_data[key]['Sales'] += item['total_money_sold']
-                quarterly_data[key]['Quantity'] += item['total_quantity']
-            
-            processed_data = list(quarterly_data.values())
+                processed_data.append({
+                    'year': year,
+                    'quarter': quarter,
+                    'Category': category,
+                    'Date': f"{year}-{quarter_month:02d}-01",
+                    'Sales': sales,
+                    'Quantity': quantity
+                })
             
         else:  # monthly (default)
             # Format the data needed for the frontend
@@ -395,7 +452,7 @@ def get_category_performance():
                     'previousSales': prev_sales
                 })
         
-        return jsonify({
+        return orjson_response({
             "status": "success",
             "performance_data": processed_data,
             "market_share": sales_distribution, 
@@ -404,38 +461,43 @@ def get_category_performance():
         
     except Exception as e:
         print(f"Error in category performance endpoint: {str(e)}")
-        return jsonify({
+        return orjson_response({
             "status": "error",
             "message": str(e)
-        }), 500
+        }, 500)
 
 
 @visualization_bp.route('/item-demand-forecasting', methods=['GET'])
+@etag_from_collection("predicted_item_demand_2025")
+@cached_response()
 def get_item_demand_forecasting():
     try:
-        # Get query parameters
-        category = request.args.get('category')
-        specification = request.args.get('specification')
-        
-        # Build the query
-        query = {"year": 2025}
-        
-        if category:
-            query["القسم"] = category
-            
-        if specification:
-            query["product_specification"] = specification
+        # Build the query from the request parameters
+        query = build_forecast_query(request.args)
         
         # Fetch predicted item demand data for 2025
-        item_predicted_data = fetch_data("predicted_item_demand_2025", query=query, projection={"_id": 0})
+        # Optional pagination (page/per_page), pushed down to MongoDB
+        try:
+            pagination = parse_pagination(request.args)
+        except ValueError:
+            return orjson_response({"error": "Invalid page or per_page"}, 400)
+        if pagination:
+            page, per_page = pagination
+            item_predicted_data = fetch_data(
+                "predicted_item_demand_2025", query=query, projection={"_id": 0},
+                sort=[("القسم", 1), ("product_specification", 1), ("month", 1)],
+                skip=(page - 1) * per_page, limit=per_page
+            )
+        else:
+            item_predicted_data = fetch_data("predicted_item_demand_2025", query=query, projection={"_id": 0})
 
         # If no data is found, return an empty result with a warning
         if not item_predicted_data:
             print("⚠ No predicted item demand data found for 2025")
-            return jsonify({
+            return orjson_response({
                 "item_demand_data": {},
                 "message": "No predicted item demand data available for 2025. Please run the AI-based prediction first."
-            }), 200
+            }, 200)
 
         # Convert to DataFrame
         df = pd.DataFrame(item_predicted_data)
@@ -461,44 +523,52 @@ def get_item_demand_forecasting():
             }
 
         # Convert to JSON with UTF-8 encoding
-        json_response = json.dumps({"item_demand_data": result}, ensure_ascii=False, indent=4)
-        return Response(json_response, content_type="application/json; charset=utf-8")
+        response_data = {"item_demand_data": result}
+        if pagination:
+            response_data.update({
+                "page": page,
+                "per_page": per_page,
+                "has_more": len(item_predicted_data) == per_page
+            })
+        return orjson_response(response_data)
 
     except Exception as e:
         print(f" Error fetching predicted item demand data: {str(e)}")
-        return jsonify({"error": f"Failed to fetch predicted item demand data: {str(e)}"}), 500
+        return orjson_response({"error": f"Failed to fetch predicted item demand data: {str(e)}"}, 500)
 
 
 @visualization_bp.route('/daily-item-demand-forecasting', methods=['GET'])
+@etag_from_collection("predicted_daily_demand_2025")
+@cached_response()
 def get_daily_item_demand_forecasting():
     try:
-        # Get query parameters
-        category = request.args.get('category')
+        # Build the query from the request parameters
         specification = request.args.get('specification')
-        month = request.args.get('month')
-        
-        # Build the query
-        query = {"year": 2025}
-        
-        if category:
-            query["القسم"] = category
-            
-        if specification:
-            query["product_specification"] = specification
-            
-        if month:
-            query["month"] = int(month)
+        query = build_forecast_query(request.args, with_month=True)
             
         # Fetch predicted daily demand data for 2025
-        daily_predicted_data = fetch_data("predicted_daily_demand_2025", query=query, projection={"_id": 0})
+        # Optional pagination (page/per_page), pushed down to MongoDB
+        try:
+            pagination = parse_pagination(request.args)
+        except ValueError:
+            return orjson_response({"error": "Invalid page or per_page"}, 400)
+        if pagination:
+            page, per_page = pagination
+            daily_predicted_data = fetch_data(
+                "predicted_daily_demand_2025", query=query, projection={"_id": 0},
+                sort=[("القسم", 1), ("product_specification", 1), ("date", 1)],
+                skip=(page - 1) * per_page, limit=per_page
+            )
+        else:
+            daily_predicted_data = fetch_data("predicted_daily_demand_2025", query=query, projection={"_id": 0})
 
         # If no data is found, return an empty result with a warning
         if not daily_predicted_data:
             print("⚠ No predicted daily item demand data found for 2025")
-            return jsonify({
+            return orjson_response({
                 "daily_item_demand_data": {},
                 "message": "No predicted daily item demand data available for 2025. Please run the AI-based prediction first."
-            }), 200
+            }, 200)
 
         # Convert to DataFrame
         df = pd.DataFrame(daily_predicted_data)
@@ -540,9 +610,15 @@ def get_daily_item_demand_forecasting():
             }
 
         # Convert to JSON with UTF-8 encoding
-        json_response = json.dumps({"daily_item_demand_data": result}, ensure_ascii=False, indent=4)
-        return Response(json_response, content_type="application/json; charset=utf-8")
+        response_data = {"daily_item_demand_data": result}
+        if pagination:
+            response_data.update({
+                "page": page,
+                "per_page": per_page,
+                "has_more": len(daily_predicted_data) == per_page
+            })
+        return orjson_response(response_data)
 
     except Exception as e:
         print(f" Error fetching predicted daily item demand data: {str(e)}")
-        return jsonify({"error": f"Failed to fetch predicted daily item demand data: {str(e)}"}), 500
\ No newline at end of file
+        return orjson_response({"error": f"Failed to fetch predicted daily item demand data: {str(e)}"}, 500)
\ No newline at end of file
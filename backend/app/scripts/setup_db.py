@@ -0,0 +1,13 @@
+# backend/app/scripts/setup_db.py
+import sys
+import os
+
+# Add the backend directory to sys.path to allow app imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.models.database import setup_db
+
+if __name__ == "__main__":
+    # Create the API indexes and the category rollup (safe to rerun)
+    setup_db()
+    print("Database setup finished")
@@ -0,0 +1,112 @@
+import threading
+import time
+import orjson
+from collections import OrderedDict
+from functools import wraps
+from flask import request, make_response, Response
+
+
+class TTLCache:
+    """Small thread-safe in-process cache with per-entry expiry and LRU eviction."""
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Return the cached value for key, or default if missing or expired.
+
+        :param key: Cache key.
+        :param default: Value returned on a miss.
+        :return: Cached value or default.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Store value under key, evicting the least recently used entry if full.
+
+        :param key: Cache key.
+        :param value: Value to store.
+        :param ttl: Optional per-entry lifetime in seconds (default: the cache ttl).
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """Remove key from the cache and return its value (or default)."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Shared cache for read-mostly GET responses (forecasts change only when the
+# data pipeline reruns, which clears it)
+response_cache = TTLCache(maxsize=512, ttl=300)
+
+# Shared cache for small, rarely-changing lookup documents (profit models,
+# price ranges); cleared when the data pipeline rewrites them
+lookup_cache = TTLCache(maxsize=4096, ttl=600)
+
+
+def request_key(*values):
+    """
+    Hashable cache-key part for values taken from a request body.
+
+    JSON lists and objects are not hashable, so the values are encoded
+    together with sorted keys; equal inputs give the same key.
+
+    :param values: JSON-compatible request values.
+    :return: Encoded bytes usable in a cache key.
+    """
+    return orjson.dumps(values, option=orjson.OPT_SORT_KEYS)
+
+
+def cached_response(cache=response_cache, ttl=None):
+    """
+    Cache successful GET responses keyed by path and query string.
+
+    Only the body bytes and content type are stored, so every hit gets a fresh
+    Response object.
+
+    :param cache: TTLCache instance to store responses in.
+    :param ttl: Optional lifetime in seconds (default: the cache ttl).
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            key = (request.path, request.query_string)
+            hit = cache.get(key)
+            if hit is None:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                hit = (response.get_data(), response.content_type)
+                cache.set(key, hit, ttl)
+            return Response(hit[0], content_type=hit[1])
+        return decorated
+    return decorator
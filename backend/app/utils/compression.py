@@ -0,0 +1,38 @@
+import gzip
+from flask import request
+
+COMPRESS_MIMETYPES = {"application/json"}
+COMPRESS_LEVEL = 6
+COMPRESS_MIN_SIZE = 1024
+
+
+def compress_response(response):
+    """Gzip JSON bodies for clients that accept it (after_request hook)."""
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code >= 300
+        or response.mimetype not in COMPRESS_MIMETYPES
+        or "Content-Encoding" in response.headers
+        or "gzip" not in request.headers.get("Accept-Encoding", "").lower()
+    ):
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+
+    response.set_data(gzip.compress(body, compresslevel=COMPRESS_LEVEL))
+    response.headers["Content-Encoding"] = "gzip"
+    # A strong ETag names the identity bytes; the gzip variant only matches weakly
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def init_app(app):
+    """Register response compression on the Flask application."""
+    app.after_request(compress_response)
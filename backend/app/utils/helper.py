@@ -1,4 +1,8 @@
+import hashlib
+from functools import wraps
 import numpy as np
+from flask import request, make_response, Response, g, has_request_context
+from app.models.database import get_collection
 
 def remove_outliers(df, column):
     """Removes outliers from a DataFrame column using IQR method."""
@@ -15,3 +19,65 @@ def validate_request(data, required_fields):
     if missing_fields:
         return False, {"error": f"Missing fields: {', '.join(missing_fields)}"}
     return True, None
+
+def make_etag(*parts):
+    """Builds a stable ETag value from the given version parts."""
+    return hashlib.md5("|".join(map(str, parts)).encode("utf-8")).hexdigest()
+
+def parse_pagination(args, default_per_page=100, max_per_page=1000):
+    """
+    Reads optional page/per_page query parameters.
+
+    Returns None when the client did not ask for a page (full result), otherwise
+    (page, per_page). Raises ValueError for non-numeric or non-positive values.
+    """
+    if 'page' not in args and 'per_page' not in args:
+        return None
+    page = int(args.get('page', 1))
+    per_page = min(int(args.get('per_page', default_per_page)), max_per_page)
+    if page < 1 or per_page < 1:
+        raise ValueError("page and per_page must be positive")
+    return page, per_page
+
+def to_float(value):
+    """Coerce a raw Mongo value to float, returning None for missing/non-numeric/NaN values."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if np.isnan(value) else value
+
+def collection_version(collection_name):
+    """
+    Cheap version stamp for a collection: estimated count plus newest _id.
+
+    Remembered for the rest of the request, so an ETag check and a cache key
+    built in the same request share one pair of queries.
+    """
+    versions = g.setdefault('collection_versions', {}) if has_request_context() else {}
+    version = versions.get(collection_name)
+    if version is None:
+        collection = get_collection(collection_name)
+        newest = collection.find_one({}, {'_id': 1}, sort=[('_id', -1)])
+        version = versions[collection_name] = (
+            collection.estimated_document_count(), newest['_id'] if newest else None
+        )
+    return version
+
+def etag_from_collection(collection_name):
+    """
+    Decorator for GET views whose payload only depends on one collection and the
+    query string. Answers If-None-Match with 304 before running the view.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            etag = make_etag(request.path, request.query_string, *collection_version(collection_name))
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+            response.set_etag(etag)
+            return response
+        return decorated
+    return decorator
@@ -0,0 +1,22 @@
+import atexit
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from flask.logging import default_handler
+
+
+def init_app(app):
+    """
+    Route app.logger through a queue so request threads never wait on log I/O.
+
+    Records are handed to Flask's default handler by a background
+    QueueListener, stored in app.extensions["log_queue"].
+    """
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, default_handler, respect_handler_level=True)
+
+    app.logger.removeHandler(default_handler)
+    app.logger.addHandler(QueueHandler(log_queue))
+
+    listener.start()
+    atexit.register(listener.stop)
+    app.extensions["log_queue"] = listener
@@ -0,0 +1,82 @@
+import orjson
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+
+
+def _default(obj):
+    """Fallback for types orjson does not handle natively (e.g. pandas Timestamp)."""
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    if hasattr(obj, "item"):
+        return obj.item()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(payload):
+    """Serialize payload straight to UTF-8 JSON bytes."""
+    return orjson.dumps(payload, default=_default, option=ORJSON_OPTIONS)
+
+
+def orjson_response(payload, status=200):
+    """
+    Build a JSON response with orjson instead of the stdlib encoder.
+
+    :param payload: JSON-serializable object (dicts, lists, numpy scalars/arrays, datetimes).
+    :param status: HTTP status code (default: 200).
+    :return: Flask Response with an application/json body.
+    """
+    return Response(dumps(payload), status=status, content_type=JSON_CONTENT_TYPE)
+
+
+def stream_json_list(key, documents, extra=None, status=200):
+    """
+    Stream {key: [documents...], **extra} as JSON, one document at a time.
+
+    Lets large MongoDB results go out while the cursor is still being read,
+    without materializing the whole list or the serialized body.
+
+    :param key: Name of the list field in the response object.
+    :param documents: Iterable of JSON-serializable documents (e.g. a pymongo cursor).
+    :param extra: Additional top-level fields written after the list (default: None).
+    :param status: HTTP status code (default: 200).
+    :return: Streaming Flask Response.
+    """
+    def generate():
+        yield b"{" + dumps(key) + b":["
+        first = True
+        for document in documents:
+            yield dumps(document) if first else b"," + dumps(document)
+            first = False
+        yield b"]"
+        for extra_key, value in (extra or {}).items():
+            yield b"," + dumps(extra_key) + b":" + dumps(value)
+        yield b"}"
+
+    return Response(generate(), status=status, content_type=JSON_CONTENT_TYPE)
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    Speeds up request.get_json() and jsonify() across every blueprint. Dates
+    are passed through to Flask's default handler so they keep the same format.
+    """
+
+    options = ORJSON_OPTIONS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.options).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.options),
+            mimetype=self.mimetype
+        )
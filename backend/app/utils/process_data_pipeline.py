@@ -15,6 +15,7 @@ import sys
 import importlib.util
 import time
 import logging
+import threading
 from datetime import datetime
 
 # Add the project root directory to the Python path
@@ -24,6 +25,9 @@ project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from app.utils.cache import response_cache, lookup_cache
+from app.models.database import setup_db
+
 # Configure logging
 log_dir = os.path.join(project_root, "logs")
 if not os.path.exists(log_dir):
@@ -47,6 +51,10 @@ process_status = {
     "predict_demand_2025": {"status": "pending", "message": "Waiting to start"}
 }
 
+# Held for the whole of a pipeline run started by start_pipeline, so a second
+# request cannot start another run that writes the same collections
+pipeline_lock = threading.Lock()
+
 def load_module_by_path(file_path):
     """Load a Python module directly from a file path."""
     module_name = os.path.basename(file_path).replace('.py', '')
@@ -146,25 +154,74 @@ def run_pipeline():
         ("predict_demand_2025", "app.models.predict_demand_2025")
     ]
     
-    for step_name, module_path in pipeline_steps:
-        # Run the module
-        success = run_module(step_name, module_path)
-        
-        # If the module failed, stop the pipeline
-        if not success:
-            logging.error(f"Pipeline stopped at {step_name} due to errors")
-            return False
+    try:
+        for step_name, module_path in pipeline_steps:
+            # Run the module
+            success = run_module(step_name, module_path)
+            
+            # If the module failed, stop the pipeline
+            if not success:
+                logging.error(f"Pipeline stopped at {step_name} due to errors")
+                return False
+            
+            # Small delay between steps to ensure database operations complete
+            time.sleep(2)
         
-        # Small delay between steps to ensure database operations complete
-        time.sleep(2)
+        # Make sure every declared index exists on the regenerated collections
+        setup_db()
+    finally:
+        # Forecast, profit model and price range collections were (at least
+        # partly) regenerated; drop cached API responses and lookups
+        response_cache.clear()
+        lookup_cache.clear()
     
     logging.info("Pipeline completed successfully")
     return True
 
+def run_pipeline_locked():
+    """Runs the pipeline, then releases pipeline_lock (taken by start_pipeline)."""
+    try:
+        run_pipeline()
+    finally:
+        pipeline_lock.release()
+
+def start_pipeline():
+    """
+    Starts a pipeline run in a background thread unless one is already running.
+
+    The lock is taken before the step statuses are reset, so two concurrent
+    requests can never both start a run.
+
+    Returns:
+        bool: True if a run was started, False if one is already running
+    """
+    if not pipeline_lock.acquire(blocking=False):
+        return False
+    
+    try:
+        reset_pipeline_status()
+        processing_thread = threading.Thread(target=run_pipeline_locked)
+        processing_thread.daemon = True
+        processing_thread.start()
+    except Exception:
+        pipeline_lock.release()
+        raise
+    return True
+
 def get_pipeline_status():
     """Returns the current status of all pipeline steps."""
     return process_status
 
+def is_pipeline_running():
+    """Returns True while a pipeline run started by start_pipeline is in progress."""
+    return pipeline_lock.locked()
+
+def reset_pipeline_status():
+    """Marks every pipeline step as pending before a new run starts."""
+    for step in process_status.values():
+        step["status"] = "pending"
+        step["message"] = "Waiting to start"
+
 if __name__ == "__main__":
     try:
         # Run the pipeline
@@ -0,0 +1,67 @@
+import sys
+import os
+import time
+
+# Ensure the project root is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.utils.cache import TTLCache, request_key
+
+
+def test_get_returns_stored_value():
+    """A stored value is returned until it expires."""
+    cache = TTLCache(maxsize=4, ttl=60)
+    cache.set("token", {"id": "1"})
+    assert cache.get("token") == {"id": "1"}
+    assert cache.get("missing") is None
+
+
+def test_expired_entries_are_dropped():
+    """Entries past their ttl behave like misses."""
+    cache = TTLCache(maxsize=4, ttl=0.01)
+    cache.set("token", "payload")
+    time.sleep(0.02)
+    assert cache.get("token", "miss") == "miss"
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    """The oldest untouched entry is evicted once maxsize is exceeded."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_cached_response_reuses_body_for_same_query():
+    """Repeated GETs with the same query string are served from the cache."""
+    from flask import Flask
+    from app.utils.cache import cached_response
+
+    app = Flask(__name__)
+    cache = TTLCache(maxsize=8, ttl=60)
+    calls = []
+
+    @app.route("/forecast")
+    @cached_response(cache)
+    def forecast():
+        calls.append(1)
+        return {"calls": len(calls)}
+
+    client = app.test_client()
+    assert client.get("/forecast?year=2025").get_json() == {"calls": 1}
+    assert client.get("/forecast?year=2025").get_json() == {"calls": 1}
+    assert client.get("/forecast?year=2024").get_json() == {"calls": 2}
+
+
+def test_request_key_accepts_unhashable_json_values():
+    """Lists and objects from a request body give stable, hashable keys."""
+    key = request_key("حريمي", [10, 20], {"b": 1, "a": 2})
+    cache = TTLCache()
+    cache.set(("sales_strategy", key), b"{}")
+    assert cache.get(("sales_strategy", request_key("حريمي", [10, 20], {"a": 2, "b": 1}))) == b"{}"
+    assert request_key("حريمي", 30, None) != key
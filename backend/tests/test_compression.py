@@ -0,0 +1,54 @@
+import sys
+import os
+import gzip
+
+# Ensure the project root is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import Flask, jsonify
+from app.utils import compression
+
+
+def make_app():
+    app = Flask(__name__)
+    compression.init_app(app)
+
+    @app.route("/large")
+    def large():
+        return jsonify({"demand_data": [{"القسم": "حريمي", "month": m} for m in range(200)]})
+
+    @app.route("/small")
+    def small():
+        return jsonify({"status": "OK"})
+
+    return app
+
+
+def test_large_json_is_gzipped_when_accepted():
+    """Large JSON bodies are gzip-encoded for clients sending Accept-Encoding: gzip."""
+    client = make_app().test_client()
+    response = client.get("/large", headers={"Accept-Encoding": "gzip, deflate, br"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert b"demand_data" in gzip.decompress(response.get_data())
+
+
+def test_small_or_unaccepted_responses_are_left_alone():
+    """Small bodies and clients without gzip support get the plain body."""
+    client = make_app().test_client()
+    assert "Content-Encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "Content-Encoding" not in client.get("/large").headers
+
+
+def test_gzip_variant_gets_a_weak_etag():
+    """The gzip body carries a weak ETag, the identity body keeps the strong one."""
+    app = make_app()
+
+    @app.route("/tagged")
+    def tagged():
+        response = jsonify({"demand_data": list(range(500))})
+        response.set_etag("v1")
+        return response
+
+    client = app.test_client()
+    assert client.get("/tagged", headers={"Accept-Encoding": "gzip"}).headers["ETag"] == 'W/"v1"'
+    assert client.get("/tagged").headers["ETag"] == '"v1"'
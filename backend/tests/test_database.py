@@ -0,0 +1,27 @@
+import sys
+import os
+import threading
+
+# Ensure the project root is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.models import database
+
+
+def test_setup_runs_once_in_the_background(monkeypatch):
+    """start_setup_db returns without waiting and only starts one setup_db run per process."""
+    release = threading.Event()
+    runs = []
+
+    def setup_db():
+        runs.append(True)
+        release.wait(5)
+
+    monkeypatch.setattr(database, "setup_db", setup_db)
+    monkeypatch.setattr(database, "setup_thread", None)
+
+    database.start_setup_db()
+    database.start_setup_db()
+    release.set()
+    database.setup_thread.join(5)
+    assert runs == [True]
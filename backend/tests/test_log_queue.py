@@ -0,0 +1,27 @@
+import sys
+import os
+import atexit
+
+# Ensure the project root is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import Flask
+from app.utils import log_queue
+
+
+def test_logged_exceptions_are_written_by_the_listener(capsys):
+    """app.logger records, tracebacks included, reach stderr through the queue listener."""
+    app = Flask(__name__)
+    log_queue.init_app(app)
+
+    try:
+        raise ValueError("bad category")
+    except ValueError:
+        app.logger.exception("Error analyzing performance for %s", "حريمي")
+    listener = app.extensions["log_queue"]
+    listener.stop()
+    atexit.unregister(listener.stop)
+
+    err = capsys.readouterr().err
+    assert "Error analyzing performance for حريمي" in err
+    assert "ValueError: bad category" in err
@@ -0,0 +1,67 @@
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Ensure the project root is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.utils.orjson_response import dumps, orjson_response
+
+
+def test_dumps_handles_numpy_and_pandas_values():
+    """NumPy scalars, non-string keys and pandas timestamps serialize without manual conversion."""
+    payload = {
+        "القسم": "حريمي",
+        1: np.int64(3),
+        "quantity": np.float64(2.5),
+        "date": pd.Timestamp("2024-01-01"),
+    }
+    assert dumps(payload) == '{"القسم":"حريمي","1":3,"quantity":2.5,"date":"2024-01-01T00:00:00"}'.encode("utf-8")
+
+
+def test_orjson_response_sets_status_and_mimetype():
+    """The helper returns a JSON response with the requested status."""
+    response = orjson_response({"error": "missing"}, 404)
+    assert response.status_code == 404
+    assert response.mimetype == "application/json"
+    assert response.get_data() == b'{"error":"missing"}'
+
+
+def test_orjson_provider_parses_requests_and_keeps_flask_date_format():
+    """get_json() and jsonify() go through orjson while dates keep Flask's HTTP format."""
+    from datetime import datetime
+    from flask import Flask, jsonify, request
+    from app.utils.orjson_response import ORJSONProvider
+
+    app = Flask(__name__)
+    app.json = ORJSONProvider(app)
+
+    @app.route("/echo", methods=["POST"])
+    def echo():
+        data = request.get_json()
+        return jsonify({"received": data, "when": datetime(2025, 1, 1)})
+
+    response = app.test_client().post("/echo", json={"category": "حريمي", "purchase_price": 120})
+    assert response.get_json() == {
+        "received": {"category": "حريمي", "purchase_price": 120},
+        "when": "Wed, 01 Jan 2025 00:00:00 GMT",
+    }
+
+
+def test_stream_json_list_produces_one_json_document():
+    """Streamed chunks join into the same JSON a non-streamed response would produce."""
+    import orjson
+    from app.utils.orjson_response import stream_json_list
+
+    rows = ({"month": m, "total_quantity": np.float64(m * 1.5)} for m in range(1, 4))
+    response = stream_json_list("monthly_demand_data", rows, {"message": None})
+    assert orjson.loads(b"".join(response.response)) == {
+        "monthly_demand_data": [
+            {"month": 1, "total_quantity": 1.5},
+            {"month": 2, "total_quantity": 3.0},
+            {"month": 3, "total_quantity": 4.5},
+        ],
+        "message": None,
+    }
@@ -0,0 +1,41 @@
+import sys
+import os
+import threading
+
+# Ensure the project root is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.utils import process_data_pipeline as pipeline
+from app.utils.cache import response_cache, lookup_cache
+
+
+def test_second_start_is_refused_until_the_run_finishes(monkeypatch):
+    """A second start is refused for as long as the first run holds the lock."""
+    release = threading.Event()
+
+    def run_module(step_name, module_path):
+        release.wait(5)
+        return False
+
+    monkeypatch.setattr(pipeline, "run_module", run_module)
+
+    assert pipeline.start_pipeline()
+    assert pipeline.is_pipeline_running()
+    assert not pipeline.start_pipeline()
+
+    # The lock is handed back once the run ends
+    release.set()
+    assert pipeline.pipeline_lock.acquire(timeout=5)
+    pipeline.pipeline_lock.release()
+    assert not pipeline.is_pipeline_running()
+
+
+def test_caches_are_cleared_when_a_step_fails(monkeypatch):
+    """A run that stops partway still drops cached responses and lookups."""
+    monkeypatch.setattr(pipeline, "run_module", lambda step_name, module_path: False)
+    response_cache.set("forecast", b"{}")
+    lookup_cache.set("profit_model", {})
+
+    assert pipeline.run_pipeline() is False
+    assert response_cache.get("forecast") is None
+    assert lookup_cache.get("profit_model") is None
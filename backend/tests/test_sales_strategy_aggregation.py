@@ -0,0 +1,122 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Ensure the project root is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.routes import sales_strategy
+from app.routes.sales_strategy import (
+    aggregate_year_month, aggregate_by_product, compute_monthly_trends, growth_rates, MONTH_NAME_MAP
+)
+
+SUMS = {"total_quantity": "sum", "total_money_sold": "sum"}
+
+
+def make_sales(seed=0, rows=400):
+    """Random sales rows over 2021-2024 plus rows with out-of-range months."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "product_specification": rng.choice(["p1", "p2", "p3", None], rows),
+        "year": rng.integers(2021, 2025, rows),
+        "month": rng.integers(1, 13, rows),
+        "total_quantity": rng.integers(0, 200, rows),
+        "total_money_sold": rng.integers(0, 20000, rows).astype(float),
+    })
+    odd = pd.DataFrame({
+        "product_specification": ["p1", "p2"],
+        "year": [2023, 2022],
+        "month": [13, 0],
+        "total_quantity": [7, 5],
+        "total_money_sold": [91.5, 50.0],
+    })
+    return pd.concat([df, odd], ignore_index=True)
+
+
+def reference_monthly_trends(monthly_yearly_agg):
+    """The per-month loop compute_monthly_trends replaced."""
+    recent_years = sorted(monthly_yearly_agg["year"].unique(), reverse=True)[:3]
+    monthly_trends = {}
+    for month in range(1, 13):
+        month_data = monthly_yearly_agg[monthly_yearly_agg["month"] == month]
+        month_data = month_data[month_data["year"].isin(recent_years)].sort_values("year")
+        if len(month_data) < 2:
+            continue
+        first_year, last_year = month_data.iloc[0]["year"], month_data.iloc[-1]["year"]
+        first_qty, last_qty = month_data.iloc[0]["total_quantity"], month_data.iloc[-1]["total_quantity"]
+        growth_percent = 0
+        if first_qty > 0 and last_year > first_year:
+            growth_percent = (((last_qty / first_qty) ** (1 / (last_year - first_year))) - 1) * 100
+        monthly_trends[MONTH_NAME_MAP[month]] = {
+            "growthRate": round(growth_percent, 1),
+            "lastYear": int(last_year),
+            "lastQuantity": int(last_qty),
+            "trend": "upward" if growth_percent > 5 else "downward" if growth_percent < -5 else "stable"
+        }
+    return monthly_trends
+
+
+def test_aggregate_year_month_matches_groupby():
+    """Month tables skip out-of-range months; yearly totals keep every row, as groupby does."""
+    df = make_sales()
+    valid = df[df["month"].between(1, 12)]
+    monthly_agg, yearly_agg, monthly_yearly_agg = aggregate_year_month(df)
+
+    pd.testing.assert_frame_equal(monthly_agg, valid.groupby("month").agg(SUMS).reset_index(), check_dtype=False)
+    pd.testing.assert_frame_equal(yearly_agg, df.groupby("year").agg(SUMS).reset_index(), check_dtype=False)
+    pd.testing.assert_frame_equal(
+        monthly_yearly_agg, valid.groupby(["year", "month"]).agg(SUMS).reset_index(), check_dtype=False
+    )
+    assert yearly_agg["total_quantity"].dtype == df["total_quantity"].dtype
+
+
+def test_aggregate_by_product_matches_groupby():
+    """Per-product sums match groupby, which drops rows without a product."""
+    df = make_sales(seed=1)
+    expected = df.groupby("product_specification").agg(SUMS).reset_index()
+    pd.testing.assert_frame_equal(aggregate_by_product(df), expected, check_dtype=False)
+
+
+def test_compute_monthly_trends_matches_loop():
+    """The NumPy growth table gives the same trends as the per-month loop."""
+    for seed in range(3):
+        df = make_sales(seed=seed, rows=60)
+        monthly_yearly_agg = df.groupby(["year", "month"]).agg(SUMS).reset_index()
+        assert compute_monthly_trends(monthly_yearly_agg) == reference_monthly_trends(monthly_yearly_agg)
+
+
+def test_growth_rates_matches_pct_change():
+    """Column-wise growth equals pct_change() * 100, including zero denominators."""
+    values = np.array([[10.0, 0.0], [15.0, 5.0], [0.0, 5.0], [4.0, 0.0], [6.0, 3.0]])
+    expected = pd.DataFrame(values).pct_change() * 100
+    np.testing.assert_array_equal(growth_rates(values), expected.to_numpy())
+
+
+def test_empty_rollup_is_built_before_reading(monkeypatch):
+    """With no rollup documents at all, ensure_rollup runs once and the totals are read from it."""
+    rollup = []
+    built = []
+
+    class Rollup:
+        def estimated_document_count(self):
+            return len(rollup)
+
+    def ensure_rollup():
+        built.append(True)
+        rollup.append({"القسم": "حريمي", "year": 2024, "month": 1, "total_quantity": 3.0, "total_money_sold": 45.0})
+
+    monkeypatch.setattr(sales_strategy, "fetch_data", lambda name, query, projection, sort: [
+        {field: row[field] for field in sales_strategy.YEAR_MONTH_FIELDS}
+        for row in rollup if row["القسم"] == query["القسم"]
+    ])
+    monkeypatch.setattr(sales_strategy, "get_collection", lambda name: Rollup())
+    monkeypatch.setattr(sales_strategy, "ensure_rollup", ensure_rollup)
+
+    df = sales_strategy.load_category_year_month("حريمي")
+    assert built == [True]
+    assert df.to_dict(orient="records") == [{"year": 2024, "month": 1, "total_quantity": 3.0, "total_money_sold": 45.0}]
+
+    # Once the rollup has documents, a category without data does not rebuild it
+    assert sales_strategy.load_category_year_month("رجالي").empty
+    assert built == [True]